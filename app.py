@@ -1,14 +1,14 @@
 # app.py — EcoSense AI (SaaS Dashboard Edition)
 # ------------------------------------------------------------------------------------
-# ✅ What you get in this one file
+# ✅ What you get (pages live in views/, imported on first use)
 # - SaaS-style layout (sidebar navigation with icons, KPI cards, clean grid)
 # - Optional authentication (streamlit-authenticator) with demo users
 # - Theme + accent persistence, glassmorphism, animated gradient, alert text fixes
 # - User profiles & leaderboard persisted to data/users.csv (auto-created)
 # - EV charging optimizer (Open-Meteo renewable-aware window suggestion)
 # - Advanced "What-if" lifestyle simulator (CO2/energy impact for many scenarios)
-# - Rewards (awareness-based), points history sparkline, monthly PDF report
-# - Quick TTS tip (gTTS), Debug / sanity panel
+# - Rewards (awareness-based), persistent points history (daily/weekly/monthly rollups), monthly PDF report
+# - Quick TTS tip (gTTS, offline pyttsx3 fallback; cached), Debug / sanity panel
 # - Strong defaults, graceful fallbacks, defensive checks
 #
 # 📦 Suggested requirements.txt
@@ -27,27 +27,22 @@
 #   streamlit run app.py
 # ------------------------------------------------------------------------------------
 
-import io
-import os
-import re
-import math
-import json
+import time
 from pathlib import Path
-from dataclasses import dataclass
-from typing import Tuple, Optional, List, Dict
+from typing import List, Dict
 from datetime import datetime, timedelta, timezone
-from pathlib import Path
 
 import streamlit as st
 import pandas as pd
-import requests
-import matplotlib.pyplot as plt
-import streamlit as st
 
-import streamlit as st
-import json
-from pathlib import Path
-from auth import authenticate_user, create_user, add_action_points, load_users, save_users
+from auth import create_user
+from auth import login as auth_login, logout as auth_logout, session_user
+from utils.store import get_user_table
+from utils.tts import get_tip_audio
+from views import PAGES, PageContext, render as render_page
+from views.common import ensure_user, logo_png, user_points
+
+_rerun_t0 = time.perf_counter()
 
 
 # ----------------- PAGE CONFIG -----------------
@@ -62,26 +57,10 @@ if "login_error" not in st.session_state:
     st.session_state.login_error = ""
 if "signup_error" not in st.session_state:
     st.session_state.signup_error = ""
-
-# ----------------- USERS DATA FILE -----------------
-USER_FILE = "users.json"
-
-# Load users
-def load_users():
-    if Path(USER_FILE).exists():
-        with open(USER_FILE, "r") as f:
-            return json.load(f)
-    return {}
-
-# Save users
-def save_users(users):
-    if isinstance(users, pd.DataFrame):
-        users = users.to_dict(orient='records')
-    elif not isinstance(users, (dict, list)):
-        raise ValueError("users should be a dict, list of dicts, or a DataFrame")
-    # continue with saving users
-
- 
+if "auth_token" not in st.session_state:
+    st.session_state.auth_token = None
+# A verified login is a token lookup on every rerun; the KDF only runs in handle_login.
+st.session_state.logged_in = session_user(st.session_state.auth_token) is not None
 
 # ----------------- THEME TOGGLE -----------------
 theme_choice = st.radio("Theme", ["Light", "Dark"], 
@@ -143,23 +122,26 @@ body, .main {{
 """, unsafe_allow_html=True)
 
 # ----------------- LOGO -----------------
-logo_path = Path("assets/logo.png")
-if logo_path.exists():
-    st.image(str(logo_path), width=120)
+logo = logo_png(240)  # 2x for sharp rendering at 120 px
+if logo:
+    st.image(logo, width=120)
 else:
     st.markdown("## 🌿 EcoSense AI")
 
 # ----------------- LOGOUT FUNCTION -----------------
 def logout():
+    auth_logout(st.session_state.auth_token)
+    st.session_state.auth_token = None
     st.session_state.logged_in = False
     st.session_state.login_error = ""
 
 # ----------------- LOGIN HANDLER -----------------
 def handle_login():
-    users = load_users()
-    username = st.session_state.username
-    password = st.session_state.password
-    if username in users and users[username] == password:
+    # Salted KDF runs in the hasher's process pool; legacy users.json / SHA-256
+    # records are verified once and rehashed into the user store.
+    token = auth_login(st.session_state.username, st.session_state.password)
+    if token:
+        st.session_state.auth_token = token
         st.session_state.logged_in = True
         st.session_state.login_error = ""
     else:
@@ -168,18 +150,12 @@ def handle_login():
 
 # ----------------- SIGNUP HANDLER -----------------
 def handle_signup():
-    users = load_users()
-    username = st.session_state.new_username
-    password = st.session_state.new_password
-    if username in users:
-        st.session_state.signup_error = "❌ Username already exists!"
-    elif len(username) < 12 or len(password) < 12:
-        st.session_state.signup_error = "❌ Username and password must be at least 3 characters"
-    else:
-        users[username] = password
-        save_users(users)
-        st.success("✅ Signup successful! You can now login.")
+    msg = create_user(st.session_state.new_username, st.session_state.new_password)
+    if msg.startswith("✅"):
+        st.success(msg)
         st.session_state.signup_error = ""
+    else:
+        st.session_state.signup_error = msg
 
 # ----------------- LOGIN/SIGNUP PAGE -----------------
 if not st.session_state.logged_in:
@@ -212,7 +188,8 @@ if st.session_state.logged_in:
     st.markdown("## Welcome to EcoSense AI Dashboard!")
 
 
-# Optional extras (auth / option menu / PDF / TTS)
+# Optional extras (auth / option menu). Page-only extras such as reportlab
+# and matplotlib are imported by the page modules in views/.
 try:
     from streamlit_option_menu import option_menu  # type: ignore
 except Exception:  # graceful fallback
@@ -223,16 +200,6 @@ try:
 except Exception:
     stauth = None
 
-try:
-    from gtts import gTTS  # type: ignore
-except Exception:
-    gTTS = None
-
-try:
-    from reportlab.pdfgen import canvas  # type: ignore
-except Exception:
-    canvas = None
-
 # -------------------------------- Page Config ---------------------------------
 st.set_page_config(page_title="EcoSense AI", page_icon="🌿", layout="wide")
 
@@ -245,8 +212,6 @@ if "authed_user" not in st.session_state:
     st.session_state.authed_user = None
 if "points" not in st.session_state:
     st.session_state.points = 0
-if "history" not in st.session_state:
-    st.session_state.history = []  # (datetime, points)
 if "latlon" not in st.session_state:
     st.session_state.latlon = ("19.07", "72.87")  # Mumbai default
 if "ev_profile" not in st.session_state:
@@ -262,30 +227,14 @@ if "departure" not in st.session_state:
 
 # --------------------------------- Paths & Data --------------------------------
 DATA_DIR = Path("data"); DATA_DIR.mkdir(parents=True, exist_ok=True)
-DATA_PATH = DATA_DIR / "users.csv"
-
-# initialize CSV if needed
-if not DATA_PATH.exists():
-    pd.DataFrame(
-        columns=["username", "email", "vehicle_type", "points", "actions", "created_at"]
-    ).to_csv(DATA_PATH, index=False)
-
-# load users
-users_df = pd.read_csv(DATA_PATH, dtype={"actions": str}) if DATA_PATH.exists() else pd.DataFrame()
-if users_df.empty:
-    users_df = pd.DataFrame(columns=["username", "email", "vehicle_type", "points", "actions", "created_at"])  
-# clean types
-if "points" in users_df.columns:
-    users_df["points"] = pd.to_numeric(users_df["points"], errors="coerce").fillna(0).astype(int)
-else:
-    users_df["points"] = 0
-if "actions" in users_df.columns:
-    users_df["actions"] = users_df["actions"].fillna("")
-else:
-    users_df["actions"] = ""
-for col in ["username", "email", "vehicle_type", "created_at"]:
-    if col not in users_df.columns:
-        users_df[col] = ""
+get_tip_audio()  # first call per process queues synthesis of the voice tips
+
+# Shared, process-wide user table: one stamp check per rerun, reloaded only
+# when the store changes. users_df is the shared frame itself, so treat it as
+# read-only and write through user_table (or the helpers in views.common).
+user_table = get_user_table()
+users_df = user_table.refresh()
+
 
 # --------------------------------- Theming ------------------------------------
 # Sidebar quick switcher
@@ -390,143 +339,6 @@ div.stAlert, div.stAlert p, div.stAlert span, div.stAlert div {{
     unsafe_allow_html=True,
 )
 
-# -------------------------------- Utilities & Helpers -------------------------
-@dataclass
-class EVProfile:
-    charger_power: float
-    battery_capacity: float
-    current_soc: int
-    target_soc: int
-
-
-def fmt_dt(dt: datetime) -> str:
-    return dt.strftime("%Y-%m-%d %H:%M")
-
-
-@st.cache_data(show_spinner=False, ttl=60 * 15)
-def fetch_open_meteo(lat_f: str, lon_f: str, hours: int = 72) -> pd.DataFrame:
-    """Fetch hourly solar proxy & wind (UTC) from Open-Meteo. Returns 0..hours DataFrame.
-    Uses 'shortwave_radiation' when available; falls back to 'solar_radiation'."""
-    url = "https://api.open-meteo.com/v1/forecast"
-    params = {
-        "latitude": float(lat_f),
-        "longitude": float(lon_f),
-        "hourly": "shortwave_radiation,wind_speed_10m,cloudcover",
-        "forecast_days": 3,
-        "timezone": "UTC",
-    }
-    r = requests.get(url, params=params, timeout=15)
-    if r.status_code == 400:
-        params["hourly"] = "solar_radiation,wind_speed_10m,cloudcover"
-        r = requests.get(url, params=params, timeout=15)
-    r.raise_for_status()
-    data = r.json()
-    hourly = data.get("hourly", {})
-    times = pd.to_datetime(hourly.get("time", []), utc=True)
-    solar_series = hourly.get("shortwave_radiation") or hourly.get("solar_radiation") or [0] * len(times)
-    df = pd.DataFrame({
-        "time": times,
-        "solar": solar_series,
-        "wind": hourly.get("wind_speed_10m", [0] * len(times)),
-        "cloud": hourly.get("cloudcover", [0] * len(times)),
-    }).set_index("time")
-    return df.iloc[:hours].copy()
-
-
-def compute_green_score(df: pd.DataFrame) -> pd.DataFrame:
-    """Weighted green score using normalized solar (70%) and wind (30%), scaled by cloud factor."""
-    if df.empty:
-        return df
-    solar_max = max(df["solar"].max(), 1.0)
-    wind_max = max(df["wind"].max(), 1.0)
-    solar_norm = df["solar"] / solar_max
-    wind_norm = df["wind"] / wind_max
-    green = 0.7 * solar_norm + 0.3 * wind_norm
-    if "cloud" in df.columns:
-        cloud_factor = (100 - df["cloud"]) / 100.0
-        green = green * cloud_factor
-    df["green_score"] = green.clip(lower=0.0, upper=1.0)
-    return df
-
-
-def find_best_charging_window(df_before: pd.DataFrame, hours_needed: int) -> Tuple[Optional[datetime], Optional[float]]:
-    """Brute-force sliding window to find contiguous hours_needed block with max average green_score."""
-    if df_before.empty or hours_needed <= 0:
-        return None, None
-    arr = df_before["green_score"].values
-    if len(arr) < hours_needed:
-        return None, None
-    best_avg = -1.0
-    best_start = None
-    for i in range(0, len(arr) - hours_needed + 1):
-        avg = float(arr[i:i + hours_needed].mean())
-        if avg > best_avg:
-            best_avg = avg
-            best_start = df_before.index[i]
-    return best_start, best_avg
-
-
-# --------------- User Persistence & Leaderboard Utilities ---------------------
-def save_users(df: pd.DataFrame) -> None:
-    df.to_csv(DATA_PATH, index=False)
-def save_users(users):
-    """
-    Save users dictionary to CSV file.
-    `users` can be:
-    1. dict of dicts: {username: {"password": "1234", ...}}
-    2. list of dicts: [{"username": "prachi", "password": "1234"}, ...]
-    """
-    # If users is a dict of dicts
-    if isinstance(users, dict):
-        df = pd.DataFrame.from_dict(users, orient='index')
-        df.reset_index(inplace=True)
-        df.rename(columns={'index': 'username'}, inplace=True)
-    # If users is already a list of dicts
-    elif isinstance(users, list):
-        df = pd.DataFrame(users)
-    else:
-        raise ValueError("users should be a dict or list of dicts")
-
-    df.to_csv(DATA_PATH, index=False)
-
-def ensure_user(username: str, email: str = "", vehicle: str = "Non-EV") -> None:
-    global users_df
-    if not username:
-        return
-    if username not in users_df["username"].astype(str).tolist():
-        new_row = {
-            "username": username,
-            "email": email,
-            "vehicle_type": vehicle,
-            "points": 0,
-            "actions": "",
-            "created_at": datetime.now().isoformat(timespec="seconds"),
-        }
-        users_df = pd.concat([users_df, pd.DataFrame([new_row])], ignore_index=True)
-        save_users(users_df.to_dict(orient='records'))
-
-
-
-
-def add_action_points(username: str, label: str, pts: int) -> None:
-    global users_df
-    if not username:
-        return
-    if username not in users_df["username"].values:
-        ensure_user(username)
-    prev_actions = str(users_df.loc[users_df["username"] == username, "actions"].values[0] or "")
-    new_actions = prev_actions + f"\n- [{datetime.now().strftime('%Y-%m-%d')}] {label}"
-    users_df.loc[users_df["username"] == username, "actions"] = new_actions
-    users_df.loc[users_df["username"] == username, "points"] = (
-        int(users_df.loc[users_df["username"] == username, "points"].values[0]) + int(pts)
-    )
-if isinstance(users_df, pd.DataFrame):
-    save_users(users_df.to_dict(orient='records'))
-else:
-    raise TypeError("users_df must be a DataFrame")
-
-
-
 # --------------------------------- Auth Layer ---------------------------------
 # Demo credentials (replace with your own; or move to st.secrets)
 DEFAULT_AUTH_YAML = {
@@ -576,8 +388,9 @@ st.markdown(
 
 # ------------------------------- Sidebar (Auth + Nav) ------------------------
 with st.sidebar:
-    if Path("assets/logo.png").exists():
-        st.image("assets/logo.png")
+    sidebar_logo = logo_png(640)
+    if sidebar_logo:
+        st.image(sidebar_logo)
     else:
         st.markdown("## 🌿 EcoSense AI")
  
@@ -613,13 +426,7 @@ with st.sidebar:
         ensure_user(username_input, email_input, vehicle_type)
         st.session_state.authed_user = username_input
         # sync session points
-        try:
-            pts_val = int(users_df.loc[users_df["username"] == username_input, "points"].values[0])
-        except Exception:
-            pts_val = 0
-        st.session_state.points = pts_val
-        if not st.session_state.history:
-            st.session_state.history = [(datetime.now(), st.session_state.points)]
+        st.session_state.points = user_points(username_input)
 
     st.markdown("<hr>", unsafe_allow_html=True)
 
@@ -658,7 +465,7 @@ with st.sidebar:
     st.markdown("<hr>", unsafe_allow_html=True)
 
     # Sidebar nav
-    nav_options = ["🏠 Dashboard", "⚡ Charging", "🧮 Simulator", "🎁 Rewards", "📄 Reports", "⚙️ Settings"]
+    nav_options = list(PAGES)
     if option_menu:
         selected = option_menu(
             "Navigation",
@@ -688,401 +495,10 @@ with st.sidebar:
                 pass
             st.session_state.authed_user = None
 
-# -------------------------- Reusable UI Components ----------------------------
-def saas_card(title: str, inner_html: str, icon: str = "📊") -> None:
-    st.markdown(
-        f"""
-        <div class='card'>
-          <div style='display:flex; align-items:center; gap:10px; margin-bottom:8px;'>
-            <div style='font-size:22px'>{icon}</div>
-            <div style='font-weight:700; font-size:18px'>{title}</div>
-          </div>
-          <div style='font-size:15px; color:{text_color};'>{inner_html}</div>
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
-
-
-def kpi(title: str, value: str, help_text: str = ""):
-    st.markdown(
-        f"""
-        <div class='card' style='padding:16px'>
-           <div style='font-size:14px; color:{muted_color}; margin-bottom:6px'>{title}</div>
-           <div style='font-size:28px; font-weight:800;'>{value}</div>
-           <div class='small-muted'>{help_text}</div>
-        </div>
-        """,
-        unsafe_allow_html=True,
-    )
-
-
 # ------------------------------------ Pages -----------------------------------
-# 1) Dashboard
-if selected.startswith("🏠"):
-    st.markdown("### 📊 Dashboard")
-
-    c1, c2, c3 = st.columns(3)
-    with c1:
-        kpi("Eco Points", str(st.session_state.points), "Earn more by completing eco actions")
-    with c2:
-        # pretend KPI from last charging plan (if any)
-        kpi("Green Charging %", "—", "Run a charging plan to update")
-    with c3:
-        # sim CO2 saved estimate placeholder
-        kpi("Estimated CO₂ Saved", "—", "Use Simulator to see potential savings")
-
-    # Points history chart
-    st.markdown("#### 📈 Points History")
-    if st.session_state.history:
-        hist_df = pd.DataFrame(st.session_state.history, columns=["time", "points"]).set_index("time")
-        st.line_chart(hist_df["points"])
-    else:
-        st.info("Perform actions to build up your history chart.")
-
-    # Leaderboard snapshot
-    st.markdown("#### 🏆 Leaderboard (Top 8)")
-    if not users_df.empty:
-        lb = users_df.sort_values(by="points", ascending=False).reset_index(drop=True).head(8)
-        st.dataframe(lb[["username", "vehicle_type", "points"]], use_container_width=True, hide_index=True)
-    else:
-        st.info("No users yet — be the first!")
-
-# 2) Charging Optimizer
-elif selected.startswith("⚡"):
-    st.markdown("### ⚡ Renewable-aware EV Charging Optimizer")
-    st.caption("We compute a green score (solar + wind) and recommend the best charging window before your departure.")
-
-    lat, lon = st.session_state.latlon
-    ep = st.session_state.ev_profile
-    departure_time = st.session_state.departure
-
-    # Buttons
-    colb = st.columns(3)
-    get_plan = colb[0].button("📈 Get Charging Plan")
-    export_btn = colb[1].button("⬇️ Export 24h CSV")
-
-    if get_plan:
-        try:
-            df = fetch_open_meteo(lat, lon, hours=72)
-            df = compute_green_score(df)
-            st.success("Renewable forecast fetched.")
-
-            plt.rcParams.update({
-                "axes.edgecolor": "#9aa0a6",
-                "axes.facecolor": "none",
-                "figure.facecolor": "none",
-                "grid.color": "#9aa0a633",
-                "text.color": text_color,
-                "axes.labelcolor": text_color,
-                "xtick.color": text_color,
-                "ytick.color": text_color,
-            })
-
-            needed_kwh = ep["battery_capacity"] * max(0.0, (ep["target_soc"] - ep["current_soc"]) / 100.0)
-            hours_needed = max(1, math.ceil(needed_kwh / max(0.1, ep["charger_power"])))
-
-            df_before = df[df.index <= departure_time]
-            if df_before.empty:
-                st.warning("No forecast hours available before departure time.")
-            else:
-                best_start, best_avg = find_best_charging_window(df_before, hours_needed)
-                if best_start is not None:
-                    best_end = best_start + timedelta(hours=hours_needed)
-                    st.success(
-                        f"Recommended (UTC): **{fmt_dt(best_start)} → {fmt_dt(best_end)}** (avg green score {best_avg:.2f})"
-                    )
-
-                    plot_df = df_before.copy()
-                    plot_df["recommended"] = 0
-                    start_idx = plot_df.index.get_loc(best_start)
-                    plot_df.iloc[start_idx:start_idx + hours_needed, plot_df.columns.get_loc("recommended")] = 1
-
-                    fig, ax = plt.subplots(figsize=(9.5, 3.2))
-                    ax.grid(True, linestyle="--", linewidth=0.6)
-                    ax.plot(plot_df.index, plot_df["green_score"], marker="o", linewidth=2.2, label="Green score")
-                    rec = plot_df[plot_df["recommended"] == 1]
-                    ax.scatter(rec.index, rec["green_score"], s=90, label="Recommended")
-                    ax.set_ylabel("Green Score (0-1)"); ax.set_xlabel("UTC time"); ax.set_title("Renewable Availability")
-                    ax.legend(); plt.xticks(rotation=25)
-                    st.pyplot(fig, use_container_width=True)
-
-                    # Preview table
-                    preview = plot_df.reset_index().rename(columns={"index": "time"})
-                    cols_show = [c for c in ["time", "solar", "wind", "cloud", "green_score", "recommended"] if c in preview.columns]
-                    st.dataframe(preview[cols_show].head(24), use_container_width=True, hide_index=True)
-                else:
-                    st.warning("Couldn't find a contiguous block matching the required charging duration.")
-        except Exception as e:
-            st.error("Failed to fetch/process forecast: " + str(e))
-
-    if export_btn:
-        try:
-            df = fetch_open_meteo(lat, lon, hours=24)
-            df = compute_green_score(df).reset_index()
-            csv_bytes = df.to_csv(index=False).encode()
-            st.download_button("Download next 24h (CSV)", csv_bytes, file_name="renewables_24h.csv", mime="text/csv")
-        except Exception as e:
-            st.error("Export failed: " + str(e))
-
-    st.markdown(
-        f"<span class='small-muted'>💡 Tip: Rooftop solar? Prefer daytime charging (11:00–15:00 local). Wind peaks vary by region.</span>",
-        unsafe_allow_html=True,
-    )
-
-# 3) Simulator
-elif selected.startswith("🧮"):
-    st.markdown("### 🔮 Lifestyle Impact Simulator — 'What if I...' (Advanced)")
-    st.caption("Examples: 'bike 6 km 5 days/week', 'skip 1 flight 1200 km', 'install 3 kW solar', 'replace 8 bulbs with LED', 'wfh 2 days/week', 'raise AC by 2C'")
-
-    # Constants
-    EF_CAR_KG_PER_KM = 0.18
-    EF_ELECTRIC_GRID = 0.7
-    FLIGHT_KG_PER_KM = 0.20
-    LED_KWH_SAVING_PER_BULB_YR = 44
-    SOLAR_KWH_PER_KW_DAY = 4.5
-    AC_KWH_PER_DEG_PER_DAY = 0.4
-    IDLING_L_PER_HR = 0.8
-    EF_KG_PER_L_FUEL = 2.31
-    SPEED_SAVING_FACTOR = 0.15
-
-    def _get_number(text: str, default: float) -> float:
-        m = re.search(r"(\d+(\.\d+)?)", text)
-        return float(m.group(1)) if m else float(default)
-
-    def _km_in_text(text: str, default: float) -> float:
-        m = re.search(r"(\d+(\.\d+)?)\s*(km|kilometer|kilometre)s?", text)
-        if m:
-            return float(m.group(1))
-        m = re.search(r"(\d+(\.\d+)?)\s*(mile|miles)", text)
-        if m:
-            return float(m.group(1)) * 1.609
-        return float(default)
-
-    def _days_per_week(text: str, default: float = 5) -> float:
-        m = re.search(r"(\d+)\s*(day|days)\s*(a|per)?\s*week", text)
-        if m:
-            return float(m.group(1))
-        m = re.search(r"(\d+)\s*x\s*/?\s*week", text)
-        if m:
-            return float(m.group(1))
-        return default
-
-    def _percent_in_text(text: str, default: float) -> float:
-        m = re.search(r"(\d+(\.\d+)?)\s*%", text)
-        return float(m.group(1)) if m else float(default)
-
-    def estimate_impact(sentence: str) -> str:
-        s = sentence.lower().strip()
-
-        # Bike / walk
-        if any(k in s for k in ["bike", "cycle", "bicycle", "walk"]):
-            km = _km_in_text(s, 5)
-            days = _days_per_week(s, 5)
-            yearly_km = km * days * 52
-            saved = yearly_km * EF_CAR_KG_PER_KM
-            return f"🚲 Switching {km:.1f} km/day, {days:.0f} days/week from car saves ~{saved/1000:.2f} t CO₂/year."
-
-        # Vegetarian / vegan
-        if "vegan" in s:
-            return "🥗 Going vegan can save ~1.0–1.5 t CO₂/year (diet-dependent)."
-        if "vegetarian" in s or "go veg" in s:
-            return "🥗 Going vegetarian can save ~0.5–1.0 t CO₂/year (diet-dependent)."
-
-        # Public transport / carpool
-        if any(k in s for k in ["public transport", "bus", "train", "metro", "carpool"]):
-            km = _km_in_text(s, 20)
-            days = _days_per_week(s, 5)
-            saved = km * days * 52 * EF_CAR_KG_PER_KM * 0.5
-            return f"🚌 Switching {km:.0f} km/day, {days:.0f} days/week to public transport saves ~{saved/1000:.2f} t CO₂/year."
-
-        # WFH
-        if "work from home" in s or "wfh" in s:
-            km = _km_in_text(s, 20)
-            days = _days_per_week(s, 2)
-            saved = km * days * 52 * EF_CAR_KG_PER_KM
-            return f"💻 WFH {days:.0f} day(s)/week (commute {km:.0f} km/day) saves ~{saved/1000:.2f} t CO₂/year."
-
-        # Flights
-        if "flight" in s or "fly" in s:
-            km = _km_in_text(s, 1200)
-            trips = _get_number(s, 1)
-            saved = km * 2 * trips * FLIGHT_KG_PER_KM
-            return f"✈️ Skipping {int(trips)} flight(s) of {km:.0f} km (each way) saves ~{saved/1000:.2f} t CO₂."
-
-        # LEDs
-        if "led" in s and ("bulb" in s or "light" in s):
-            bulbs = _get_number(s, 6)
-            saved_kwh = bulbs * LED_KWH_SAVING_PER_BULB_YR
-            saved = saved_kwh * EF_ELECTRIC_GRID
-            return f"💡 Replacing {int(bulbs)} bulbs with LED saves ~{saved_kwh:.0f} kWh/year (~{saved/1000:.2f} t CO₂)."
-
-        # Solar
-        if "solar" in s:
-            kw = _get_number(s, 3)
-            yearly_kwh = kw * SOLAR_KWH_PER_KW_DAY * 365
-            saved = yearly_kwh * EF_ELECTRIC_GRID
-            return f"🔆 {kw:.1f} kW solar → ~{yearly_kwh:.0f} kWh/year → offsets ~{saved/1000:.2f} t CO₂/year."
-
-        # AC setpoint up
-        if "ac" in s and any(k in s for k in ["raise", "increase", "+"]):
-            deg = _get_number(s, 2)
-            days = 180
-            saved_kwh = deg * AC_KWH_PER_DEG_PER_DAY * days
-            saved = saved_kwh * EF_ELECTRIC_GRID
-            return f"❄️ Raising AC by {deg:.0f}°C saves ~{saved_kwh:.0f} kWh/season (~{saved/1000:.2f} t CO₂)."
-
-        # Drive slower
-        if any(k in s for k in ["limit speed", "drive slower", "90 km/h"]):
-            km = _km_in_text(s, 10000)
-            saved = km * EF_CAR_KG_PER_KM * SPEED_SAVING_FACTOR
-            return f"🚘 Limiting speed saves ~{saved/1000:.2f} t CO₂/year over {km:.0f} km."
-
-        # Switch % of trips
-        if "%" in s and any(k in s for k in ["bus", "train", "metro", "public"]):
-            percent = _percent_in_text(s, 30) / 100.0
-            km = _km_in_text(s, 12000)
-            saved = km * percent * EF_CAR_KG_PER_KM * 0.5
-            return f"🚍 Shifting {percent*100:.0f}% of {km:.0f} km/year to public transit saves ~{saved/1000:.2f} t CO₂/year."
-
-        # Idling
-        if "idle" in s or "idling" in s:
-            hours = _get_number(s, 50)
-            liters = hours * IDLING_L_PER_HR
-            saved = liters * EF_KG_PER_L_FUEL
-            return f"🕒 Avoiding {hours:.0f} h idling saves ~{saved/1000:.2f} t CO₂."
-
-        # Switch to EV
-        if "switch to ev" in s or ("switch" in s and "ev" in s):
-            km = _km_in_text(s, 12000)
-            ice = km * EF_CAR_KG_PER_KM
-            ev = (km * 0.15) * EF_ELECTRIC_GRID
-            saved = max(ice - ev, 0)
-            return f"⚡ Switching to EV for {km:.0f} km/year saves ~{saved/1000:.2f} t CO₂/year."
-
-        return "ℹ️ Try: 'bike 6 km 5 days/week', 'skip 1 flight 1200 km', 'install 3 kW solar'"
-
-    scenario = st.text_input("Describe your scenario", value="")
-    if st.button("Simulate impact"):
-        if scenario.strip():
-            out = estimate_impact(scenario)
-            st.success(out)
-        else:
-            st.info("Type something like: 'bike 6 km to work 5 days a week'.")
-
-# 4) Rewards
-elif selected.startswith("🎁"):
-    st.markdown("### 🌟 Eco Actions & Rewards")
-
-    actions_list = [
-        ("Plan trips to reduce driving", 5),
-        ("Use public transport / carpool", 10),
-        ("Charge during green hours", 8),
-        ("Drive smoothly (avoid harsh braking)", 5),
-        ("Service vehicle for better efficiency", 6),
-    ]
-
-    cols = st.columns(3)
-    for idx, (label, pts) in enumerate(actions_list):
-        with cols[idx % 3]:
-            if st.button(label):
-                if not st.session_state.authed_user:
-                    st.warning("Enter your name in the sidebar to record actions.")
-                else:
-                    add_action_points(st.session_state.authed_user, label, pts)
-                    st.success(f"+{pts} points — {label}")
-                    st.session_state.points = int(users_df.loc[users_df["username"] == st.session_state.authed_user, "points"].values[0])
-                    st.session_state.history.append((datetime.now(), st.session_state.points))
-                    if st.session_state.points >= 100:
-                        st.balloons()
-
-    # Show profile & leaderboard here as well
-    st.markdown("#### 🏆 Profile & Leaderboard")
-    if st.session_state.authed_user:
-        st.metric("Your Eco Points", st.session_state.points)
-    if not users_df.empty:
-        lb = users_df.sort_values(by="points", ascending=False).reset_index(drop=True).head(10)
-        st.dataframe(lb[["username", "vehicle_type", "points"]], use_container_width=True, hide_index=True)
-    else:
-        st.info("No users yet — be the first!")
-
-# 5) Reports
-elif selected.startswith("📄"):
-    st.markdown("### 📄 Monthly PDF Report")
-    if not st.session_state.authed_user:
-        st.warning("Enter your name in the sidebar to generate your report.")
-    else:
-        if canvas is None:
-            st.error("Install reportlab to enable PDF generation: pip install reportlab")
-        else:
-            if st.button("Generate & Download PDF"):
-                try:
-                    username = st.session_state.authed_user
-                    row = users_df.loc[users_df["username"] == username]
-                    if row.empty:
-                        st.warning("User not found in database; saving now…")
-                        ensure_user(username, "", "Non-EV")
-                        row = users_df.loc[users_df["username"] == username]
-                    row = row.iloc[0]
-
-                    buf = io.BytesIO()
-                    c = canvas.Canvas(buf, pagesize=(595, 842))
-                    c.setFont("Helvetica-Bold", 16)
-                    c.drawString(40, 800, "EcoSense AI — Monthly Report")
-                    c.setFont("Helvetica", 12)
-                    c.drawString(40, 780, f"User: {username}")
-                    c.drawString(40, 764, f"Email: {row['email']}")
-                    c.drawString(40, 748, f"Vehicle: {row['vehicle_type']}")
-                    c.drawString(40, 732, f"Eco Points: {int(row['points'])}")
-                    c.drawString(40, 712, "Actions:")
-                    y = 692
-                    for line in str(row["actions"]).split("\n"):
-                        if line.strip():
-                            c.drawString(60, y, line.strip()); y -= 16
-                            if y < 80:
-                                c.showPage(); y = 800
-                    c.showPage(); c.save(); buf.seek(0)
-                    st.download_button("📥 Download Report (PDF)", buf, file_name=f"{username}_ecosense_report.pdf", mime="application/pdf")
-                except Exception as e:
-                    st.error("Failed to generate PDF: " + str(e))
-
-    st.markdown("#### 🔊 Quick Voice Tip")
-    if gTTS is None:
-        st.info("Install gTTS to enable text-to-speech: pip install gTTS")
-    else:
-        if st.button("Play Tip"):
-            try:
-                tip_text = "Charge during the recommended window to maximize renewable energy and cut carbon emissions."
-                tts = gTTS(tip_text); tts.save("eco_tip.mp3")
-                audio_bytes = open("eco_tip.mp3", "rb").read()
-                st.audio(audio_bytes, format="audio/mp3")
-            except Exception as e:
-                st.error("TTS failed: " + str(e))
-
-# 6) Settings
-elif selected.startswith("⚙️"):
-    st.markdown("### ⚙️ Settings & Preferences")
-
-    # Theme & accent (already in sidebar), expose additional toggles here
-    st.markdown("#### Appearance")
-    st.write("Use the sidebar to change theme and accent.")
-
-    st.markdown("#### Account")
-    uname = st.text_input("Display Name", value=st.session_state.authed_user or "")
-    email = st.text_input("Email", value="")
-    veh = st.selectbox("Vehicle", ["EV", "Non-EV"], index=1)
-
-    if st.button("Save Profile"):
-        if uname:
-            ensure_user(uname, email, veh)
-            st.session_state.authed_user = uname
-            st.success("Profile saved.")
-        else:
-            st.warning("Enter a name.")
-
-    st.markdown("#### Data Export")
-    if not users_df.empty:
-        st.download_button("⬇️ Download users.csv", users_df.to_csv(index=False).encode(), file_name="users.csv", mime="text/csv")
+# Each page lives in views/<page>.py and is imported the first time it is
+# selected; the other pages' code and libraries are never loaded on this rerun.
+render_page(selected, PageContext(text_color, muted_color, st.session_state.accent))
 
 # --------------------------------- Footer & Notes -----------------------------
 st.markdown("<div class='card'>", unsafe_allow_html=True)
@@ -1142,6 +558,7 @@ if show_debug:
     st.sidebar.write(f"User: {st.session_state.authed_user}")
     st.sidebar.write(f"Location: {st.session_state.latlon}")
     st.sidebar.write(f"Departure UTC: {st.session_state.departure.isoformat()}")
+    st.sidebar.write(f"Page: {selected} (rerun {(time.perf_counter() - _rerun_t0) * 1e3:.0f} ms)")
 
 # --------------------------------- Developer Tips -----------------------------
 # 1) To enable real authentication, add to .streamlit/secrets.toml:
@@ -1,52 +1,81 @@
 import pandas as pd
 from pathlib import Path
 from datetime import datetime
-import hashlib
+import json
+import secrets
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from utils.events import get_event_log
+from utils.passwords import get_hasher, needs_rehash
+from utils.store import get_store
 
 # ------------------ Paths ------------------
 DATA_DIR = Path("data")
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 DATA_PATH = DATA_DIR / "users.csv"
+LEGACY_JSON_PATH = Path("users.json")  # plaintext {username: password} map of the old login page
+
+SESSION_TTL_S = 30 * 60
 
 # ------------------ Utilities ------------------
 def hash_password(password: str) -> str:
-    """Return SHA256 hash of password."""
-    return hashlib.sha256(password.encode()).hexdigest()
+    """Return a salted KDF hash of password (computed in the hasher's process pool)."""
+    return get_hasher().hash(password)
 
 def load_users() -> pd.DataFrame:
-    """Load users CSV or return empty DataFrame."""
-    if DATA_PATH.exists():
-        df = pd.read_csv(DATA_PATH, dtype={"actions": str})
-    else:
-        df = pd.DataFrame(columns=[
-            "username", "password", "email", "vehicle_type",
-            "points", "actions", "created_at"
-        ])
-    # Type cleaning
-    df["points"] = pd.to_numeric(df.get("points", 0), errors="coerce").fillna(0).astype(int)
-    df["actions"] = df.get("actions", "").fillna("")
-    for col in ["username", "password", "email", "vehicle_type", "created_at"]:
-        if col not in df.columns:
-            df[col] = ""
-    return df
+    """Return all users as a DataFrame (full scan — use the store for point lookups)."""
+    return get_store().to_frame()
 
 def save_users(df: pd.DataFrame) -> None:
-    """Save users DataFrame back to CSV."""
-    df.to_csv(DATA_PATH, index=False)
+    """Write a users DataFrame back to the store."""
+    get_store().upsert_many(df.to_dict(orient="records"))
 
 # ------------------ Auth ------------------
+def _legacy_password(username: str) -> Optional[str]:
+    """Plaintext password from the old users.json login file, if the user is only there."""
+    if not LEGACY_JSON_PATH.exists():
+        return None
+    try:
+        users = json.loads(LEGACY_JSON_PATH.read_text() or "{}")
+    except ValueError:
+        return None
+    pw = users.get(username) if isinstance(users, dict) else None
+    return pw if isinstance(pw, str) else None
+
 def authenticate_user(username: str, password: str) -> bool:
-    """Check username & password against CSV."""
-    df = load_users()
-    row = df[df["username"] == username]
-    if row.empty:
+    """Check username & password against the user store.
+
+    Legacy SHA-256 / plaintext records (and users only present in users.json)
+    are rehashed with the current KDF on the first successful login.
+    """
+    store = get_store()
+    hasher = get_hasher()
+    user = store.get_user(username)
+    stored = user["password"] if user else ""
+    if not stored:
+        # Not in the store yet, or imported from users.csv without a password.
+        legacy = _legacy_password(username)
+        if legacy is None or not hasher.verify(password, legacy):
+            return False
+        hashed = hasher.hash(password)
+        if user is None:
+            store.create_user({"username": username, "password": hashed,
+                               "created_at": datetime.utcnow().isoformat()})
+        else:
+            store.update_user(username, password=hashed)
+        return True
+    if not hasher.verify(password, stored):
         return False
-    return row.iloc[0]["password"] == hash_password(password)
+    if needs_rehash(stored, hasher.iterations):
+        store.update_user(username, password=hasher.hash(password))
+    return True
 
 def create_user(username: str, password: str, email: str = "", vehicle_type: str = "") -> str:
     """Add a new user if not exists."""
-    df = load_users()
-    if username in df["username"].values:
+    store = get_store()
+    if store.get_user(username) is not None:
         return "❌ Username already exists!"
     if len(username) < 3 or len(password) < 3:
         return "❌ Username & password must be at least 3 characters"
@@ -60,20 +89,49 @@ def create_user(username: str, password: str, email: str = "", vehicle_type: str
         "actions": "",
         "created_at": datetime.utcnow().isoformat()
     }
-    df = pd.concat([df, pd.DataFrame([new_user])], ignore_index=True)
-    save_users(df)
+    if not store.create_user(new_user):
+        return "❌ Username already exists!"
     return "✅ Signup successful! You can now login."
 
+
+# ------------------ Session tokens ------------------
+# Verified logins are remembered as opaque tokens (kept in st.session_state),
+# so reruns and page switches never re-run the KDF.
+_sessions: Dict[str, Tuple[str, float]] = {}
+_sessions_lock = threading.Lock()
+
+def login(username: str, password: str) -> Optional[str]:
+    """Authenticate and return a short-lived session token, or None."""
+    if not authenticate_user(username, password):
+        return None
+    token = secrets.token_urlsafe(32)
+    now = time.monotonic()
+    with _sessions_lock:
+        for t in [t for t, (_, exp) in _sessions.items() if exp < now]:
+            del _sessions[t]
+        _sessions[token] = (username, now + SESSION_TTL_S)
+    return token
+
+def session_user(token: Optional[str]) -> Optional[str]:
+    """Username behind a live token (sliding expiry), or None if unknown / expired."""
+    if not token:
+        return None
+    now = time.monotonic()
+    with _sessions_lock:
+        entry = _sessions.get(token)
+        if entry is None or entry[1] < now:
+            _sessions.pop(token, None)
+            return None
+        _sessions[token] = (entry[0], now + SESSION_TTL_S)
+        return entry[0]
+
+def logout(token: Optional[str]) -> None:
+    with _sessions_lock:
+        _sessions.pop(token or "", None)
+
 # ------------------ Points / Rewards ------------------
 def add_action_points(username: str, action: str, pts: int) -> None:
-    """Add eco-action with points to user history."""
-    df = load_users()
-    idx = df.index[df["username"] == username]
-    if len(idx) == 0:
+    """Add eco-action points to the user's total and record it in the action log."""
+    if get_store().add_points(username, pts) is None:
         return
-    i = idx[0]
-    df.at[i, "points"] = int(df.at[i, "points"]) + pts
-    actions = str(df.at[i, "actions"])
-    new_entry = f"{datetime.utcnow().isoformat()}::{action}::{pts}"
-    df.at[i, "actions"] = actions + "|" + new_entry if actions else new_entry
-    save_users(df)
+    get_event_log().append(username, action, pts)
@@ -0,0 +1,110 @@
+# benchmarks/bench_app.py
+# Streamlit script cost, driven headlessly through AppTest against a scratch
+# store, event log, points history and tip audio cache, swapped in only while
+# the app runs (no network: no page button is pressed).
+#
+#   app.cold_start  fresh interpreter -> first paint of the Dashboard
+#   app.rerun       one rerun of each page once its module has been imported
+#
+# Both carry budgets; `python -m benchmarks.run -k app. --budgets` fails when
+# first paint or a click gets slower than that.
+import os
+import subprocess
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+
+import auth
+from benchmarks.harness import benchmark, scratch_dir
+from utils import events, store, timeseries, tts
+from utils.events import EventLog, set_event_log
+from utils.store import SQLiteUserStore, set_store
+from utils.timeseries import PointsSeries, set_points_series
+from utils.tts import TipAudio, set_tip_audio
+from views import PAGES
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "app.py"
+
+COLD_START_BUDGET_S = 2.5
+RERUN_BUDGET_S = 0.15
+
+# Runs in the child interpreter with a scratch working directory, so the
+# default data/ store and event log are created there.
+_COLD_START = f"""
+import auth
+from streamlit.testing.v1 import AppTest
+auth.create_user("bench", "bench-password")
+at = AppTest.from_file({str(APP)!r}, default_timeout=60)
+at.session_state["auth_token"] = auth.login("bench", "bench-password")
+at.run()
+assert not at.exception, at.exception
+"""
+
+_app = {}
+
+
+@contextmanager
+def _scratch_services():
+    """Point the app's process-wide store, event log, points series and tip
+    audio at the scratch copies, and put the previous ones back afterwards, so
+    the benchmark never writes to (or moves cursors in) the real data/."""
+    if "services" not in _app:
+        root = scratch_dir()
+        log = EventLog(root / "events")
+        _app["services"] = (SQLiteUserStore(root / "users.db"), log,
+                            PointsSeries(root / "points_ts.db", log), TipAudio(root / "tts"))
+    scratch = _app["services"]
+    previous = (store._store, events._log, timeseries._series, tts._audio)
+    setters = (set_store, set_event_log, set_points_series, set_tip_audio)
+    for setter, service in zip(setters, scratch):
+        setter(service)
+    try:
+        yield
+    finally:
+        for setter, service in zip(setters, previous):
+            setter(service)
+
+
+def _logged_in_app():
+    """An AppTest session logged in as a user of a scratch store (built once)."""
+    if "at" not in _app:
+        from streamlit.testing.v1 import AppTest
+
+        with _scratch_services():
+            auth.create_user("bench", "bench-password")
+            at = AppTest.from_file(str(APP), default_timeout=60)
+            at.session_state["auth_token"] = auth.login("bench", "bench-password")
+            at.run()
+            at.sidebar.text_input[0].set_value("bench").run()
+        _app["at"] = at
+    return _app["at"]
+
+
+def _nav(at):
+    return next(r for r in at.sidebar.radio if r.label == "Navigate")
+
+
+@benchmark("app.cold_start", budget=COLD_START_BUDGET_S)
+def cold_start(_):
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join(filter(None, [str(ROOT), os.environ.get("PYTHONPATH")]))}
+
+    def run():
+        subprocess.run([sys.executable, "-c", _COLD_START], cwd=scratch_dir(), env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return run
+
+
+@benchmark("app.rerun", params=list(PAGES.values()), budget=RERUN_BUDGET_S)
+def rerun(page):
+    at = _logged_in_app()
+    label = next(k for k, v in PAGES.items() if v == page)
+    with _scratch_services():
+        _nav(at).set_value(label)
+        at.run()  # first visit imports the page module; not timed
+
+    def run():
+        with _scratch_services():
+            _nav(at).set_value(label)
+            at.run()
+    return run
@@ -0,0 +1,72 @@
+# benchmarks/bench_charging.py
+import numpy as np
+
+from benchmarks.harness import benchmark, load_fixture
+from utils.charging import best_window, best_windows, top_k_windows
+from utils.bytecache import ByteCache
+from utils.charts import green_score_chart
+from utils.scoring import score_frame
+from utils.weather import open_meteo_frame
+
+HORIZONS = [24, 72, 168, 384]
+
+
+def _scores(hours: int) -> np.ndarray:
+    df = score_frame(open_meteo_frame(load_fixture("open_meteo_mumbai_16d.json"), hours))
+    return df["green_score"].to_numpy()
+
+
+def _brute_force(arr: np.ndarray, hours_needed: int):
+    """The original find_best_charging_window loop, kept as a reference point."""
+    best_avg, best_start = -1.0, None
+    for i in range(0, len(arr) - hours_needed + 1):
+        avg = float(arr[i:i + hours_needed].mean())
+        if avg > best_avg:
+            best_avg, best_start = avg, i
+    return best_start, best_avg
+
+
+@benchmark("charging.find_best_window", params=HORIZONS)
+def find_best_window(hours):
+    arr = _scores(hours)
+    return lambda: best_window(arr, 6)
+
+
+@benchmark("charging.brute_force_reference", params=HORIZONS)
+def brute_force_reference(hours):
+    arr = _scores(hours)
+    return lambda: _brute_force(arr, 6)
+
+
+@benchmark("charging.top3_windows", params=HORIZONS)
+def top3(hours):
+    arr = _scores(hours)
+    return lambda: top_k_windows(arr, 6, 3)
+
+
+@benchmark("charging.best_windows_1_to_24h", params=HORIZONS)
+def many_durations(hours):
+    arr = _scores(hours)
+    widths = np.arange(1, 25)
+    return lambda: best_windows(arr, widths)
+
+
+def _plan_frame(hours: int):
+    df = score_frame(open_meteo_frame(load_fixture("open_meteo_mumbai_16d.json"), hours))
+    df.attrs["forecast_version"] = f"bench:{hours}h"
+    return df
+
+
+@benchmark("charging.chart_render", params=[72, 384])
+def chart_render(hours):
+    df = _plan_frame(hours).copy()
+    df.attrs.clear()  # no version: drawn every time, as before the chart cache
+    return lambda: green_score_chart(df, 10, 6)
+
+
+@benchmark("charging.chart_cached", params=[72, 384])
+def chart_cached(hours):
+    df = _plan_frame(hours)
+    cache = ByteCache(1 << 20)
+    green_score_chart(df, 10, 6, cache=cache)
+    return lambda: green_score_chart(df, 10, 6, cache=cache)
@@ -0,0 +1,39 @@
+# benchmarks/bench_scoring.py
+import numpy as np
+
+from benchmarks.harness import benchmark, load_fixture
+from utils.scoring import score, score_frame
+from utils.weather import compute_green_score, open_meteo_frame, owm_hourly_frame
+
+
+@benchmark("scoring.open_meteo_parse", params=[72, 384])
+def open_meteo_parse(hours):
+    data = load_fixture("open_meteo_mumbai_16d.json")
+    return lambda: open_meteo_frame(data, hours)
+
+
+@benchmark("scoring.app_compute_green_score", params=[72, 384])
+def app_green_score(hours):
+    df = open_meteo_frame(load_fixture("open_meteo_mumbai_16d.json"), hours)
+    return lambda: score_frame(df.copy(), "solar_wind_mix")
+
+
+@benchmark("scoring.solar_wind_mix_float32_out", params=[384])
+def mix_float32(hours):
+    df = open_meteo_frame(load_fixture("open_meteo_mumbai_16d.json"), hours)
+    cols = {c: df[c].to_numpy(np.float32) for c in df.columns}
+    out = np.empty(len(df), dtype=np.float32)
+    return lambda: score(cols, "solar_wind_mix", dtype=np.float32, out=out)
+
+
+@benchmark("scoring.owm_compute_green_score_per_row")
+def owm_per_row(_):
+    data = load_fixture("owm_onecall_mumbai_48h.json")
+    hourly, offset = data["hourly"], data["timezone_offset"]
+    return lambda: [compute_green_score(h, offset) for h in hourly]
+
+
+@benchmark("scoring.owm_hourly_frame")
+def owm_frame(_):
+    data = load_fixture("owm_onecall_mumbai_48h.json")
+    return lambda: owm_hourly_frame(data["hourly"], data["timezone_offset"])
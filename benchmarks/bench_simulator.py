@@ -0,0 +1,16 @@
+# benchmarks/bench_simulator.py
+from benchmarks.harness import benchmark, load_fixture
+from utils.simulator import _draws, estimate_impact, estimate_uncertainty
+
+
+@benchmark("simulator.estimate_impact_corpus")
+def corpus(_):
+    sentences = [s for s in load_fixture("scenarios.txt") if s.strip()]
+    return lambda: [estimate_impact(s) for s in sentences]
+
+
+@benchmark("simulator.uncertainty_per_scenario", params=[10_000, 100_000])
+def uncertainty(n):
+    sentence = "bike 6 km 5 days/week and install 3 kW solar and wfh 2 days/week"
+    _draws(n, 0)  # draws are shared across scenarios; time the evaluation itself
+    return lambda: estimate_uncertainty(sentence, n=n)
@@ -0,0 +1,135 @@
+# benchmarks/bench_users.py
+# User store and leaderboard costs at increasing user counts. Each size gets
+# its own scratch SQLite store and event log installed as the process default,
+# so auth.* runs exactly as it does in the app.
+import random
+from datetime import datetime, timedelta, timezone
+
+import numpy as np
+import pandas as pd
+
+import auth
+from benchmarks.harness import benchmark, scratch_dir
+from utils.events import EventLog, set_event_log
+from utils.leaderboard import Leaderboard
+from utils.store import SQLiteUserStore, set_store
+from utils.timeseries import PointsSeries
+
+SIZES = [1_000, 100_000]
+FULL_SIZES = [1_000_000]
+HISTORY_YEARS = [1, 5]
+
+_stores = {}
+
+
+def _seeded(n: int):
+    """A store with `n` users (cached per size), installed as the default."""
+    if n not in _stores:
+        root = scratch_dir()
+        store = SQLiteUserStore(root / "users.db")
+        pw = auth.hash_password("secret")
+        batch = 50_000
+        for lo in range(0, n, batch):
+            store.upsert_many(
+                {"username": f"user{i}", "password": pw, "email": "", "vehicle_type": "EV",
+                 "points": i % 997, "actions": "", "created_at": ""}
+                for i in range(lo, min(n, lo + batch))
+            )
+        _stores[n] = (store, EventLog(root / "events"))
+    store, log = _stores[n]
+    set_store(store)
+    set_event_log(log)
+    return store
+
+
+def _frame(n: int) -> pd.DataFrame:
+    rng = np.random.default_rng(n)
+    return pd.DataFrame({
+        "username": [f"user{i}" for i in range(n)],
+        "vehicle_type": "EV",
+        "points": rng.integers(0, 5000, n),
+    })
+
+
+@benchmark("users.load_users", params=SIZES, full_params=FULL_SIZES)
+def load_users(n):
+    _seeded(n)
+    return auth.load_users
+
+
+@benchmark("users.authenticate_user", params=SIZES, full_params=FULL_SIZES)
+def authenticate(n):
+    _seeded(n)
+    names = [f"user{random.randrange(n)}" for _ in range(256)]
+    it = iter(range(1 << 62))
+    return lambda: auth.authenticate_user(names[next(it) % 256], "secret")
+
+
+@benchmark("users.session_user")
+def session_lookup(_):
+    _seeded(SIZES[0])
+    token = auth.login("user0", "secret")
+    return lambda: auth.session_user(token)
+
+
+@benchmark("users.add_action_points", params=SIZES, full_params=FULL_SIZES)
+def add_points(n):
+    _seeded(n)
+    names = [f"user{random.randrange(n)}" for _ in range(256)]
+    it = iter(range(1 << 62))
+    return lambda: auth.add_action_points(names[next(it) % 256], "Charge during green hours", 8)
+
+
+@benchmark("leaderboard.sort_values_top10", params=SIZES, full_params=FULL_SIZES)
+def sort_top10(n):
+    df = _frame(n)
+    return lambda: df.sort_values(by="points", ascending=False).reset_index(drop=True).head(10)
+
+
+@benchmark("leaderboard.index_top10", params=SIZES)
+def index_top10(n):
+    board = Leaderboard.from_frame(_frame(n))
+    return lambda: board.top(10)
+
+
+@benchmark("leaderboard.index_update_and_rank", params=SIZES)
+def index_update(n):
+    board = Leaderboard.from_frame(_frame(n))
+    rng = random.Random(0)
+
+    def step():
+        name = f"user{rng.randrange(n)}"
+        board.update(name, rng.randrange(5000))
+        board.rank(name)
+    return step
+
+
+@benchmark("leaderboard.sync_after_reload", params=SIZES)
+def index_sync(n):
+    """User table reloaded after another replica awarded a few users."""
+    df = _frame(n)
+    board = Leaderboard.from_frame(df)
+    rng = random.Random(0)
+    it = iter(range(1 << 62))
+
+    def step():
+        changed = df.copy()
+        rows = [rng.randrange(n) for _ in range(16)]
+        changed.loc[rows, "points"] += 8
+        board.sync(changed, next(it))
+    return step
+
+
+@benchmark("history.points_series_all_time", params=HISTORY_YEARS)
+def points_series(years):
+    """Dashboard history chart for a user with a few actions a day for `years`."""
+    root = scratch_dir()
+    log = EventLog(root / "events")
+    now = datetime.now(timezone.utc)
+    rng = random.Random(years)
+    for day in range(365 * years):
+        for _ in range(rng.randrange(5)):
+            log.append("veteran", "Walk or cycle", 5, ts=now - timedelta(days=day, minutes=rng.randrange(1440)))
+    series = PointsSeries(root / "points_ts.db", log)
+    series.sync()
+    return lambda: series.series("veteran", end=now)
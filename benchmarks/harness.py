@@ -0,0 +1,119 @@
+# benchmarks/harness.py
+# Minimal asv-style benchmark harness. A benchmark is a setup function
+# registered with @benchmark; it receives one parameter value and returns the
+# zero-argument callable to time. Results are plain dicts so they can be
+# written to JSON and compared against a stored baseline.
+import atexit
+import json
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+FIXTURES = Path(__file__).resolve().parent / "fixtures"
+
+BENCHMARKS: List[Dict] = []
+
+
+def benchmark(name: str, params: Sequence = (None,), full_params: Sequence = (),
+              budget: Optional[float] = None) -> Callable:
+    """Register a benchmark setup function. `full_params` only run with --full;
+    `budget` is the median time (seconds) the benchmark must stay under."""
+    def deco(setup: Callable) -> Callable:
+        BENCHMARKS.append({"name": name, "setup": setup, "params": list(params), "full_params": list(full_params),
+                           "budget": budget})
+        return setup
+    return deco
+
+
+def load_fixture(name: str):
+    path = FIXTURES / name
+    return json.loads(path.read_text()) if path.suffix == ".json" else path.read_text().splitlines()
+
+
+def scratch_dir() -> Path:
+    """Temporary directory removed when the run exits."""
+    path = Path(tempfile.mkdtemp(prefix="ecosense-bench-"))
+    atexit.register(shutil.rmtree, path, ignore_errors=True)
+    return path
+
+
+def time_callable(fn: Callable[[], object], min_time: float = 0.2, repeat: int = 5) -> Dict:
+    """Time `fn`: calibrate a loop count so each sample takes ~min_time/repeat seconds."""
+    target = min_time / repeat
+    number = 1
+    while True:
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - t0
+        if elapsed >= target or number >= 1 << 20:
+            break
+        number = max(number * 2, int(number * target / max(elapsed, 1e-9)))
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        t0 = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - t0) / number)
+    return {
+        "min_s": min(samples),
+        "median_s": statistics.median(samples),
+        "mean_s": statistics.fmean(samples),
+        "stddev_s": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def run(pattern: str = "", full: bool = False, min_time: float = 0.2, repeat: int = 5,
+        progress: Optional[Callable[[Dict], None]] = None) -> List[Dict]:
+    results = []
+    for bench in BENCHMARKS:
+        if pattern and pattern not in bench["name"]:
+            continue
+        for param in bench["params"] + (bench["full_params"] if full else []):
+            fn = bench["setup"](param)
+            row = {"name": bench["name"], "param": param, **time_callable(fn, min_time, repeat)}
+            if bench["budget"] is not None:
+                row["budget_s"] = bench["budget"]
+            results.append(row)
+            if progress:
+                progress(row)
+    return results
+
+
+def metadata() -> Dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip()
+    except Exception:
+        commit = ""
+    import numpy, pandas
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": numpy.__version__,
+        "pandas": pandas.__version__,
+    }
+
+
+def over_budget(results: List[Dict]) -> List[Dict]:
+    """Rows whose median exceeded the benchmark's declared budget."""
+    return [r for r in results if "budget_s" in r and r["median_s"] > r["budget_s"]]
+
+
+def compare(results: List[Dict], baseline: List[Dict], threshold: float) -> List[Dict]:
+    """Rows whose median got slower than `threshold` x the baseline median."""
+    base = {(r["name"], json.dumps(r["param"])): r for r in baseline}
+    regressions = []
+    for r in results:
+        b = base.get((r["name"], json.dumps(r["param"])))
+        if b and b["median_s"] > 0 and r["median_s"] / b["median_s"] > threshold:
+            regressions.append({**r, "baseline_median_s": b["median_s"], "ratio": r["median_s"] / b["median_s"]})
+    return regressions
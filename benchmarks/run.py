@@ -0,0 +1,67 @@
+# benchmarks/run.py
+# Run the hot-path benchmarks offline against the recorded fixtures.
+#
+#   python -m benchmarks.run                       # quick sizes, table to stdout
+#   python -m benchmarks.run --full --json out.json
+#   python -m benchmarks.run --compare baseline.json --threshold 1.25
+#   python -m benchmarks.run -k app. --budgets
+#
+# With --compare the exit status is 1 when any benchmark's median got slower
+# than threshold x baseline, so CI can block regressions. With --budgets it is
+# 1 when any benchmark exceeded its declared absolute budget.
+import argparse
+import importlib
+import json
+import sys
+from pathlib import Path
+
+from benchmarks import harness
+
+MODULES = ["bench_app", "bench_charging", "bench_scoring", "bench_simulator", "bench_users"]
+
+
+def _fmt(seconds: float) -> str:
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("µs", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:8.2f} {unit}"
+    return f"{seconds / 1e-9:8.0f} ns"
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="EcoSense AI benchmark suite")
+    parser.add_argument("-k", "--filter", default="", help="only run benchmarks whose name contains this")
+    parser.add_argument("--full", action="store_true", help="include the large sizes (1M users)")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per benchmark (approx.)")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write machine-readable results here")
+    parser.add_argument("--compare", help="baseline JSON from a previous run")
+    parser.add_argument("--threshold", type=float, default=1.25, help="allowed slowdown ratio vs baseline")
+    parser.add_argument("--budgets", action="store_true", help="fail if any benchmark exceeds its budget")
+    args = parser.parse_args(argv)
+
+    for name in MODULES:
+        importlib.import_module(f"benchmarks.{name}")
+
+    def show(row):
+        over = "  OVER BUDGET " + _fmt(row["budget_s"]).strip() if row in harness.over_budget([row]) else ""
+        print(f"{row['name']:<42} {str(row['param']):>9}  median {_fmt(row['median_s'])}  "
+              f"min {_fmt(row['min_s'])}  (n={row['number']}x{row['repeat']}){over}", flush=True)
+
+    results = harness.run(args.filter, args.full, args.min_time, args.repeat, progress=show)
+    payload = {"meta": harness.metadata(), "results": results}
+    if args.json:
+        Path(args.json).write_text(json.dumps(payload, indent=2))
+
+    failed = bool(args.budgets and harness.over_budget(results))
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())["results"]
+        regressions = harness.compare(results, baseline, args.threshold)
+        for r in regressions:
+            print(f"REGRESSION {r['name']} [{r['param']}]: {_fmt(r['baseline_median_s'])} -> "
+                  f"{_fmt(r['median_s'])} ({r['ratio']:.2f}x)", file=sys.stderr)
+        failed = failed or bool(regressions)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,115 @@
+# benchmarks/stress_forecast.py
+# Request-coalescing check for the forecast cache. A local stub Open-Meteo
+# server (slow, and rejecting `shortwave_radiation` with a 400 like some
+# deployments do) counts upstream requests while many sessions miss the same
+# cells at once, through get_or_fetch and get_or_fetch_many.
+#
+#   python -m benchmarks.stress_forecast --sessions 16 --cells 4
+#
+# Exits 1 if any cell is fetched upstream more than once per expiry, or if the
+# rejected variant is requested again after the first 400.
+import argparse
+import json
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.harness import scratch_dir
+from utils.forecast_cache import ForecastCache
+from utils.weather import fetch_open_meteo, fetch_open_meteo_many
+
+PROVIDER = "open-meteo"
+
+
+class _Stub(BaseHTTPRequestHandler):
+    delay_s = 0.3
+    requests = Counter()  # (solar variable, latitude) -> count
+    lock = threading.Lock()
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        q = parse_qs(urlparse(self.path).query)
+        solar = q["hourly"][0].split(",")[0]
+        with self.lock:
+            self.requests[solar, q["latitude"][0]] += 1
+        time.sleep(self.delay_s)
+        if solar == "shortwave_radiation":
+            self.send_response(400)
+            self.end_headers()
+            return
+        n = 24 * int(q["forecast_days"][0])
+        body = json.dumps({"hourly": {
+            "time": [f"2026-01-{1 + h // 24:02d}T{h % 24:02d}:00" for h in range(n)],
+            "solar_radiation": [100.0] * n, "wind_speed_10m": [5.0] * n, "cloudcover": [20.0] * n,
+        }}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def _round(cache: ForecastCache, url: str, sessions: int, cells: list) -> Counter:
+    """Every session misses every cell at once: odd sessions one by one, even ones as a batch."""
+    _Stub.requests.clear()
+    fetch = lambda lat, lon, hours: fetch_open_meteo(lat, lon, hours, base_url=url)
+    fetch_many = lambda coords, hours: fetch_open_meteo_many(coords, hours=hours, base_url=url,
+                                                             return_exceptions=True)
+
+    def session(k: int) -> None:
+        if k % 2:
+            for lat, lon in cells:
+                cache.get_or_fetch(PROVIDER, lat, lon, 72, fetch)
+        else:
+            for df in cache.get_or_fetch_many(PROVIDER, cells, 72, fetch_many):
+                if isinstance(df, BaseException):
+                    raise df
+
+    with ThreadPoolExecutor(sessions) as ex:
+        list(ex.map(session, range(sessions)))
+    return Counter(_Stub.requests)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent forecast misses share one upstream fetch per cell")
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--cells", type=int, default=4)
+    parser.add_argument("--delay", type=float, default=0.3, help="stub server latency (s)")
+    args = parser.parse_args(argv)
+
+    _Stub.delay_s = args.delay
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Stub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/v1/forecast"
+    cache = ForecastCache(scratch_dir() / "forecast_cache.db", ttl_s=3600)
+    cells = [(10.0 + i, 20.0) for i in range(args.cells)]
+
+    failures = []
+    for name in ("cold", "after expiry"):
+        t0 = time.perf_counter()
+        counts = _round(cache, url, args.sessions, cells)
+        accepted = Counter({lat: n for (solar, lat), n in counts.items() if solar == "solar_radiation"})
+        rejected = sum(n for (solar, _), n in counts.items() if solar == "shortwave_radiation")
+        print(f"{name}: {args.sessions} sessions x {args.cells} cells in {time.perf_counter() - t0:.2f}s -> "
+              f"{sum(accepted.values())} upstream fetches, {rejected} rejected (400)")
+        if len(accepted) != args.cells or max(accepted.values()) != 1:
+            failures.append(f"{name}: fetches per cell {dict(accepted)}")
+        if rejected > (args.cells if name == "cold" else 0):
+            failures.append(f"{name}: {rejected} requests for the rejected variant")
+        cache.ttl_s = -1  # expire every entry at once
+        cache.purge_expired()
+        cache.ttl_s = 3600
+    server.shutdown()
+    print(f"coalescing: {cache._flights.leaders} fetches led, {cache._flights.followers} waits")
+    for failure in failures:
+        print(f"  {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
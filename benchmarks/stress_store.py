@@ -0,0 +1,85 @@
+# benchmarks/stress_store.py
+# Lost-update stress test for the user store and event log with several
+# processes (stand-ins for app replicas) and threads (sessions) awarding
+# points concurrently to a small set of hot users.
+#
+#   python -m benchmarks.stress_store --backend sqlite --processes 4 --threads 8 --awards 500
+#   python -m benchmarks.stress_store --backend csv --users 200
+#
+# Exits 1 if any user's final points (store or event log) differ from the
+# number of awards that were acknowledged.
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from benchmarks.harness import scratch_dir
+from utils.events import EventLog
+from utils.store import BACKENDS
+
+ACTION = "Charge during green hours"
+
+
+def _open(backend: str, root: Path):
+    path = root / ("users.db" if backend == "sqlite" else "users.csv")
+    return BACKENDS[backend](path), EventLog(root / "events", segment_records=4096, compact_every=2)
+
+
+def _worker(args) -> Counter:
+    """One process: `threads` sessions each awarding `awards` points at random users."""
+    backend, root, users, threads, awards, seed = args
+    store, log = _open(backend, Path(root))
+
+    def session(k: int) -> Counter:
+        rng = random.Random(seed * 1000 + k)
+        done = Counter()
+        for _ in range(awards):
+            name = f"user{rng.randrange(users)}"
+            if store.add_points(name, 1) is not None:
+                log.append(name, ACTION, 1)
+                done[name] += 1
+        return done
+
+    with ThreadPoolExecutor(threads) as ex:
+        return sum(ex.map(session, range(threads)), Counter())
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Concurrent point-award stress test (no lost updates)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="sqlite")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=8, help="sessions per process")
+    parser.add_argument("--awards", type=int, default=250, help="awards per session")
+    parser.add_argument("--users", type=int, default=50, help="fewer users = more contention")
+    parser.add_argument("--root", help="data directory (default: a temporary one)")
+    args = parser.parse_args(argv)
+
+    root = Path(args.root) if args.root else scratch_dir()
+    store, log = _open(args.backend, root)
+    store.upsert_many({"username": f"user{i}", "points": 0} for i in range(args.users))
+
+    jobs = [(args.backend, str(root), args.users, args.threads, args.awards, p) for p in range(args.processes)]
+    t0 = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+        expected = sum(pool.map(_worker, jobs), Counter())
+    elapsed = time.perf_counter() - t0
+
+    total = sum(expected.values())
+    lost_store = {u: (n, store.get_user(u)["points"]) for u, n in expected.items() if store.get_user(u)["points"] != n}
+    lost_log = {u: (n, log.totals(u)["points"]) for u, n in expected.items() if log.totals(u)["points"] != n}
+    print(
+        f"{args.backend}: {total} awards from {args.processes} processes x {args.threads} sessions "
+        f"in {elapsed:.2f}s ({total / elapsed:.0f} awards/s); "
+        f"mismatched users: store {len(lost_store)}, event log {len(lost_log)}"
+    )
+    for name, (want, got) in list({**lost_store, **lost_log}.items())[:10]:
+        print(f"  {name}: expected {want}, got {got}", file=sys.stderr)
+    return 1 if lost_store or lost_log else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
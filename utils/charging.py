@@ -0,0 +1,73 @@
+# utils/charging.py
+# Charging window search over a green-score series. Window averages come from a
+# single prefix sum, so the best window is O(n) and ranked alternatives or many
+# durations at once cost one vectorized pass instead of a slice per start index.
+from typing import List, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+def slots_per_hour(index: pd.Index) -> int:
+    """Samples per hour for a DatetimeIndex (1 for hourly data, 4 for 15-minute data)."""
+    if not isinstance(index, pd.DatetimeIndex) or len(index) < 2:
+        return 1
+    step = pd.Series(index).diff().dropna().median()
+    return max(1, int(round(pd.Timedelta(hours=1) / step)))
+
+
+def window_means(scores: np.ndarray, width: int) -> np.ndarray:
+    """Mean of every contiguous `width`-long window (len(scores) - width + 1 values)."""
+    arr = np.asarray(scores, dtype=float)
+    if width <= 0 or len(arr) < width:
+        return np.empty(0)
+    csum = np.concatenate(([0.0], np.cumsum(arr)))
+    return (csum[width:] - csum[:-width]) / width
+
+
+def best_window(scores: np.ndarray, width: int) -> Tuple[int, float]:
+    """Start index and average of the best window, or (-1, nan) if none fits."""
+    means = window_means(scores, width)
+    if means.size == 0:
+        return -1, float("nan")
+    i = int(np.argmax(means))  # first maximum, matching the old brute-force scan
+    return i, float(means[i])
+
+
+def top_k_windows(scores: np.ndarray, width: int, k: int = 3) -> List[Tuple[int, float]]:
+    """Up to `k` non-overlapping windows as (start, average), best first."""
+    means = window_means(scores, width)
+    picked: List[Tuple[int, float]] = []
+    if means.size == 0 or k <= 0:
+        return picked
+    # Stable sort keeps earlier starts first among equal averages.
+    for i in np.argsort(-means, kind="stable"):
+        # Equal-width windows overlap exactly when their starts are < width apart.
+        if all(abs(int(i) - s) >= width for s, _ in picked):
+            picked.append((int(i), float(means[i])))
+            if len(picked) == k:
+                break
+    return picked
+
+
+def best_windows(scores: np.ndarray, widths: Union[Sequence[int], np.ndarray]) -> Tuple[np.ndarray, np.ndarray]:
+    """Best window for many widths in one pass. Returns (starts, averages); -1/nan where none fits."""
+    arr = np.asarray(scores, dtype=float)
+    w = np.asarray(widths, dtype=int).reshape(-1)
+    n = len(arr)
+    starts = np.full(w.shape, -1, dtype=int)
+    avgs = np.full(w.shape, np.nan)
+    ok = (w > 0) & (w <= n)
+    if n == 0 or not ok.any():
+        return starts, avgs
+    csum = np.concatenate(([0.0], np.cumsum(arr)))
+    i = np.arange(n)[None, :]                       # candidate starts
+    ww = w[ok][:, None]
+    end = i + ww
+    valid = end <= n
+    sums = csum[np.minimum(end, n)] - csum[i]
+    means = np.where(valid, sums / ww, -np.inf)
+    best = np.argmax(means, axis=1)
+    starts[ok] = best
+    avgs[ok] = means[np.arange(len(best)), best]
+    return starts, avgs
@@ -0,0 +1,92 @@
+# utils/charts.py
+# Chart rendering for the Charging page. Plots are rendered once to PNG/SVG
+# bytes and kept in a process-wide LRU cache with a memory budget, keyed by
+# (forecast version, recommended window, theme, format), so every session in
+# the same grid cell gets the same bytes instead of a fresh matplotlib figure.
+#
+# Figures are built with the object-oriented API (matplotlib.figure.Figure),
+# never registered with pyplot and never touch the global rcParams; each one
+# is cleared as soon as it has been saved. Long series skip matplotlib
+# entirely and go to Streamlit's native line chart (see native_frame).
+import io
+import threading
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.bytecache import ByteCache
+
+DEFAULT_MAX_BYTES = 32 * 1024 * 1024
+NATIVE_CHART_POINTS = 500  # beyond this, markers are unreadable and PNGs get large
+FORMATS = {"png": "image/png", "svg": "image/svg+xml"}
+
+
+def _draw_green_score(df: pd.DataFrame, start: int, width: int, text_color: str, fmt: str) -> bytes:
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(9.5, 3.2))
+    try:
+        fig.patch.set_alpha(0.0)
+        ax = fig.add_subplot()
+        ax.set_facecolor("none")
+        for spine in ax.spines.values():
+            spine.set_edgecolor("#9aa0a6")
+        ax.grid(True, linestyle="--", linewidth=0.6, color="#9aa0a633")
+        ax.tick_params(colors=text_color)
+        ax.tick_params(axis="x", labelrotation=25)
+        ax.plot(df.index, df["green_score"], marker="o", linewidth=2.2, label="Green score")
+        rec = df.iloc[start:start + width]
+        ax.scatter(rec.index, rec["green_score"], s=90, label="Recommended")
+        ax.set_ylabel("Green Score (0-1)", color=text_color)
+        ax.set_xlabel("UTC time", color=text_color)
+        ax.set_title("Renewable Availability", color=text_color)
+        for label in ax.legend().get_texts():
+            label.set_color(text_color)
+        buf = io.BytesIO()
+        fig.savefig(buf, format=fmt, transparent=True, bbox_inches="tight")
+        return buf.getvalue()
+    finally:
+        fig.clear()
+
+
+def green_score_chart(df: pd.DataFrame, start: int, width: int, text_color: str = "black",
+                      fmt: str = "png", cache: Optional[ByteCache] = None) -> bytes:
+    """Green-score line with the `width`-row window at row `start` highlighted.
+
+    Cached when `df` carries a forecast_version attribute (frames from the
+    forecast cache do); the key also covers the plotted range and the theme.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown chart format: {fmt!r} (expected one of {sorted(FORMATS)})")
+    version = df.attrs.get("forecast_version")
+    if version is None:
+        return _draw_green_score(df, start, width, text_color, fmt)
+    cache = cache if cache is not None else get_chart_cache()
+    key = ("green_score", version, len(df), start, width, text_color, fmt)
+    data = cache.get(key)
+    if data is None:
+        data = cache.put(key, _draw_green_score(df, start, width, text_color, fmt))
+    return data
+
+
+def native_frame(df: pd.DataFrame, start: int, width: int) -> pd.DataFrame:
+    """Two-column frame for st.line_chart: the green score and the recommended
+    window (NaN outside it). Cheap for any length; used for long series."""
+    recommended = np.full(len(df), np.nan)
+    recommended[start:start + width] = df["green_score"].to_numpy()[start:start + width]
+    return pd.DataFrame({"Green score": df["green_score"].to_numpy(), "Recommended": recommended}, index=df.index)
+
+
+_cache: Optional[ByteCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_chart_cache() -> ByteCache:
+    """Return the process-wide chart cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ByteCache(DEFAULT_MAX_BYTES)
+    return _cache
@@ -0,0 +1,288 @@
+# utils/events.py
+# Append-only eco-action log. Each award is one fixed-size binary record
+# (user id, timestamp, action code, points) appended to the active segment.
+# Sealed segments are folded into a sorted per-user checkpoint, so totals only
+# scan the segments written since the last compaction and history queries
+# only open segments overlapping the requested time range. Writers in several
+# processes (app replicas) serialize on an flock'd lock file and re-read the
+# manifest under it, so they agree on the active segment and action codes.
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.filelock import FileLock
+
+DEFAULT_LOG_DIR = Path("data") / "events"
+
+RECORD = np.dtype([("user", "<u8"), ("ts", "<i8"), ("action", "<u2"), ("points", "<i4")])
+CHECKPOINT = np.dtype([("user", "<u8"), ("points", "<i8"), ("count", "<i8"), ("last_ts", "<i8")])
+
+SEGMENT_RECORDS = 65536  # ~1.4 MB per segment
+COMPACT_EVERY = 4        # sealed segments pending before an automatic compaction
+
+
+def user_id(username: str) -> int:
+    """Stable 64-bit id for a username (independent of the user store backend)."""
+    return int.from_bytes(hashlib.blake2b(username.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _now_ms() -> int:
+    return int(datetime.now(timezone.utc).timestamp() * 1000)
+
+
+def _write_json(path: Path, payload) -> None:
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(json.dumps(payload))
+    os.replace(tmp, path)
+
+
+class EventLog:
+    """Segmented append-only action log with per-user checkpoints."""
+
+    def __init__(self, root: Path = DEFAULT_LOG_DIR, segment_records: int = SEGMENT_RECORDS,
+                 compact_every: int = COMPACT_EVERY):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.segment_records = segment_records
+        self.compact_every = compact_every
+        self._lock = threading.RLock()
+        self._manifest_path = self.root / "manifest.json"
+        self._actions_path = self.root / "actions.json"
+        self._checkpoint_path = self.root / "checkpoint.npy"
+        self._file_lock = FileLock(self.root / "lock")
+        self._reload_manifest()
+        self._reload_actions()
+
+    def _reload_manifest(self) -> None:
+        self._manifest = self._read_json(self._manifest_path, {"active": 1, "compacted_through": 0, "segments": {}})
+
+    def _reload_actions(self) -> None:
+        self._actions: Dict[str, int] = self._read_json(self._actions_path, {})
+        self._labels = {code: label for label, code in self._actions.items()}
+
+    @staticmethod
+    def _read_json(path: Path, default):
+        if path.exists():
+            return json.loads(path.read_text())
+        return default
+
+    def _segment_path(self, n: int) -> Path:
+        return self.root / f"seg-{n:08d}.evl"
+
+    # ------------------ Action codes ------------------
+    def action_code(self, label: str) -> int:
+        """Return the compact code for an action label, registering it if new."""
+        code = self._actions.get(label)
+        if code is None:
+            with self._lock, self._file_lock:
+                self._reload_actions()  # another process may have registered it
+                code = self._actions.get(label)
+                if code is None:
+                    code = len(self._actions) + 1
+                    self._actions[label] = code
+                    self._labels[code] = label
+                    _write_json(self._actions_path, self._actions)
+        return code
+
+    def action_label(self, code: int) -> str:
+        if int(code) not in self._labels:
+            with self._lock:
+                self._reload_actions()
+        return self._labels.get(int(code), f"action-{int(code)}")
+
+    # ------------------ Writes ------------------
+    def append(self, username: str, action: str, pts: int, ts: Optional[datetime] = None) -> None:
+        """Append one award. O(1): a single fixed-size write to the active segment."""
+        ts_ms = int(ts.timestamp() * 1000) if ts else _now_ms()
+        rec = np.array([(user_id(username), ts_ms, self.action_code(action), int(pts))], dtype=RECORD)
+        with self._lock, self._file_lock:
+            self._reload_manifest()
+            path = self._segment_path(self._manifest["active"])
+            with open(path, "ab") as f:
+                f.write(rec.tobytes())
+                size = f.tell()
+            if size >= self.segment_records * RECORD.itemsize:
+                self._roll()
+
+    def append_many(self, recs: np.ndarray) -> int:
+        """Append a RECORD array (codes from action_code) under one lock, filling
+        and rolling segments as needed. For bulk loads; returns records written."""
+        recs = np.ascontiguousarray(recs, dtype=RECORD)
+        with self._lock, self._file_lock:
+            self._reload_manifest()
+            lo = 0
+            while lo < len(recs):
+                path = self._segment_path(self._manifest["active"])
+                have = path.stat().st_size // RECORD.itemsize if path.exists() else 0
+                part = recs[lo:lo + max(self.segment_records - have, 1)]
+                with open(path, "ab") as f:
+                    f.write(part.tobytes())
+                lo += len(part)
+                if have + len(part) >= self.segment_records:
+                    self._roll()
+        return len(recs)
+
+    def _roll(self) -> None:
+        """Seal the active segment, record its time range and maybe compact."""
+        n = self._manifest["active"]
+        recs = self._read_segment(n)
+        self._manifest["segments"][str(n)] = {
+            "count": int(len(recs)),
+            "min_ts": int(recs["ts"].min()) if len(recs) else 0,
+            "max_ts": int(recs["ts"].max()) if len(recs) else 0,
+        }
+        self._manifest["active"] = n + 1
+        _write_json(self._manifest_path, self._manifest)
+        if n - self._manifest["compacted_through"] >= self.compact_every:
+            self.compact()
+
+    # ------------------ Reads ------------------
+    def _read_segment(self, n: int) -> np.ndarray:
+        path = self._segment_path(n)
+        if not path.exists():
+            return np.empty(0, dtype=RECORD)
+        return np.fromfile(path, dtype=RECORD)
+
+    def _segments_between(self, start_ms: Optional[int], end_ms: Optional[int], first: int = 1) -> Iterator[int]:
+        """Segment numbers that may hold events in [start_ms, end_ms]; always includes the active one."""
+        with self._lock:
+            self._reload_manifest()
+            sealed = dict(self._manifest["segments"])
+            active = self._manifest["active"]
+        for n in range(first, active):
+            info = sealed.get(str(n))
+            if info is None or info["count"] == 0:
+                continue
+            if start_ms is not None and info["max_ts"] < start_ms:
+                continue
+            if end_ms is not None and info["min_ts"] > end_ms:
+                continue
+            yield n
+        if active >= first:
+            yield active
+
+    def scan(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> Iterator[np.ndarray]:
+        """Yield record arrays, one per relevant segment, filtered to [start, end]."""
+        start_ms = int(start.timestamp() * 1000) if start else None
+        end_ms = int(end.timestamp() * 1000) if end else None
+        for n in self._segments_between(start_ms, end_ms):
+            recs = self._read_segment(n)
+            if start_ms is not None:
+                recs = recs[recs["ts"] >= start_ms]
+            if end_ms is not None:
+                recs = recs[recs["ts"] <= end_ms]
+            if len(recs):
+                yield recs
+
+    def read_since(self, segment: int, offset: int) -> Iterator[Tuple[int, int, np.ndarray]]:
+        """Records appended after the cursor (segment, record offset), as
+        (segment, offset after these records, records) per segment. Feed the
+        last yielded (segment, offset) back in to continue incrementally."""
+        with self._lock:
+            self._reload_manifest()
+            active = self._manifest["active"]
+        for n in range(max(segment, 1), active + 1):
+            start = offset if n == segment else 0
+            path = self._segment_path(n)
+            # Whole records only: a concurrent append may be half-written.
+            count = (path.stat().st_size // RECORD.itemsize - start) if path.exists() else 0
+            if count > 0:
+                recs = np.fromfile(path, dtype=RECORD, count=count, offset=start * RECORD.itemsize)
+            else:
+                recs = np.empty(0, dtype=RECORD)
+            yield n, start + len(recs), recs
+
+    def history(self, username: str, start: Optional[datetime] = None, end: Optional[datetime] = None) -> pd.DataFrame:
+        """Return a user's actions as a DataFrame (time, action, points), oldest first."""
+        uid = np.uint64(user_id(username))
+        parts = [recs[recs["user"] == uid] for recs in self.scan(start, end)]
+        recs = np.concatenate(parts) if parts else np.empty(0, dtype=RECORD)
+        return pd.DataFrame({
+            "time": pd.to_datetime(recs["ts"], unit="ms", utc=True),
+            "action": [self.action_label(c) for c in recs["action"]],
+            "points": recs["points"].astype(int),
+        })
+
+    def totals(self, username: str) -> Dict[str, int]:
+        """Points and action count for a user: checkpoint + uncompacted segments."""
+        uid = np.uint64(user_id(username))
+        points, count = 0, 0
+        with self._lock, self._file_lock:  # checkpoint and manifest from the same compaction
+            self._reload_manifest()
+            first = self._manifest["compacted_through"] + 1
+            ckpt = self._load_checkpoint()
+        i = int(np.searchsorted(ckpt["user"], uid))
+        if i < len(ckpt) and ckpt["user"][i] == uid:
+            points, count = int(ckpt["points"][i]), int(ckpt["count"][i])
+        for n in self._segments_between(None, None, first=first):
+            recs = self._read_segment(n)
+            mine = recs[recs["user"] == uid]
+            points += int(mine["points"].sum())
+            count += len(mine)
+        return {"points": points, "count": count}
+
+    # ------------------ Compaction ------------------
+    def _load_checkpoint(self) -> np.ndarray:
+        if self._checkpoint_path.exists():
+            return np.load(self._checkpoint_path, mmap_mode="r")
+        return np.empty(0, dtype=CHECKPOINT)
+
+    def compact(self) -> int:
+        """Fold every sealed, not yet compacted segment into the per-user checkpoint."""
+        with self._lock, self._file_lock:
+            self._reload_manifest()
+            start = self._manifest["compacted_through"] + 1
+            stop = self._manifest["active"]
+            if start >= stop:
+                return 0
+            parts = [self._read_segment(n) for n in range(start, stop)]
+            recs = np.concatenate(parts) if parts else np.empty(0, dtype=RECORD)
+            ckpt = np.array(self._load_checkpoint())
+
+            users = np.concatenate([ckpt["user"], recs["user"]])
+            points = np.concatenate([ckpt["points"], recs["points"].astype(np.int64)])
+            counts = np.concatenate([ckpt["count"], np.ones(len(recs), dtype=np.int64)])
+            last_ts = np.concatenate([ckpt["last_ts"], recs["ts"]])
+
+            uniq, inv = np.unique(users, return_inverse=True)
+            merged = np.zeros(len(uniq), dtype=CHECKPOINT)
+            merged["user"] = uniq
+            merged["points"] = np.bincount(inv, weights=points, minlength=len(uniq)).astype(np.int64)
+            merged["count"] = np.bincount(inv, weights=counts, minlength=len(uniq)).astype(np.int64)
+            merged["last_ts"] = np.iinfo(np.int64).min
+            np.maximum.at(merged["last_ts"], inv, last_ts)
+
+            tmp = self._checkpoint_path.with_name("checkpoint.tmp.npy")
+            np.save(tmp, merged)
+            os.replace(tmp, self._checkpoint_path)
+            self._manifest["compacted_through"] = stop - 1
+            _write_json(self._manifest_path, self._manifest)
+            return len(recs)
+
+
+_log: Optional[EventLog] = None
+_log_lock = threading.Lock()
+
+
+def set_event_log(log: Optional[EventLog]) -> None:
+    """Replace the process-wide default event log (None re-opens the default on next use)."""
+    global _log
+    with _log_lock:
+        _log = log
+
+
+def get_event_log() -> EventLog:
+    """Return the process-wide default event log."""
+    global _log
+    if _log is None:
+        with _log_lock:
+            if _log is None:
+                _log = EventLog()
+    return _log
@@ -0,0 +1,189 @@
+# utils/exports.py
+# Streaming exports. A source is an iterator of DataFrame chunks (forecasts,
+# plans, the user table, the action history); a writer consumes it one chunk
+# at a time as CSV, Parquet or Arrow IPC, so memory stays bounded by the chunk
+# size whatever the table size. Parquet and Arrow need pyarrow (optional).
+#
+#   python -m utils.exports users --format parquet --out users.parquet
+#   python -m utils.exports history --username alice --format csv --out -
+import argparse
+import importlib.util
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from utils.events import EventLog, get_event_log, user_id
+from utils.store import USER_COLUMNS, UserStore, get_store
+
+CHUNK_ROWS = 50_000
+
+# fmt -> (mime type, file extension)
+FORMATS = {
+    "csv": ("text/csv", ".csv"),
+    "parquet": ("application/vnd.apache.parquet", ".parquet"),
+    "arrow": ("application/vnd.apache.arrow.file", ".arrow"),
+}
+
+
+def available_formats() -> List[str]:
+    """Formats usable here: CSV always, Parquet and Arrow when pyarrow is installed."""
+    if importlib.util.find_spec("pyarrow") is None:
+        return ["csv"]
+    return list(FORMATS)
+
+
+# ------------------ Sources ------------------
+def frame_chunks(df: pd.DataFrame, rows: int = CHUNK_ROWS, index: bool = True) -> Iterator[pd.DataFrame]:
+    """An in-memory frame (forecast, plan) as chunks; a named index becomes a column."""
+    if index and df.index.name is not None:
+        df = df.reset_index()
+    for lo in range(0, max(len(df), 1), rows):
+        yield df.iloc[lo:lo + rows]
+
+
+def user_chunks(store: Optional[UserStore] = None, rows: int = CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """The user table in username order, without password hashes."""
+    store = store if store is not None else get_store()
+    empty = True
+    for batch in store.iter_users(rows):
+        empty = False
+        yield pd.DataFrame.from_records(batch).drop(columns="password", errors="ignore")
+    if empty:
+        yield pd.DataFrame(columns=[c for c in USER_COLUMNS if c != "password"])
+
+
+def history_chunks(log: Optional[EventLog] = None, username: Optional[str] = None,
+                   start: Optional[datetime] = None, end: Optional[datetime] = None) -> Iterator[pd.DataFrame]:
+    """Action history, one chunk per event-log segment (time, user_id, action, points).
+    With `username`, only that user's events."""
+    log = log if log is not None else get_event_log()
+    uid = np.uint64(user_id(username)) if username else None
+    empty = True
+    for recs in log.scan(start, end):
+        if uid is not None:
+            recs = recs[recs["user"] == uid]
+            if not len(recs):
+                continue
+        empty = False
+        codes, inverse = np.unique(recs["action"], return_inverse=True)
+        labels = np.array([log.action_label(c) for c in codes], dtype=object)
+        yield pd.DataFrame({
+            "time": pd.to_datetime(recs["ts"], unit="ms", utc=True),
+            "user_id": [f"{u:016x}" for u in recs["user"]],
+            "action": labels[inverse],
+            "points": recs["points"].astype(np.int64),
+        })
+    if empty:
+        yield pd.DataFrame({"time": pd.to_datetime([], utc=True), "user_id": pd.Series([], dtype=object),
+                            "action": pd.Series([], dtype=object), "points": pd.Series([], dtype=np.int64)})
+
+
+# ------------------ Writers ------------------
+def _write_csv(chunks: Iterable[pd.DataFrame], dest: BinaryIO) -> int:
+    text = io.TextIOWrapper(dest, encoding="utf-8", newline="")
+    rows, header = 0, True
+    try:
+        for chunk in chunks:
+            chunk.to_csv(text, index=False, header=header)
+            header = False
+            rows += len(chunk)
+        text.flush()
+    finally:
+        text.detach()  # leave dest open for the caller
+    return rows
+
+
+def _write_arrow(chunks: Iterable[pd.DataFrame], dest: BinaryIO, fmt: str) -> int:
+    import pyarrow as pa
+
+    writer, schema, rows = None, None, 0
+    try:
+        for chunk in chunks:
+            if schema is None:
+                table = pa.Table.from_pandas(chunk, preserve_index=False)
+                schema = table.schema.remove_metadata()
+                if fmt == "parquet":
+                    import pyarrow.parquet as pq
+                    writer = pq.ParquetWriter(dest, schema)
+                else:
+                    writer = pa.ipc.new_file(dest, schema)
+            table = pa.Table.from_pandas(chunk, schema=schema, preserve_index=False)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def export(chunks: Iterable[pd.DataFrame], fmt: str, dest: BinaryIO) -> int:
+    """Stream chunks to a binary file object. Returns the number of rows written."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unknown export format: {fmt!r} (expected one of {sorted(FORMATS)})")
+    if fmt == "csv":
+        return _write_csv(chunks, dest)
+    if fmt not in available_formats():
+        raise RuntimeError(f"{fmt} export requires pyarrow: pip install pyarrow")
+    return _write_arrow(chunks, dest, fmt)
+
+
+def export_file(chunks: Iterable[pd.DataFrame], fmt: str, path: Path) -> int:
+    """Export to `path`, replacing it atomically."""
+    path = Path(path)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp, "wb") as f:
+            rows = export(chunks, fmt, f)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    return rows
+
+
+def export_tempfile(chunks: Iterable[pd.DataFrame], fmt: str) -> BinaryIO:
+    """Export into an anonymous temporary file, rewound for reading (e.g. by
+    st.download_button); nothing but the current chunk is held in memory while
+    it is written. Whoever reads the file decides what is held after that."""
+    f = tempfile.TemporaryFile()
+    export(chunks, fmt, f)
+    f.seek(0)
+    return f
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Export the user table or the action history.")
+    parser.add_argument("source", choices=["users", "history"])
+    parser.add_argument("--format", choices=sorted(FORMATS), default="csv")
+    parser.add_argument("--out", default="-", help="output file (default: stdout)")
+    parser.add_argument("--username", help="history: only this user's events")
+    parser.add_argument("--start", type=pd.Timestamp, help="history: from this time (UTC)")
+    parser.add_argument("--end", type=pd.Timestamp, help="history: up to this time (UTC)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    if args.source == "users":
+        chunks = user_chunks(rows=args.chunk_rows)
+    else:
+        utc = lambda ts: None if ts is None else (ts.tz_localize("UTC") if ts.tzinfo is None else ts).to_pydatetime()
+        chunks = history_chunks(username=args.username, start=utc(args.start), end=utc(args.end))
+    t0 = time.perf_counter()
+    if args.out == "-":
+        rows = export(chunks, args.format, sys.stdout.buffer)
+        sys.stdout.flush()
+    else:
+        rows = export_file(chunks, args.format, Path(args.out))
+    elapsed = time.perf_counter() - t0
+    print(f"{rows} rows as {args.format} in {elapsed:.2f}s ({rows / max(elapsed, 1e-9):,.0f}/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+# utils/filelock.py
+# Exclusive lock shared by threads and processes (several app replicas on one
+# data/ volume). Uses flock(2) on a sidecar lock file; where fcntl is not
+# available (Windows) it degrades to a process-local lock.
+import os
+import threading
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX
+    fcntl = None
+
+
+class FileLock:
+    """Re-entrant (per instance) exclusive lock on `path`.
+
+    The lock file is opened once and kept open; `fd` can be used to keep a
+    small piece of shared state in it (e.g. a write counter) while locked.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._thread_lock = threading.RLock()
+        self._depth = 0
+        self._fd = None
+
+    @property
+    def fd(self) -> int:
+        if self._fd is None:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        return self._fd
+
+    def __enter__(self) -> "FileLock":
+        self._thread_lock.acquire()
+        if self._depth == 0 and fcntl is not None:
+            try:
+                fcntl.flock(self.fd, fcntl.LOCK_EX)
+            except BaseException:
+                self._thread_lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._depth -= 1
+        if self._depth == 0 and fcntl is not None:
+            fcntl.flock(self.fd, fcntl.LOCK_UN)
+        self._thread_lock.release()
+
+    def read_counter(self) -> int:
+        """Integer stored in the lock file (0 if empty). Call while holding the lock."""
+        raw = os.pread(self.fd, 32, 0).strip()
+        return int(raw) if raw else 0
+
+    def write_counter(self, value: int) -> None:
+        data = str(int(value)).encode()
+        os.pwrite(self.fd, data.ljust(32), 0)
+
+    def close(self) -> None:
+        with self._thread_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
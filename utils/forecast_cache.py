@@ -0,0 +1,222 @@
+# utils/forecast_cache.py
+# Disk-backed forecast cache shared by every session and worker process.
+# Coordinates are snapped to a grid cell (0.1° ≈ 11 km by default), so nearby
+# users and differently formatted inputs ("19.07" vs "19.070") hit the same
+# entry. Entries live in SQLite with a TTL and least-recently-used eviction,
+# and survive container restarts as long as data/ is persisted. Concurrent
+# misses for one entry share a single upstream fetch (utils.singleflight).
+import math
+import sqlite3
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from utils.singleflight import SingleFlight
+
+DEFAULT_CACHE_PATH = Path("data") / "forecast_cache.db"
+DEFAULT_GRID_DEG = 0.1
+DEFAULT_TTL_S = 15 * 60
+DEFAULT_MAX_ENTRIES = 5000
+MIN_FETCH_DAYS = 3  # the Charging page's 24h export and 72h plan share one entry
+
+
+def snap(lat: float, lon: float, grid: float = DEFAULT_GRID_DEG) -> Tuple[float, float, str]:
+    """Snap a coordinate to the centre of its grid cell. Returns (lat, lon, cell key)."""
+    i = math.floor(float(lat) / grid)
+    j = math.floor(float(lon) / grid)
+    digits = max(0, -math.floor(math.log10(grid)) + 1)
+    c_lat = round((i + 0.5) * grid, digits)
+    c_lon = round((j + 0.5) * grid, digits)
+    return c_lat, c_lon, f"{grid:g}:{i}:{j}"
+
+
+class ForecastCache:
+    """SQLite forecast store keyed by (provider, grid cell, horizon) with TTL + LRU."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS forecasts (
+        key         TEXT PRIMARY KEY,
+        fetched_at  REAL NOT NULL,
+        accessed_at REAL NOT NULL,
+        payload     TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS forecasts_accessed ON forecasts (accessed_at);
+    """
+
+    def __init__(self, path: Path = DEFAULT_CACHE_PATH, grid: float = DEFAULT_GRID_DEG,
+                 ttl_s: float = DEFAULT_TTL_S, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.grid = grid
+        self.ttl_s = ttl_s
+        self.max_entries = max_entries
+        self._local = threading.local()
+        self._flights = SingleFlight()
+        with self._conn() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _decode(key: str, fetched_at: float, payload: str) -> pd.DataFrame:
+        df = pd.read_json(StringIO(payload), orient="split")
+        df.index = pd.to_datetime(df.index, utc=True).rename("time")
+        df.attrs["forecast_version"] = f"{key}@{fetched_at:.0f}"
+        return df
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """Cached frame for `key`, or None if missing or older than the TTL."""
+        conn = self._conn()
+        row = conn.execute("SELECT fetched_at, payload FROM forecasts WHERE key = ?", (key,)).fetchone()
+        now = time.time()
+        if row is None or now - row[0] > self.ttl_s:
+            return None
+        with conn:
+            conn.execute("UPDATE forecasts SET accessed_at = ? WHERE key = ?", (now, key))
+        return self._decode(key, row[0], row[1])
+
+    def put(self, key: str, df: pd.DataFrame) -> pd.DataFrame:
+        """Store a frame and evict least-recently-used entries beyond max_entries."""
+        now = time.time()
+        payload = df.to_json(orient="split", date_format="iso")
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO forecasts (key, fetched_at, accessed_at, payload) VALUES (?, ?, ?, ?)",
+                (key, now, now, payload),
+            )
+            conn.execute(
+                "DELETE FROM forecasts WHERE key IN ("
+                "  SELECT key FROM forecasts ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+        out = df.copy()
+        out.attrs["forecast_version"] = f"{key}@{now:.0f}"
+        return out
+
+    def purge_expired(self) -> int:
+        with self._conn() as conn:
+            cur = conn.execute("DELETE FROM forecasts WHERE fetched_at < ?", (time.time() - self.ttl_s,))
+        return cur.rowcount
+
+    def get_or_fetch(self, provider: str, lat: float, lon: float, hours: int,
+                     fetch: Callable[[float, float, int], pd.DataFrame]) -> pd.DataFrame:
+        """Return the forecast for the grid cell containing (lat, lon), fetching on a miss.
+
+        Misses are fetched for the cell centre with the horizon rounded up to
+        whole days (at least MIN_FETCH_DAYS), so shorter horizons share one entry.
+        Sessions missing the same entry at the same time wait for one fetch.
+        """
+        c_lat, c_lon, cell = snap(lat, lon, self.grid)
+        days = max(MIN_FETCH_DAYS, math.ceil(hours / 24))
+        key = f"{provider}:{cell}:{days}d"
+        df = self.get(key)
+        if df is None:
+            def fill() -> pd.DataFrame:
+                # Another process (or a flight that just landed) may have stored it meanwhile.
+                cached = self.get(key)
+                return cached if cached is not None else self.put(key, fetch(c_lat, c_lon, days * 24))
+            df = self._flights.do(key, fill)
+        version = df.attrs.get("forecast_version")
+        df = df.iloc[:hours].copy()
+        df.attrs["forecast_version"] = version
+        return df
+
+    def _fetch_claimed(self, claimed: List[str], cells: Dict[str, Tuple[float, float]], days: int,
+                       fetch_many: Callable[..., List[pd.DataFrame]], frames: Dict) -> None:
+        """Fetch the keys this caller leads in one fetch_many call, store them in
+        `frames` and settle every one of them, whatever happens."""
+        outcome: Dict[str, object] = {}
+        try:
+            todo = []
+            for key in claimed:
+                # Another process (or a flight that just landed) may have stored it meanwhile.
+                cached = self.get(key)
+                if cached is None:
+                    todo.append(key)
+                else:
+                    outcome[key] = cached
+            if todo:
+                fetched = list(fetch_many([cells[key] for key in todo], hours=days * 24))
+                if len(fetched) != len(todo):
+                    raise RuntimeError(f"fetch_many returned {len(fetched)} frames for {len(todo)} cells")
+                for key, df in zip(todo, fetched):
+                    outcome[key] = df if isinstance(df, BaseException) else self.put(key, df)
+        except BaseException as exc:
+            for key in claimed:
+                if key not in outcome:
+                    self._flights.settle(key, exc=exc)
+            raise
+        finally:
+            for key, result in outcome.items():
+                if isinstance(result, BaseException):
+                    self._flights.settle(key, exc=result)
+                else:
+                    self._flights.settle(key, result)
+        frames.update(outcome)
+
+    def get_or_fetch_many(self, provider: str, coords: Sequence[Tuple[float, float]], hours: int,
+                          fetch_many: Callable[..., List[pd.DataFrame]]) -> List[pd.DataFrame]:
+        """Batch variant of get_or_fetch: cache hits are served locally and all
+        distinct missing cells go to `fetch_many(cell_coords, hours=...)` in one call.
+        Exceptions returned by `fetch_many` (return_exceptions=True) are not cached
+        and come back unchanged in place of those frames.
+
+        Missing cells share in-flight fetches with concurrent get_or_fetch and
+        batch callers: this call fetches only the cells nobody else is fetching
+        and waits for the rest. A cell whose other fetch failed is fetched again
+        here, so failures follow this caller's `fetch_many` semantics.
+        """
+        days = max(MIN_FETCH_DAYS, math.ceil(hours / 24))
+        keys, frames, missing = [], {}, {}
+        for lat, lon in coords:
+            c_lat, c_lon, cell = snap(lat, lon, self.grid)
+            key = f"{provider}:{cell}:{days}d"
+            keys.append(key)
+            if key not in frames and key not in missing:
+                df = self.get(key)
+                if df is None:
+                    missing[key] = (c_lat, c_lon)
+                else:
+                    frames[key] = df
+        while missing:
+            claimed, waiting = self._flights.claim(missing)
+            if claimed:
+                self._fetch_claimed(claimed, missing, days, fetch_many, frames)
+            for key, fut in waiting.items():
+                if fut.exception() is None:
+                    frames[key] = fut.result()
+            missing = {key: cell for key, cell in missing.items() if key not in frames}
+        out = []
+        for key in keys:
+            if isinstance(frames[key], BaseException):
+                out.append(frames[key])
+                continue
+            df = frames[key].iloc[:hours].copy()
+            df.attrs["forecast_version"] = frames[key].attrs.get("forecast_version")
+            out.append(df)
+        return out
+
+
+_cache: Optional[ForecastCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_forecast_cache() -> ForecastCache:
+    """Return the process-wide default forecast cache."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ForecastCache()
+    return _cache
@@ -0,0 +1,231 @@
+# utils/leaderboard.py
+# Incrementally maintained leaderboard. Entries live in an indexable skip list
+# ordered by (-points, username); every level stores link widths, so top-k,
+# rank and neighbour queries are O(log n + k) instead of a full sort per rerun.
+# When the user table reloads, sync() diffs the new frame against the last one
+# in pandas and only moves the users whose points changed.
+import random
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+_MAX_LEVEL = 32
+
+Key = Tuple[int, str]  # (-points, username)
+
+
+class _Node:
+    __slots__ = ("key", "next", "width")
+
+    def __init__(self, key: Optional[Key], level: int):
+        self.key = key
+        self.next: List[Optional["_Node"]] = [None] * level
+        self.width: List[int] = [1] * level
+
+
+class IndexableSkipList:
+    """Sorted container with O(log n) insert, remove, rank and positional access."""
+
+    def __init__(self):
+        self._head = _Node(None, _MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    @staticmethod
+    def _random_level() -> int:
+        level = 1
+        while level < _MAX_LEVEL and random.random() < 0.5:
+            level += 1
+        return level
+
+    def _path(self, key: Key) -> Tuple[List[_Node], List[int]]:
+        """Rightmost node before `key` on each level, with its 0-based position (head = -1)."""
+        update = [self._head] * _MAX_LEVEL
+        pos = [-1] * _MAX_LEVEL
+        node, p = self._head, -1
+        for lvl in range(self._level - 1, -1, -1):
+            while node.next[lvl] is not None and node.next[lvl].key < key:
+                p += node.width[lvl]
+                node = node.next[lvl]
+            update[lvl], pos[lvl] = node, p
+        return update, pos
+
+    def insert(self, key: Key) -> None:
+        update, pos = self._path(key)
+        level = self._random_level()
+        if level > self._level:
+            for lvl in range(self._level, level):
+                update[lvl], pos[lvl] = self._head, -1
+                self._head.width[lvl] = self._size + 1
+            self._level = level
+        node = _Node(key, level)
+        new_pos = pos[0] + 1
+        for lvl in range(level):
+            prev = update[lvl]
+            node.next[lvl] = prev.next[lvl]
+            prev.next[lvl] = node
+            # Split the predecessor's span around the new node.
+            node.width[lvl] = prev.width[lvl] - (new_pos - pos[lvl]) + 1
+            prev.width[lvl] = new_pos - pos[lvl]
+        for lvl in range(level, self._level):
+            update[lvl].width[lvl] += 1
+        self._size += 1
+
+    def remove(self, key: Key) -> bool:
+        update, _ = self._path(key)
+        node = update[0].next[0]
+        if node is None or node.key != key:
+            return False
+        for lvl in range(self._level):
+            prev = update[lvl]
+            if prev.next[lvl] is node:
+                prev.width[lvl] += node.width[lvl] - 1
+                prev.next[lvl] = node.next[lvl]
+            else:
+                prev.width[lvl] -= 1
+        while self._level > 1 and self._head.next[self._level - 1] is None:
+            self._level -= 1
+        self._size -= 1
+        return True
+
+    def rank(self, key: Key) -> Optional[int]:
+        """0-based position of `key`, or None if absent."""
+        update, pos = self._path(key)
+        node = update[0].next[0]
+        return pos[0] + 1 if node is not None and node.key == key else None
+
+    def slice(self, start: int, stop: int) -> List[Key]:
+        """Keys at positions [start, stop)."""
+        start, stop = max(0, start), min(self._size, stop)
+        if start >= stop:
+            return []
+        node, p = self._head, -1
+        for lvl in range(self._level - 1, -1, -1):
+            while node.next[lvl] is not None and p + node.width[lvl] < start:
+                p += node.width[lvl]
+                node = node.next[lvl]
+        out = []
+        node = node.next[0]
+        while node is not None and len(out) < stop - start:
+            out.append(node.key)
+            node = node.next[0]
+        return out
+
+
+class Leaderboard:
+    """Thread-safe points leaderboard shared by every session in the process."""
+
+    COLUMNS = ["rank", "username", "vehicle_type", "points"]
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = IndexableSkipList()
+        self._points: Dict[str, int] = {}
+        self._vehicle: Dict[str, str] = {}
+        self.version = None  # version of the frame last passed to sync()
+        self._synced = pd.DataFrame({"points": pd.Series(dtype="int64"), "vehicle": pd.Series(dtype=object)},
+                                    index=pd.Index([], dtype=object, name="username"))
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "Leaderboard":
+        board = cls()
+        board.sync(df)
+        return board
+
+    def sync(self, df: pd.DataFrame, version=None) -> int:
+        """Bring the board in line with a users frame (username, points and
+        optionally vehicle_type). The frame is diffed against the board in
+        pandas and only added, changed and removed users touch the skip list,
+        so a reload after a few awards costs a few updates, not a rebuild.
+        With a `version`, a board already synced to it is left alone. Returns
+        the number of users updated or removed."""
+        if df is None:
+            df = pd.DataFrame(columns=["username", "points"])
+        names = df["username"].astype(str).to_numpy(dtype=object)
+        points = pd.to_numeric(df["points"], errors="coerce").fillna(0).astype("int64").to_numpy()
+        if "vehicle_type" in df.columns:
+            vehicles = df["vehicle_type"].fillna("").astype(str).to_numpy(dtype=object)
+        else:
+            vehicles = np.full(len(df), "", dtype=object)
+        with self._lock:
+            if version is not None and version == self.version:
+                return 0
+            new = pd.DataFrame({"points": points, "vehicle": vehicles}, index=pd.Index(names, name="username"))
+            # Diff against the frame of the last sync: users updated since then
+            # were written to the store too, so they show up as changed.
+            pos = self._synced.index.get_indexer(new.index)
+            known = pos >= 0
+            changed = ~known
+            changed[known] = ((self._synced["points"].to_numpy()[pos[known]] != points[known])
+                              | (self._synced["vehicle"].to_numpy()[pos[known]] != vehicles[known]))
+            kept = np.zeros(len(self._synced), dtype=bool)
+            kept[pos[known]] = True
+            gone = self._synced.index[~kept].tolist()
+            for name in gone:
+                self._remove(name)
+            for name, pts, vehicle in zip(names[changed].tolist(), points[changed].tolist(),
+                                          vehicles[changed].tolist()):
+                self._update(name, pts, vehicle)
+            self._synced = new
+            self.version = version
+            return len(gone) + int(changed.sum())
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def update(self, username: str, points: int, vehicle_type: Optional[str] = None) -> None:
+        """Insert a user or move them to their new points total."""
+        with self._lock:
+            self._update(username, points, vehicle_type)
+
+    def _update(self, username: str, points: int, vehicle_type: Optional[str]) -> None:
+        if vehicle_type is not None:
+            self._vehicle[username] = vehicle_type
+        old = self._points.get(username)
+        if old == points:
+            return
+        if old is not None:
+            self._index.remove((-old, username))
+        self._points[username] = int(points)
+        self._index.insert((-int(points), username))
+
+    def remove(self, username: str) -> None:
+        with self._lock:
+            self._remove(username)
+
+    def _remove(self, username: str) -> None:
+        old = self._points.pop(username, None)
+        if old is not None:
+            self._index.remove((-old, username))
+        self._vehicle.pop(username, None)
+
+    def rank(self, username: str) -> Optional[int]:
+        """1-based rank of a user, or None if not on the board."""
+        with self._lock:
+            pts = self._points.get(username)
+            if pts is None:
+                return None
+            return self._index.rank((-pts, username)) + 1
+
+    def _rows(self, start: int, stop: int) -> List[Tuple[int, str, str, int]]:
+        keys = self._index.slice(start, stop)
+        return [(start + i + 1, name, self._vehicle.get(name, ""), -neg) for i, (neg, name) in enumerate(keys)]
+
+    def top(self, k: int = 10) -> pd.DataFrame:
+        """Top-k users as a DataFrame (rank, username, vehicle_type, points)."""
+        with self._lock:
+            return pd.DataFrame(self._rows(0, k), columns=self.COLUMNS)
+
+    def around(self, username: str, n: int = 2) -> pd.DataFrame:
+        """The user plus up to `n` neighbours above and below."""
+        with self._lock:
+            pts = self._points.get(username)
+            if pts is None:
+                return pd.DataFrame(columns=self.COLUMNS)
+            pos = self._index.rank((-pts, username))
+            return pd.DataFrame(self._rows(max(0, pos - n), pos + n + 1), columns=self.COLUMNS)
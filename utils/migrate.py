@@ -0,0 +1,287 @@
+# utils/migrate.py
+# Bulk import of legacy user data into the user store and event log. Reads
+# data/users.csv in chunks (broken `username,0,points,...` header and stray
+# rows are cleaned per chunk) and the old login page's users.json
+# incrementally, so memory stays bounded by the chunk size. The `actions`
+# strings in either legacy encoding become event-log records:
+#
+#   2025-09-09T20:09:49.123456::Charge during green hours::8|...   (auth.py)
+#   \n- [2025-09-09] Charge during green hours                     (app.py, no points)
+#
+# Users are deduplicated by the target store's primary key: each chunk is one
+# insert_new() transaction, the first occurrence of a username wins and users
+# already in the store are never overwritten, so the migration can be re-run.
+# Events are only imported for users the run actually inserted.
+#
+#   python -m utils.migrate --csv data/users.csv --json users.json
+import argparse
+import hashlib
+import json
+import re
+import sys
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.events import DEFAULT_LOG_DIR, RECORD, EventLog, user_id
+from utils.passwords import scheme
+from utils.store import (BACKENDS, DEFAULT_CSV_PATH, DEFAULT_SQLITE_PATH, USER_COLUMNS, SQLiteUserStore,
+                         UserStore, clean_frame)
+
+DEFAULT_JSON_PATH = Path("users.json")
+CHUNK_ROWS = 50_000
+JSON_READ_BYTES = 1 << 20
+INVALID_TS = np.iinfo(np.int64).min
+
+_POINTS_ENTRY = re.compile(r"^(?P<ts>.+?)::(?P<label>.+)::(?P<pts>-?\d+)$")
+_DATED_LINE = re.compile(r"^-\s*\[(?P<day>\d{4}-\d{2}-\d{2})\]\s*(?P<label>.+)$")
+
+
+@dataclass
+class MigrationStats:
+    rows: int = 0            # CSV rows read (before cleaning)
+    users: int = 0           # users inserted
+    existing: int = 0        # rows skipped: username already in the store or seen earlier
+    json_users: int = 0      # users.json entries read
+    events: int = 0          # event-log records written
+    unparsed: int = 0        # action entries in neither encoding (kept in the actions column)
+    elapsed_s: float = 0.0
+
+
+# ------------------ Action strings ------------------
+def split_actions(text: str) -> Tuple[List[Tuple[str, str, int, str]], List[str]]:
+    """Split a legacy actions string into (timestamp text, label, points, entry)
+    tuples and the entries that matched neither encoding. Both encodings may
+    appear in one string."""
+    entries, unparsed = [], []
+    for entry in re.split(r"[|\n]", text or ""):
+        entry = entry.strip()
+        if not entry:
+            continue
+        m = _POINTS_ENTRY.match(entry)
+        if m:
+            entries.append((m["ts"], m["label"].strip(), int(m["pts"]), entry))
+            continue
+        m = _DATED_LINE.match(entry)
+        if m:
+            entries.append((m["day"], m["label"].strip(), 0, entry))  # this encoding never stored points
+            continue
+        unparsed.append(entry)
+    return entries, unparsed
+
+
+def _utc_ms(stamps: List[str]) -> np.ndarray:
+    """Epoch ms per ISO timestamp or date (naive ones are taken as UTC), INVALID_TS
+    where unparseable. Parsed for a whole chunk at once: per-entry datetime
+    parsing dominated the run."""
+    parsed = pd.to_datetime(pd.Series(stamps, dtype=object), format="ISO8601", utc=True, errors="coerce")
+    ms = parsed.dt.as_unit("ms").array.asi8.copy()
+    ms[parsed.isna().to_numpy()] = INVALID_TS
+    return ms
+
+
+def parse_actions(text: str) -> Tuple[List[Tuple[int, str, int]], List[str]]:
+    """Legacy actions string -> (ts_ms, label, points) events and unparsed entries."""
+    entries, unparsed = split_actions(text)
+    stamps = _utc_ms([ts for ts, _, _, _ in entries])
+    events = [(int(ms), label, pts) for ms, (_, label, pts, _) in zip(stamps, entries) if ms != INVALID_TS]
+    unparsed += [entry for ms, (_, _, _, entry) in zip(stamps, entries) if ms == INVALID_TS]
+    return events, unparsed
+
+
+# ------------------ Sources ------------------
+def csv_chunks(path: Path, rows: int = CHUNK_ROWS) -> Iterator[Tuple[int, pd.DataFrame]]:
+    """(raw row count, cleaned frame) per chunk of a legacy users.csv."""
+    reader = pd.read_csv(path, dtype=str, keep_default_na=False, chunksize=rows, on_bad_lines="skip")
+    with reader:
+        for chunk in reader:
+            yield len(chunk), clean_frame(chunk)
+
+
+def json_users(path: Path, read_bytes: int = JSON_READ_BYTES) -> Iterator[Tuple[str, str]]:
+    """(username, password) pairs of a flat users.json object, decoded a buffer
+    at a time instead of loading the whole file. Non-string values are skipped."""
+    decoder = json.JSONDecoder()
+    ws = re.compile(r"\s*")
+    with open(path, encoding="utf-8") as f:
+        buf, pos, eof = "", 0, False
+
+        def fill() -> bool:
+            nonlocal buf, pos, eof
+            more = f.read(read_bytes)
+            eof = not more
+            buf, pos = buf[pos:] + more, 0
+            return not eof
+
+        def token():
+            """Next JSON value or delimiter; refills when it may run past the buffer."""
+            nonlocal pos
+            while True:
+                pos = ws.match(buf, pos).end()
+                if pos < len(buf) and buf[pos] in "{}:,":
+                    pos += 1
+                    return buf[pos - 1]
+                try:
+                    value, end = decoder.raw_decode(buf, pos)
+                except ValueError:
+                    value, end = None, -1
+                if end != -1 and (end < len(buf) or eof):
+                    pos = end
+                    return value
+                if not fill():
+                    if pos >= len(buf):
+                        return None
+                    raise ValueError(f"{path}: malformed JSON near offset {pos}")
+
+        if token() != "{":
+            return  # empty file, or not the {username: password} map auth.py reads
+        while True:
+            key = token()
+            if key in ("}", None):
+                return
+            if token() != ":":
+                raise ValueError(f"{path}: expected ':' after {key!r}")
+            value = token()
+            if isinstance(key, str) and isinstance(value, str):
+                yield key, value
+            if token() != ",":
+                return
+
+
+# ------------------ Load ------------------
+class Migration:
+    """One import run into `store` and `log`; call load_csv() and load_json(), then read stats."""
+
+    def __init__(self, store: UserStore, log: EventLog,
+                 progress: Optional[Callable[[MigrationStats], None]] = None):
+        self.store = store
+        self.log = log
+        self.stats = MigrationStats()
+        self._codes: Dict[str, int] = {}
+        self._progress = progress
+        self._t0 = time.perf_counter()
+
+    def _report(self) -> None:
+        self.stats.elapsed_s = round(time.perf_counter() - self._t0, 2)
+        if self._progress is not None:
+            self._progress(self.stats)
+
+    def _code(self, label: str) -> int:
+        code = self._codes.get(label)
+        if code is None:
+            code = self._codes[label] = self.log.action_code(label)
+        return code
+
+    def _events(self, frame: pd.DataFrame) -> np.ndarray:
+        """Event records for `frame`'s actions; the actions column keeps only
+        the entries that could not be parsed."""
+        users, stamps, codes, points, owners, raw = [], [], [], [], [], []
+        leftover = []
+        for row, (name, text) in enumerate(zip(frame["username"].tolist(), frame["actions"].tolist())):
+            entries, unparsed = split_actions(text)
+            leftover.append(unparsed)
+            uid = user_id(name)
+            for ts, label, pts, entry in entries:
+                users.append(uid); stamps.append(ts); codes.append(self._code(label)); points.append(pts)
+                owners.append(row); raw.append(entry)
+        ms = _utc_ms(stamps)
+        for i in np.flatnonzero(ms == INVALID_TS):
+            leftover[owners[i]].append(raw[i])
+        self.stats.unparsed += sum(len(u) for u in leftover)
+        frame["actions"] = ["\n".join(u) for u in leftover]
+        recs = np.empty(len(users), dtype=RECORD)
+        recs["user"], recs["ts"], recs["action"], recs["points"] = users, ms, codes, points
+        return recs[ms != INVALID_TS]
+
+    def load_csv(self, path: Path, rows: int = CHUNK_ROWS) -> None:
+        for n, frame in csv_chunks(path, rows):
+            self.stats.rows += n
+            recs = self._events(frame)
+            columns = [frame[col].tolist() for col in USER_COLUMNS]
+            inserted = set(self.store.insert_new(dict(zip(USER_COLUMNS, row)) for row in zip(*columns)))
+            self.stats.users += len(inserted)
+            self.stats.existing += len(frame) - len(inserted)
+            if len(inserted) < len(frame):
+                keep = {user_id(name) for name in inserted}
+                recs = recs[np.isin(recs["user"], np.fromiter(keep, dtype=np.uint64, count=len(keep)))]
+            self.stats.events += self.log.append_many(recs)
+            self._report()
+
+    def load_json(self, path: Path, rows: int = CHUNK_ROWS) -> None:
+        """users.json passwords: new users for names not in the store, and the
+        password of existing users that have none (imported from the CSV)."""
+        batch: List[Dict] = []
+        for name, password in json_users(path):
+            self.stats.json_users += 1
+            if name.strip():
+                batch.append({"username": name.strip(), "password": _at_rest(password),
+                              "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds")})
+            if len(batch) >= rows:
+                self._json_batch(batch)
+                batch = []
+        if batch:
+            self._json_batch(batch)
+
+    def _json_batch(self, batch: List[Dict]) -> None:
+        self.stats.users += len(self.store.insert_new(batch, fill_empty=("password",)))
+        self._report()
+
+
+def _at_rest(password: str) -> str:
+    """Never copy users.json plaintext into the store: keep it as an unsalted
+    SHA-256 record, which verifies and is upgraded to the KDF on first login."""
+    if scheme(password) != "plaintext":
+        return password
+    return hashlib.sha256(password.encode("utf-8")).hexdigest()
+
+
+def migrate(csv_path: Optional[Path] = DEFAULT_CSV_PATH, json_path: Optional[Path] = DEFAULT_JSON_PATH,
+            store: Optional[UserStore] = None, log: Optional[EventLog] = None,
+            rows: int = CHUNK_ROWS, progress: Optional[Callable[[MigrationStats], None]] = None) -> MigrationStats:
+    """Import the legacy CSV, then users.json, into `store` and `log` (defaults:
+    data/users.db and data/events). Missing source files are skipped."""
+    store = store if store is not None else SQLiteUserStore(DEFAULT_SQLITE_PATH)
+    log = log if log is not None else EventLog(DEFAULT_LOG_DIR)
+    run = Migration(store, log, progress)
+    if csv_path is not None and Path(csv_path).exists():
+        run.load_csv(Path(csv_path), rows)
+        if isinstance(store, SQLiteUserStore):
+            store.set_meta("csv_imported", str(run.stats.users))  # open_store() must not import it again
+    if json_path is not None and Path(json_path).exists():
+        run.load_json(Path(json_path), rows)
+    run._report()
+    return run.stats
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Import legacy users.csv / users.json into the user store.")
+    parser.add_argument("--csv", default=str(DEFAULT_CSV_PATH), help="legacy users CSV ('' to skip)")
+    parser.add_argument("--json", default=str(DEFAULT_JSON_PATH), help="legacy login users.json ('' to skip)")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="sqlite")
+    parser.add_argument("--target", help="store file (default: data/users.db, or data/users.csv for csv)")
+    parser.add_argument("--events", default=str(DEFAULT_LOG_DIR), help="event log directory")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    args = parser.parse_args(argv)
+
+    store = BACKENDS[args.backend](Path(args.target)) if args.target else BACKENDS[args.backend]()
+    if args.csv and args.backend == "csv" and Path(args.csv).resolve() == store.path.resolve():
+        print("--csv and the csv target are the same file", file=sys.stderr)
+        return 1
+
+    def progress(stats: MigrationStats) -> None:
+        print(f"{stats.rows:,} rows, {stats.users:,} new users, {stats.events:,} events "
+              f"({stats.rows / max(stats.elapsed_s, 1e-9):,.0f} rows/s)", file=sys.stderr)
+
+    stats = migrate(Path(args.csv) if args.csv else None, Path(args.json) if args.json else None,
+                    store, EventLog(Path(args.events)), args.chunk_rows, progress)
+    print(json.dumps(asdict(stats)), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,139 @@
+# utils/passwords.py
+# Salted, tunable password hashing that runs off the Streamlit script thread.
+# Hashes use the werkzeug-style format already used for the demo credentials,
+# `pbkdf2:sha256:<iterations>$<salt>$<hex digest>`, and the key derivation is
+# done in a small process pool so a burst of logins neither stalls the script
+# thread nor serializes on one core. Legacy records (bare SHA-256 hex digests
+# and plaintext) still verify and are flagged for rehashing.
+import hashlib
+import hmac
+import multiprocessing
+import os
+import secrets
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Tuple
+
+HASH_METHOD = "pbkdf2:sha256"
+DEFAULT_ITERATIONS = int(os.environ.get("ECOSENSE_KDF_ITERATIONS", 260_000))
+DEFAULT_WORKERS = int(os.environ.get("ECOSENSE_KDF_WORKERS", min(4, os.cpu_count() or 1)))
+SALT_CHARS = 16
+
+
+def _derive(password: str, salt: str, iterations: int) -> str:
+    """PBKDF2-HMAC-SHA256 hex digest. Module-level so pool workers can run it."""
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt.encode("utf-8"), iterations).hex()
+
+
+def _parse(stored: str) -> Optional[Tuple[int, str, str]]:
+    """(iterations, salt, digest) of a KDF hash, or None for legacy / malformed records."""
+    method, _, rest = stored.partition("$")
+    if not method.startswith(HASH_METHOD + ":"):
+        return None
+    salt, _, digest = rest.partition("$")
+    try:
+        iterations = int(method.rsplit(":", 1)[1])
+    except ValueError:
+        return None
+    return (iterations, salt, digest) if salt and digest else None
+
+
+def _is_sha256_hex(stored: str) -> bool:
+    return len(stored) == 64 and all(c in "0123456789abcdef" for c in stored)
+
+
+def scheme(stored: str) -> str:
+    """Storage scheme of a password record: 'kdf', 'sha256', 'plaintext' or '' (no password)."""
+    if not stored:
+        return ""
+    if _parse(stored) is not None:
+        return "kdf"
+    return "sha256" if _is_sha256_hex(stored) else "plaintext"
+
+
+def needs_rehash(stored: str, iterations: int = DEFAULT_ITERATIONS) -> bool:
+    """True for legacy records and for KDF hashes weaker than the current work factor."""
+    parsed = _parse(stored)
+    return parsed is None or parsed[0] < iterations
+
+
+def _format(iterations: int, salt: str, digest: str) -> str:
+    return f"{HASH_METHOD}:{iterations}${salt}${digest}"
+
+
+class PasswordHasher:
+    """Hash and verify passwords in a process pool (inline if no pool can be started)."""
+
+    def __init__(self, iterations: int = DEFAULT_ITERATIONS, max_workers: int = DEFAULT_WORKERS):
+        self.iterations = iterations
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _executor(self) -> Optional[ProcessPoolExecutor]:
+        if self._pool is None and self.max_workers > 0:
+            with self._lock:
+                if self._pool is None:
+                    try:
+                        # spawn: never fork the multi-threaded Streamlit server
+                        self._pool = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context("spawn"))
+                    except (OSError, ValueError):
+                        self.max_workers = 0
+        return self._pool
+
+    def _derive(self, password: str, salt: str, iterations: int) -> str:
+        pool = self._executor()
+        if pool is not None:
+            try:
+                return pool.submit(_derive, password, salt, iterations).result()
+            except BrokenProcessPool:
+                # A worker died (or could not start); replace the pool next time.
+                with self._lock:
+                    if self._pool is pool:
+                        self._pool = None
+        return _derive(password, salt, iterations)
+
+    def hash(self, password: str) -> str:
+        salt = secrets.token_urlsafe(SALT_CHARS)[:SALT_CHARS]
+        return _format(self.iterations, salt, self._derive(password, salt, self.iterations))
+
+    def verify(self, password: str, stored: str) -> bool:
+        """Check a password against any supported record; constant-time comparison."""
+        parsed = _parse(stored)
+        if parsed is not None:
+            iterations, salt, digest = parsed
+            return hmac.compare_digest(self._derive(password, salt, iterations), digest)
+        kind = scheme(stored)
+        if kind == "sha256":
+            return hmac.compare_digest(hashlib.sha256(password.encode("utf-8")).hexdigest(), stored)
+        if kind == "plaintext":
+            return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))
+        return False
+
+    def warm(self) -> None:
+        """Start the worker processes now rather than on the first login."""
+        pool = self._executor()
+        if pool is not None:
+            for fut in [pool.submit(_derive, "", "warm", 1) for _ in range(self.max_workers)]:
+                fut.result()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+_hasher: Optional[PasswordHasher] = None
+_hasher_lock = threading.Lock()
+
+
+def get_hasher() -> PasswordHasher:
+    """Return the process-wide password hasher."""
+    global _hasher
+    if _hasher is None:
+        with _hasher_lock:
+            if _hasher is None:
+                _hasher = PasswordHasher()
+    return _hasher
@@ -0,0 +1,224 @@
+# utils/reports.py
+# Monthly PDF reports. The batch pipeline reads the month's events from the
+# event log once, streams users from the store in batches, and renders the
+# PDFs in a process pool into data/reports/<YYYY-MM>/, together with a
+# summary.csv of per-user aggregates (points earned, action counts by type).
+# The Reports page serves a pregenerated file when one exists and renders a
+# single report on demand otherwise.
+#
+#   python -m utils.reports --month 2026-09 --workers 4
+import argparse
+import csv
+import io
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+from collections import Counter
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.events import RECORD, EventLog, get_event_log, user_id
+from utils.store import UserStore, get_store
+
+DEFAULT_REPORT_DIR = Path("data") / "reports"
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+BATCH_USERS = 500  # users per pool task
+
+
+@dataclass
+class MonthlyReport:
+    """Everything one user's monthly PDF shows. Picklable, so it can go to a pool worker."""
+    username: str
+    email: str
+    vehicle_type: str
+    total_points: int
+    month: str                                                   # "YYYY-MM"
+    events: List[Tuple[int, str, int]] = field(default_factory=list)  # (ts_ms, action, points)
+
+    @property
+    def month_points(self) -> int:
+        return sum(pts for _, _, pts in self.events)
+
+    def by_action(self) -> Dict[str, Tuple[int, int]]:
+        """{action: (count, points)} for the month, most frequent first."""
+        counts, points = Counter(), Counter()
+        for _, action, pts in self.events:
+            counts[action] += 1
+            points[action] += pts
+        return {a: (n, points[a]) for a, n in counts.most_common()}
+
+
+def month_bounds(month: str) -> Tuple[datetime, datetime]:
+    """[start, end) of a "YYYY-MM" month in UTC."""
+    start = datetime.strptime(month, "%Y-%m").replace(tzinfo=timezone.utc)
+    end = start.replace(year=start.year + 1, month=1) if start.month == 12 else start.replace(month=start.month + 1)
+    return start, end
+
+
+def current_month() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m")
+
+
+def previous_month() -> str:
+    start, _ = month_bounds(current_month())
+    return (start - timedelta(days=1)).strftime("%Y-%m")
+
+
+def report_path(username: str, month: str, root: Path = DEFAULT_REPORT_DIR) -> Path:
+    """Where the batch writes a user's PDF. The id suffix keeps sanitized names unique."""
+    safe = re.sub(r"[^A-Za-z0-9._-]", "_", username)[:64]
+    return Path(root) / month / f"{safe}-{user_id(username):016x}.pdf"
+
+
+def report_from_history(row: Dict, month: str, history: pd.DataFrame) -> MonthlyReport:
+    """Single-user report from EventLog.history() output (the on-demand path)."""
+    events = [(int(t.timestamp() * 1000), a, int(p)) for t, a, p in zip(history["time"], history["action"], history["points"])]
+    return MonthlyReport(row["username"], row.get("email", ""), row.get("vehicle_type", ""),
+                         int(row.get("points", 0)), month, events)
+
+
+def render_pdf(report: MonthlyReport) -> bytes:
+    """The monthly PDF as bytes (requires reportlab)."""
+    from reportlab.pdfgen import canvas
+
+    buf = io.BytesIO()
+    c = canvas.Canvas(buf, pagesize=(595, 842))
+    c.setFont("Helvetica-Bold", 16)
+    c.drawString(40, 800, f"EcoSense AI — Monthly Report ({report.month})")
+    c.setFont("Helvetica", 12)
+    c.drawString(40, 780, f"User: {report.username}")
+    c.drawString(40, 764, f"Email: {report.email}")
+    c.drawString(40, 748, f"Vehicle: {report.vehicle_type}")
+    c.drawString(40, 732, f"Eco Points: {report.total_points} (+{report.month_points} this month)")
+    y = 712
+    by_action = report.by_action()
+    if by_action:
+        c.drawString(40, y, "This month by action:"); y -= 20
+        for action, (n, pts) in by_action.items():
+            c.drawString(60, y, f"{action}: {n}x, +{pts}"); y -= 16
+        y -= 4
+    c.drawString(40, y, "Actions:"); y -= 20
+    for ts_ms, action, pts in report.events:
+        day = datetime.fromtimestamp(ts_ms / 1000, timezone.utc)
+        c.drawString(60, y, f"- [{day:%Y-%m-%d}] {action} (+{pts})"); y -= 16
+        if y < 80:
+            c.showPage(); c.setFont("Helvetica", 12); y = 800
+    c.showPage(); c.save()
+    return buf.getvalue()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _render_batch(root: str, reports: List[MonthlyReport]) -> int:
+    """Pool task: render and write one batch of reports."""
+    for report in reports:
+        _write_atomic(report_path(report.username, report.month, Path(root)), render_pdf(report))
+    return len(reports)
+
+
+def _month_events(log: EventLog, start: datetime, end: datetime) -> np.ndarray:
+    """All of the month's records sorted by (user, ts)."""
+    end_incl = datetime.fromtimestamp(end.timestamp() - 0.001, timezone.utc)
+    parts = list(log.scan(start, end_incl))
+    recs = np.concatenate(parts) if parts else np.empty(0, dtype=RECORD)
+    return recs[np.lexsort((recs["ts"], recs["user"]))]
+
+
+def generate_month(month: str, root: Path = DEFAULT_REPORT_DIR, store: Optional[UserStore] = None,
+                   log: Optional[EventLog] = None, workers: int = DEFAULT_WORKERS,
+                   batch_users: int = BATCH_USERS) -> Dict:
+    """Write every user's PDF for `month` plus summary.csv and manifest.json under root/month.
+
+    Users are streamed from the store; at most 2 x workers batches are in
+    flight, so memory stays flat however many users there are.
+    """
+    store = store if store is not None else get_store()
+    log = log if log is not None else get_event_log()
+    out_dir = Path(root) / month
+    out_dir.mkdir(parents=True, exist_ok=True)
+    t0 = time.perf_counter()
+
+    start, end = month_bounds(month)
+    recs = _month_events(log, start, end)
+    uids, first, counts = np.unique(recs["user"], return_index=True, return_counts=True)
+    labels = {int(code): log.action_label(code) for code in np.unique(recs["action"])}
+    action_names = sorted(set(labels.values()))
+
+    summary_tmp = out_dir / ".summary.csv.tmp"
+    n_users = 0
+    pending: Set[Future] = set()
+    ctx = multiprocessing.get_context("spawn")  # never fork the multi-threaded app server
+    with open(summary_tmp, "w", newline="", encoding="utf-8") as f, \
+            ProcessPoolExecutor(max(1, workers), mp_context=ctx) as pool:
+        writer = csv.writer(f)
+        writer.writerow(["username", "email", "vehicle_type", "total_points", "month_points", "month_actions", *action_names])
+        for batch in store.iter_users(batch_users):
+            reports = []
+            for row in batch:
+                uid = np.uint64(user_id(row["username"]))
+                i = int(np.searchsorted(uids, uid))
+                mine = recs[first[i]:first[i] + counts[i]] if i < len(uids) and uids[i] == uid else recs[:0]
+                events = [(int(ts), labels[int(a)], int(p)) for ts, a, p in zip(mine["ts"], mine["action"], mine["points"])]
+                report = MonthlyReport(row["username"], row["email"], row["vehicle_type"], int(row["points"]), month, events)
+                by_action = report.by_action()
+                writer.writerow([report.username, report.email, report.vehicle_type, report.total_points,
+                                 report.month_points, len(events), *(by_action.get(a, (0, 0))[0] for a in action_names)])
+                reports.append(report)
+            n_users += len(reports)
+            if len(pending) >= 2 * max(1, workers):
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    fut.result()
+            pending.add(pool.submit(_render_batch, str(root), reports))
+        for fut in pending:
+            fut.result()
+    os.replace(summary_tmp, out_dir / "summary.csv")
+
+    stats = {
+        "month": month,
+        "users": n_users,
+        "events": int(len(recs)),
+        "generated_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "elapsed_s": round(time.perf_counter() - t0, 2),
+    }
+    (out_dir / "manifest.json").write_text(json.dumps(stats, indent=2))
+    return stats
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate every user's monthly PDF report.")
+    parser.add_argument("--month", default=previous_month(), help="YYYY-MM (default: last month)")
+    parser.add_argument("--out", default=str(DEFAULT_REPORT_DIR), help="reports root directory")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--batch-users", type=int, default=BATCH_USERS, help="users per pool task")
+    args = parser.parse_args(argv)
+
+    try:
+        import reportlab  # noqa: F401
+    except ImportError:
+        print("reportlab is required: pip install reportlab", file=sys.stderr)
+        return 1
+    stats = generate_month(args.month, Path(args.out), workers=args.workers, batch_users=args.batch_users)
+    print(
+        f"{stats['users']} reports for {stats['month']} ({stats['events']} events) in {stats['elapsed_s']:.2f}s "
+        f"({stats['users'] / max(stats['elapsed_s'], 1e-9):,.0f}/s) -> {Path(args.out) / args.month}",
+        file=sys.stderr,
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+# utils/scoring.py
+# Green-score engine shared by the app and the weather providers. Scorers are
+# registered by name and work on plain NumPy columns, write into a caller
+# supplied (optionally float32) output buffer, and results can be memoized per
+# forecast version so repeated reruns and scorer variants stay allocation-light.
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Mapping, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+Columns = Mapping[str, np.ndarray]
+Scorer = Callable[..., np.ndarray]
+
+SCORERS: Dict[str, Scorer] = {}
+DEFAULT_SCORER = "solar_wind_mix"
+MEMO_SIZE = 256
+
+_UNIT_DIV = {"s": 1, "ms": 10 ** 3, "us": 10 ** 6, "ns": 10 ** 9}
+
+
+def register_scorer(name: str) -> Callable[[Scorer], Scorer]:
+    """Decorator: make a scorer available to score() under `name`."""
+    def deco(fn: Scorer) -> Scorer:
+        SCORERS[name] = fn
+        return fn
+    return deco
+
+
+def columns_from_frame(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Column arrays from a forecast frame, plus `ts` (unix seconds) from a DatetimeIndex."""
+    cols = {c: df[c].to_numpy() for c in df.columns}
+    if isinstance(df.index, pd.DatetimeIndex) and "ts" not in cols:
+        cols["ts"] = df.index.asi8 // _UNIT_DIV[getattr(df.index, "unit", "ns")]
+    return cols
+
+
+# ------------------ Scorers ------------------
+@register_scorer("solar_wind_mix")
+def solar_wind_mix(cols: Columns, out: np.ndarray, solar_weight: float = 0.7, wind_weight: float = 0.3,
+                   solar_max: Optional[float] = None, wind_max: Optional[float] = None) -> np.ndarray:
+    """Normalized solar (70%) + wind (30%), scaled by the cloud factor when present."""
+    solar = np.asarray(cols["solar"], dtype=out.dtype)
+    wind = np.asarray(cols["wind"], dtype=out.dtype)
+    s_max = solar_max if solar_max is not None else max(float(np.nanmax(solar)) if solar.size else 0.0, 1.0)
+    w_max = wind_max if wind_max is not None else max(float(np.nanmax(wind)) if wind.size else 0.0, 1.0)
+    np.multiply(solar, solar_weight / s_max, out=out)
+    out += wind * out.dtype.type(wind_weight / w_max)
+    if "cloud" in cols:
+        cloud = np.asarray(cols["cloud"], dtype=out.dtype)
+        out *= (100.0 - cloud) / out.dtype.type(100.0)
+    return np.clip(out, 0.0, 1.0, out=out)
+
+
+@register_scorer("cloud_daytime")
+def cloud_daytime(cols: Columns, out: np.ndarray, timezone_offset: int = 0,
+                  day_start: int = 6, day_end: int = 18) -> np.ndarray:
+    """1 - cloud fraction during local daytime hours, 0 at night."""
+    ts = np.asarray(cols["ts"], dtype=np.int64)
+    local_hour = ((ts + int(timezone_offset)) // 3600) % 24
+    cloud = np.asarray(cols.get("cloud", np.zeros(len(ts))), dtype=out.dtype)
+    np.subtract(1.0, cloud / out.dtype.type(100.0), out=out)
+    np.clip(out, 0.0, None, out=out)
+    out[(local_hour < day_start) | (local_hour > day_end)] = 0.0
+    return out
+
+
+@register_scorer("carbon_intensity")
+def carbon_intensity(cols: Columns, out: np.ndarray, clean: float = 0.0, dirty: float = 800.0) -> np.ndarray:
+    """Grid carbon intensity (gCO₂/kWh) mapped linearly to 1 (clean) … 0 (dirty)."""
+    ci = np.asarray(cols["carbon_intensity"], dtype=out.dtype)
+    np.subtract(dirty, ci, out=out)
+    out /= out.dtype.type(dirty - clean)
+    return np.clip(out, 0.0, 1.0, out=out)
+
+
+# ------------------ Engine ------------------
+_memo: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_memo_lock = threading.Lock()
+
+
+def score(data: Union[pd.DataFrame, Columns], scorer: str = DEFAULT_SCORER, dtype=np.float64,
+          out: Optional[np.ndarray] = None, version: Optional[str] = None, **params) -> np.ndarray:
+    """Run a registered scorer over a forecast.
+
+    `out` is reused as the result buffer when given. With a `version` (e.g. a
+    frame's forecast_version attribute) the result is memoized and returned
+    read-only, so every session scoring the same forecast shares one array.
+    """
+    if scorer not in SCORERS:
+        raise ValueError(f"Unknown scorer: {scorer!r} (registered: {sorted(SCORERS)})")
+    n = len(data) if isinstance(data, pd.DataFrame) else len(next(iter(data.values()), ()))
+    key = None
+    if version is not None:
+        # Results are computed in out.dtype when a buffer is given, so key on that.
+        res_dtype = out.dtype if out is not None else np.dtype(dtype)
+        key = (version, n, scorer, res_dtype.str, tuple(sorted(params.items())))
+        with _memo_lock:
+            hit = _memo.get(key)
+            if hit is not None:
+                _memo.move_to_end(key)
+                if out is None:
+                    return hit
+                np.copyto(out, hit)
+                return out
+
+    cols = columns_from_frame(data) if isinstance(data, pd.DataFrame) else data
+    buf = out if out is not None else np.empty(n, dtype=dtype)
+    result = SCORERS[scorer](cols, buf, **params)
+
+    if key is not None:
+        cached = result.copy() if out is not None else result
+        cached.flags.writeable = False
+        with _memo_lock:
+            _memo[key] = cached
+            while len(_memo) > MEMO_SIZE:
+                _memo.popitem(last=False)
+    return result
+
+
+def score_frame(df: pd.DataFrame, scorer: str = DEFAULT_SCORER, column: str = "green_score", **kwargs) -> pd.DataFrame:
+    """Score a forecast frame in place (adds `column`), memoized on its forecast_version."""
+    if df.empty:
+        return df
+    kwargs.setdefault("version", df.attrs.get("forecast_version"))
+    result = score(df, scorer, **kwargs)
+    # Memoized arrays are shared and read-only; the frame gets its own column.
+    df[column] = result if result.flags.writeable else result.copy()
+    return df
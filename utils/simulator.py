@@ -0,0 +1,448 @@
+# utils/simulator.py
+# Lifestyle impact simulator behind the "What if I..." page.
+#
+# A scenario is tokenized once with a single precompiled pattern (distances,
+# days/week, percentages, bare numbers, words). Clauses joined by "and", ","
+# or ";" are scored separately, each routed to an intent through a keyword
+# dispatch table, so "bike 6 km and wfh 2 days/week" yields both savings.
+# estimate_uncertainty() re-runs the same models over sampled emission factors
+# to report p10/p50/p90 bands instead of a single point estimate.
+#
+#   python -m utils.simulator scenarios.csv --column scenario --out results.csv
+import argparse
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+# ------------------ Constants ------------------
+EF_CAR_KG_PER_KM = 0.18
+EF_ELECTRIC_GRID = 0.7
+FLIGHT_KG_PER_KM = 0.20
+LED_KWH_SAVING_PER_BULB_YR = 44
+SOLAR_KWH_PER_KW_DAY = 4.5
+AC_KWH_PER_DEG_PER_DAY = 0.4
+IDLING_L_PER_HR = 0.8
+EF_KG_PER_L_FUEL = 2.31
+SPEED_SAVING_FACTOR = 0.15
+KM_PER_MILE = 1.609
+
+HELP_TEXT = "ℹ️ Try: 'bike 6 km 5 days/week', 'skip 1 flight 1200 km', 'install 3 kW solar'"
+
+# ------------------ Tokenizer ------------------
+_TOKEN_RE = re.compile(
+    r"""
+      (?P<kmh>\d+(?:\.\d+)?)\s*km\s*/\s*h\b
+    | (?P<km>\d+(?:\.\d+)?)\s*(?:km|kilomet(?:er|re))s?\b
+    | (?P<mi>\d+(?:\.\d+)?)\s*miles?\b
+    | (?P<days>\d+)\s*days?\s*(?:a|per|/)?\s*week
+    | (?P<xweek>\d+)\s*x\s*/?\s*week
+    | (?P<pct>\d+(?:\.\d+)?)\s*%
+    | (?P<num>\d+(?:\.\d+)?)
+    | (?P<word>[a-z]+|\+)
+    """,
+    re.VERBOSE,
+)
+_CLAUSE_SPLIT_RE = re.compile(r"\s*(?:\band\b|\bplus\b|[,;&])\s*")
+_SPACE_RE = re.compile(r"\s+")
+
+
+@dataclass
+class Quantities:
+    """Everything the intents need from one clause, gathered in one pass."""
+    text: str
+    words: Set[str] = field(default_factory=set)
+    km: Optional[float] = None
+    days: Optional[float] = None
+    pct: Optional[float] = None
+    numbers: List[float] = field(default_factory=list)
+    speeds: List[float] = field(default_factory=list)
+
+    def number(self, default: float) -> float:
+        return self.numbers[0] if self.numbers else float(default)
+
+    def merge(self, other: "Quantities") -> None:
+        """Fold a follow-up clause without its own intent ("... and back 5 days a week")."""
+        self.text = f"{self.text} {other.text}"
+        self.words |= other.words
+        self.km = self.km if self.km is not None else other.km
+        self.days = self.days if self.days is not None else other.days
+        self.pct = self.pct if self.pct is not None else other.pct
+        self.numbers += other.numbers
+        self.speeds += other.speeds
+
+
+def tokenize(text: str) -> Quantities:
+    q = Quantities(text=text)
+    for m in _TOKEN_RE.finditer(text):
+        kind = m.lastgroup
+        val = m.group(kind)
+        if kind == "word":
+            q.words.add(val)
+        elif kind == "num":
+            q.numbers.append(float(val))
+        elif kind == "km" and q.km is None:
+            q.km = float(val)
+        elif kind == "mi" and q.km is None:
+            q.km = float(val) * KM_PER_MILE
+        elif kind in ("days", "xweek") and q.days is None:
+            q.days = float(val)
+        elif kind == "pct" and q.pct is None:
+            q.pct = float(val)
+        elif kind == "kmh":
+            q.speeds.append(float(val))
+    return q
+
+
+# ------------------ Intents ------------------
+# Each model maps a clause to its quantities and CO₂ saving in kg. Emission
+# factors come from `ef`, which holds floats for the point estimate or NumPy
+# arrays of draws for the uncertainty mode, so one model serves both.
+Values = Dict[str, Any]
+
+FACTORS: Dict[str, float] = {
+    "car_kg_per_km": EF_CAR_KG_PER_KM,
+    "grid_kg_per_kwh": EF_ELECTRIC_GRID,
+    "flight_kg_per_km": FLIGHT_KG_PER_KM,
+    "led_kwh_per_bulb_yr": LED_KWH_SAVING_PER_BULB_YR,
+    "solar_kwh_per_kw_day": SOLAR_KWH_PER_KW_DAY,
+    "ac_kwh_per_deg_day": AC_KWH_PER_DEG_PER_DAY,
+    "idling_l_per_hr": IDLING_L_PER_HR,
+    "fuel_kg_per_l": EF_KG_PER_L_FUEL,
+    "speed_saving": SPEED_SAVING_FACTOR,
+    "transit_share": 0.5,     # share of car emissions avoided by riding transit
+    "ev_kwh_per_km": 0.15,
+    "vegan_kg": 1250.0,
+    "vegetarian_kg": 750.0,
+}
+
+
+@dataclass(frozen=True)
+class Impact:
+    intent: str
+    message: str
+    co2_kg: float
+
+
+def _bike(q: Quantities, ef) -> Values:
+    km = q.km if q.km is not None else 5.0
+    days = q.days if q.days is not None else 5.0
+    return {"km": km, "days": days, "co2_kg": km * days * 52 * ef["car_kg_per_km"]}
+
+
+def _vegan(q: Quantities, ef) -> Values:
+    return {"co2_kg": ef["vegan_kg"]}
+
+
+def _vegetarian(q: Quantities, ef) -> Values:
+    return {"co2_kg": ef["vegetarian_kg"]}
+
+
+def _transit(q: Quantities, ef) -> Values:
+    km = q.km if q.km is not None else 20.0
+    days = q.days if q.days is not None else 5.0
+    return {"km": km, "days": days, "co2_kg": km * days * 52 * ef["car_kg_per_km"] * ef["transit_share"]}
+
+
+def _wfh(q: Quantities, ef) -> Values:
+    km = q.km if q.km is not None else 20.0
+    days = q.days if q.days is not None else 2.0
+    return {"km": km, "days": days, "co2_kg": km * days * 52 * ef["car_kg_per_km"]}
+
+
+def _flight(q: Quantities, ef) -> Values:
+    km = q.km if q.km is not None else 1200.0
+    trips = q.number(1)
+    return {"km": km, "trips": int(trips), "co2_kg": km * 2 * trips * ef["flight_kg_per_km"]}
+
+
+def _led(q: Quantities, ef) -> Values:
+    bulbs = q.number(6)
+    kwh = bulbs * ef["led_kwh_per_bulb_yr"]
+    return {"bulbs": int(bulbs), "kwh": kwh, "co2_kg": kwh * ef["grid_kg_per_kwh"]}
+
+
+def _solar(q: Quantities, ef) -> Values:
+    kw = q.number(3)
+    kwh = kw * ef["solar_kwh_per_kw_day"] * 365
+    return {"kw": kw, "kwh": kwh, "co2_kg": kwh * ef["grid_kg_per_kwh"]}
+
+
+def _ac(q: Quantities, ef) -> Values:
+    deg = q.number(2)
+    kwh = deg * ef["ac_kwh_per_deg_day"] * 180
+    return {"deg": deg, "kwh": kwh, "co2_kg": kwh * ef["grid_kg_per_kwh"]}
+
+
+def _speed(q: Quantities, ef) -> Values:
+    km = q.km if q.km is not None else 10000.0
+    return {"km": km, "co2_kg": km * ef["car_kg_per_km"] * ef["speed_saving"]}
+
+
+def _pct_transit(q: Quantities, ef) -> Values:
+    pct = q.pct if q.pct is not None else 30.0
+    km = q.km if q.km is not None else 12000.0
+    return {"pct": pct, "km": km, "co2_kg": km * pct / 100.0 * ef["car_kg_per_km"] * ef["transit_share"]}
+
+
+def _idle(q: Quantities, ef) -> Values:
+    hours = q.number(50)
+    return {"hours": hours, "co2_kg": hours * ef["idling_l_per_hr"] * ef["fuel_kg_per_l"]}
+
+
+def _ev(q: Quantities, ef) -> Values:
+    km = q.km if q.km is not None else 12000.0
+    ice = km * ef["car_kg_per_km"]
+    ev = km * ef["ev_kwh_per_km"] * ef["grid_kg_per_kwh"]
+    return {"km": km, "co2_kg": np.maximum(ice - ev, 0)}
+
+
+TEMPLATES: Dict[str, str] = {
+    "bike": "🚲 Switching {km:.1f} km/day, {days:.0f} days/week from car saves ~{t:.2f} t CO₂/year.",
+    "vegan": "🥗 Going vegan can save ~1.0–1.5 t CO₂/year (diet-dependent).",
+    "vegetarian": "🥗 Going vegetarian can save ~0.5–1.0 t CO₂/year (diet-dependent).",
+    "transit": "🚌 Switching {km:.0f} km/day, {days:.0f} days/week to public transport saves ~{t:.2f} t CO₂/year.",
+    "wfh": "💻 WFH {days:.0f} day(s)/week (commute {km:.0f} km/day) saves ~{t:.2f} t CO₂/year.",
+    "flight": "✈️ Skipping {trips} flight(s) of {km:.0f} km (each way) saves ~{t:.2f} t CO₂.",
+    "led": "💡 Replacing {bulbs} bulbs with LED saves ~{kwh:.0f} kWh/year (~{t:.2f} t CO₂).",
+    "solar": "🔆 {kw:.1f} kW solar → ~{kwh:.0f} kWh/year → offsets ~{t:.2f} t CO₂/year.",
+    "ac": "❄️ Raising AC by {deg:.0f}°C saves ~{kwh:.0f} kWh/season (~{t:.2f} t CO₂).",
+    "speed": "🚘 Limiting speed saves ~{t:.2f} t CO₂/year over {km:.0f} km.",
+    "pct_transit": "🚍 Shifting {pct:.0f}% of {km:.0f} km/year to public transit saves ~{t:.2f} t CO₂/year.",
+    "idle": "🕒 Avoiding {hours:.0f} h idling saves ~{t:.2f} t CO₂.",
+    "ev": "⚡ Switching to EV for {km:.0f} km/year saves ~{t:.2f} t CO₂/year.",
+}
+
+
+_TRANSIT_WORDS = {"bus", "train", "metro", "public"}
+
+# Intents in priority order: (name, handler, extra condition beyond the trigger word/phrase).
+INTENTS: List[Tuple[str, Callable[[Quantities, Any], Values], Callable[[Quantities], bool]]] = [
+    ("bike", _bike, lambda q: True),
+    ("vegan", _vegan, lambda q: True),
+    ("vegetarian", _vegetarian, lambda q: True),
+    ("pct_transit", _pct_transit, lambda q: q.pct is not None and bool(q.words & _TRANSIT_WORDS)),
+    ("transit", _transit, lambda q: True),
+    ("wfh", _wfh, lambda q: True),
+    ("flight", _flight, lambda q: True),
+    ("led", _led, lambda q: bool(q.words & {"bulb", "bulbs", "light", "lights", "lighting"})),
+    ("solar", _solar, lambda q: True),
+    ("ac", _ac, lambda q: bool(q.words & {"raise", "increase", "+"})),
+    ("speed", _speed, lambda q: True),
+    ("idle", _idle, lambda q: True),
+    ("ev", _ev, lambda q: "switch" in q.words or "switching" in q.words),
+]
+_PRIORITY = {name: i for i, (name, _, _) in enumerate(INTENTS)}
+
+# Keyword dispatch: trigger word -> candidate intents.
+KEYWORDS: Dict[str, Tuple[str, ...]] = {
+    **dict.fromkeys(["bike", "bikes", "biking", "cycle", "cycling", "bicycle", "walk", "walking"], ("bike",)),
+    "vegan": ("vegan",),
+    "vegetarian": ("vegetarian",),
+    **dict.fromkeys(["bus", "train", "metro", "carpool", "carpooling"], ("pct_transit", "transit")),
+    "public": ("pct_transit",),
+    "wfh": ("wfh",),
+    **dict.fromkeys(["flight", "flights", "fly", "flying"], ("flight",)),
+    "led": ("led",),
+    "solar": ("solar",),
+    "ac": ("ac",),
+    **dict.fromkeys(["idle", "idling"], ("idle",)),
+    "ev": ("ev",),
+}
+# Multi-word triggers, checked as substrings of the normalized clause.
+PHRASES: Dict[str, Tuple[str, ...]] = {
+    "public transport": ("transit",),
+    "work from home": ("wfh",),
+    "go veg": ("vegetarian",),
+    "limit speed": ("speed",),
+    "drive slower": ("speed",),
+}
+
+
+def classify(q: Quantities) -> Optional[str]:
+    """Highest-priority intent triggered by the clause, or None."""
+    candidates: Set[str] = set()
+    for w in q.words:
+        candidates.update(KEYWORDS.get(w, ()))
+    for phrase, names in PHRASES.items():
+        if phrase in q.text:
+            candidates.update(names)
+    if q.speeds:
+        candidates.add("speed")
+    for name in sorted(candidates, key=_PRIORITY.__getitem__):
+        _, _, cond = INTENTS[_PRIORITY[name]]
+        if cond(q):
+            return name
+    return None
+
+
+# ------------------ Public API ------------------
+def normalize(sentence: str) -> str:
+    return _SPACE_RE.sub(" ", sentence.lower()).strip()
+
+
+def _clauses(normalized: str) -> List[Tuple[str, Quantities]]:
+    """Split a scenario into (intent, quantities) clauses; intent-less clauses merge into the previous one."""
+    clauses: List[Tuple[Optional[str], Quantities]] = []
+    for part in _CLAUSE_SPLIT_RE.split(normalized):
+        if not part:
+            continue
+        q = tokenize(part)
+        intent = classify(q)
+        if intent is None and clauses:
+            clauses[-1][1].merge(q)
+        else:
+            clauses.append((intent, q))
+    # Re-classify after merges: a follow-up clause may have added the missing condition.
+    return [(classify(q) or intent, q) for intent, q in clauses if intent is not None]
+
+
+@lru_cache(maxsize=4096)
+def _impacts(normalized: str) -> Tuple[Impact, ...]:
+    out = []
+    for intent, q in _clauses(normalized):
+        vals = INTENTS[_PRIORITY[intent]][1](q, FACTORS)
+        co2 = float(vals["co2_kg"])
+        out.append(Impact(intent, TEMPLATES[intent].format(**vals, t=co2 / 1000), co2))
+    return tuple(out)
+
+
+def analyze(sentence: str) -> Tuple[Impact, ...]:
+    """Structured impacts for every intent found in the scenario (memoized)."""
+    return _impacts(normalize(sentence))
+
+
+def format_impacts(impacts: Tuple[Impact, ...]) -> str:
+    if not impacts:
+        return HELP_TEXT
+    lines = [imp.message for imp in impacts]
+    if len(impacts) > 1:
+        total = sum(imp.co2_kg for imp in impacts)
+        lines.append(f"🌍 Combined: ~{total/1000:.2f} t CO₂.")
+    return "\n".join(lines)
+
+
+def estimate_impact(sentence: str) -> str:
+    """Human-readable impact estimate for a scenario (one line per intent found)."""
+    return format_impacts(analyze(sentence))
+
+
+def estimate_batch(sentences: Iterable[str]) -> pd.DataFrame:
+    """Score many scenarios. Returns scenario, intents, co2_kg and message columns."""
+    rows = []
+    for s in sentences:
+        s = "" if s is None or (isinstance(s, float) and s != s) else str(s)
+        impacts = analyze(s)
+        rows.append((
+            s,
+            "+".join(imp.intent for imp in impacts),
+            round(sum(imp.co2_kg for imp in impacts), 3),
+            format_impacts(impacts),
+        ))
+    return pd.DataFrame(rows, columns=["scenario", "intents", "co2_kg", "message"])
+
+
+# ------------------ Uncertainty (Monte Carlo) ------------------
+# Each emission factor as a distribution: ("tri", low, mode, high) or ("uniform", low, high).
+DISTRIBUTIONS: Dict[str, Tuple] = {
+    "car_kg_per_km": ("tri", 0.12, 0.18, 0.25),
+    "grid_kg_per_kwh": ("tri", 0.40, 0.70, 0.90),
+    "flight_kg_per_km": ("tri", 0.15, 0.20, 0.28),
+    "led_kwh_per_bulb_yr": ("tri", 30.0, 44.0, 60.0),
+    "solar_kwh_per_kw_day": ("tri", 3.5, 4.5, 5.5),
+    "ac_kwh_per_deg_day": ("tri", 0.25, 0.40, 0.60),
+    "idling_l_per_hr": ("tri", 0.5, 0.8, 1.2),
+    "fuel_kg_per_l": ("tri", 2.25, 2.31, 2.40),
+    "speed_saving": ("tri", 0.05, 0.15, 0.20),
+    "transit_share": ("tri", 0.30, 0.50, 0.70),
+    "ev_kwh_per_km": ("tri", 0.12, 0.15, 0.20),
+    "vegan_kg": ("uniform", 1000.0, 1500.0),
+    "vegetarian_kg": ("uniform", 500.0, 1000.0),
+}
+DEFAULT_DRAWS = 20_000
+
+
+@dataclass(frozen=True)
+class ImpactRange:
+    intent: str
+    p10_kg: float
+    p50_kg: float
+    p90_kg: float
+
+
+@lru_cache(maxsize=8)
+def _draws(n: int, seed: int) -> Dict[str, np.ndarray]:
+    """`n` draws of every emission factor, shared (read-only) across scenarios."""
+    rng = np.random.default_rng(seed)
+    out = {}
+    for name, (kind, *args) in DISTRIBUTIONS.items():
+        arr = rng.triangular(*args, size=n) if kind == "tri" else rng.uniform(*args, size=n)
+        arr.flags.writeable = False
+        out[name] = arr
+    return out
+
+
+def estimate_uncertainty(sentence: str, n: int = DEFAULT_DRAWS, seed: int = 0) -> List[ImpactRange]:
+    """p10/p50/p90 CO₂ savings per intent (plus a "combined" row for compound scenarios).
+
+    Every intent model is evaluated once over all `n` factor draws at once;
+    the same draws are reused across scenarios so comparisons stay consistent.
+    """
+    ef = _draws(int(n), int(seed))
+    samples = []
+    for intent, q in _clauses(normalize(sentence)):
+        co2 = np.broadcast_to(INTENTS[_PRIORITY[intent]][1](q, ef)["co2_kg"], (int(n),))
+        samples.append((intent, co2))
+    if len(samples) > 1:
+        samples.append(("combined", np.sum([c for _, c in samples], axis=0)))
+    out = []
+    for intent, co2 in samples:
+        p10, p50, p90 = np.percentile(co2, [10, 50, 90])
+        out.append(ImpactRange(intent, float(p10), float(p50), float(p90)))
+    return out
+
+
+def uncertainty_frame(ranges: Iterable[ImpactRange]) -> pd.DataFrame:
+    """Display table for estimate_uncertainty(): tonnes CO₂ at p10 / p50 / p90."""
+    return pd.DataFrame(
+        [(r.intent, r.p10_kg / 1000, r.p50_kg / 1000, r.p90_kg / 1000) for r in ranges],
+        columns=["intent", "p10_t", "p50_t", "p90_t"],
+    ).round(2)
+
+
+def main(argv: Optional[list] = None) -> int:
+    parser = argparse.ArgumentParser(description="Score lifestyle scenarios in bulk.")
+    parser.add_argument("input", help="CSV with a scenario column, or a .txt file with one scenario per line")
+    parser.add_argument("--column", default="scenario", help="scenario column name in the CSV")
+    parser.add_argument("--out", default="-", help="output CSV (default: stdout)")
+    parser.add_argument("--chunksize", type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    if args.input.endswith(".txt"):
+        with open(args.input, encoding="utf-8") as f:
+            chunks = iter([pd.DataFrame({args.column: [line.rstrip("\n") for line in f if line.strip()]})])
+    else:
+        chunks = pd.read_csv(args.input, usecols=[args.column], chunksize=args.chunksize)
+
+    out = sys.stdout if args.out == "-" else open(args.out, "w", encoding="utf-8", newline="")
+    t0, n = time.perf_counter(), 0
+    try:
+        for i, chunk in enumerate(chunks):
+            res = estimate_batch(chunk[args.column])
+            res.to_csv(out, index=False, header=(i == 0))
+            n += len(res)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    elapsed = time.perf_counter() - t0
+    print(f"{n} scenarios in {elapsed:.2f}s ({n / max(elapsed, 1e-9):,.0f}/s)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
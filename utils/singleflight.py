@@ -0,0 +1,65 @@
+# utils/singleflight.py
+# Request coalescing. Concurrent calls for the same key share one execution:
+# the first caller (the leader) runs the function, later callers block on the
+# leader's future and get the same result or exception. The key is forgotten
+# once the call finishes, so the next miss starts a fresh call. Batch callers
+# claim() many keys at once, fetch the ones they lead in one request and
+# settle() each of them.
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls per key within one process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.leaders = 0    # keys whose call this process ran
+        self.followers = 0  # keys that waited on a leader instead
+
+    def claim(self, keys: Iterable[Hashable]) -> Tuple[List[Hashable], Dict[Hashable, Future]]:
+        """Lead every key not in flight yet. Returns (claimed keys, futures of the
+        keys other callers are leading). Every claimed key must be settle()d."""
+        claimed, waiting, seen = [], {}, set()
+        with self._lock:
+            for key in keys:
+                if key in seen:
+                    continue
+                seen.add(key)
+                fut = self._calls.get(key)
+                if fut is None:
+                    self._calls[key] = Future()
+                    claimed.append(key)
+                    self.leaders += 1
+                else:
+                    waiting[key] = fut
+                    self.followers += 1
+        return claimed, waiting
+
+    def settle(self, key: Hashable, result: Any = None, exc: Optional[BaseException] = None) -> None:
+        """Publish a claimed key's result (or exception) to its waiters and release it."""
+        with self._lock:
+            fut = self._calls.pop(key)
+        if exc is not None:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(result)
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Return fn(), or the result of the call for `key` already in flight."""
+        claimed, waiting = self.claim([key])
+        if not claimed:
+            return waiting[key].result()
+        try:
+            result = fn()
+        except BaseException as exc:
+            self.settle(key, exc=exc)
+            raise
+        self.settle(key, result)
+        return result
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
@@ -0,0 +1,718 @@
+# utils/store.py
+# Pluggable user storage. SQLite (WAL) is the default backend: username is the
+# primary key, so lookups and point awards touch a single row instead of
+# re-reading and re-writing the whole users file. Writes from concurrent
+# sessions are group-committed: whichever caller gets the writer lock applies
+# every queued mutation in one transaction (one file rewrite for CSV).
+# Both backends are safe with several app processes on one data/ volume:
+# SQLite through its own locking (increments are single UPDATE statements,
+# retried when the database is busy), CSV through an flock'd sidecar file.
+import abc
+import json
+import os
+import random
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from utils.events import EventLog, get_event_log
+from utils.filelock import FileLock
+
+USER_COLUMNS = ["username", "password", "email", "vehicle_type", "points", "actions", "created_at"]
+
+DEFAULT_BACKEND = os.environ.get("ECOSENSE_USER_BACKEND", "sqlite")
+DEFAULT_SQLITE_PATH = Path("data") / "users.db"
+DEFAULT_CSV_PATH = Path("data") / "users.csv"
+CSV_COMMIT_WINDOW_S = 0.005
+WRITE_RETRIES = 6
+RETRY_BASE_S = 0.02
+
+
+def clean_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalize a raw users frame: fix the legacy header, drop stray rows, coerce types."""
+    if "password" not in df.columns and "0" in df.columns:
+        # Early CSVs were written with a broken header (`username,0,points,...`).
+        df = df.rename(columns={"0": "password"})
+    for col in USER_COLUMNS:
+        if col not in df.columns:
+            df[col] = ""
+    df = df[USER_COLUMNS].copy()
+    df["username"] = df["username"].fillna("").astype(str).str.strip()
+    df = df[(df["username"] != "") & (df["username"] != "username")]
+    df["points"] = pd.to_numeric(df["points"], errors="coerce").fillna(0).astype(int)
+    for col in ["password", "email", "vehicle_type", "actions", "created_at"]:
+        df[col] = df[col].fillna("").astype(str)
+    return df.drop_duplicates(subset="username", keep="first").reset_index(drop=True)
+
+
+def _is_busy(exc: Exception) -> bool:
+    msg = str(exc).lower()
+    return isinstance(exc, sqlite3.OperationalError) and ("locked" in msg or "busy" in msg)
+
+
+def _with_retry(fn: Callable[[], Any], retries: int = WRITE_RETRIES, base_s: float = RETRY_BASE_S) -> Any:
+    """Run `fn`, retrying with jittered exponential backoff while the database is busy."""
+    for attempt in range(retries):
+        try:
+            return fn()
+        except sqlite3.OperationalError as exc:
+            if not _is_busy(exc) or attempt == retries - 1:
+                raise
+            time.sleep(base_s * (2 ** attempt) * (0.5 + random.random()))
+
+
+# ------------------ Group commit ------------------
+class _GroupCommit:
+    """Synchronous group commit with a leader.
+
+    submit() blocks until the caller's operation has been committed; nothing is
+    written behind the caller's back. When no commit is running, the caller
+    becomes the leader: it drains the whole queue and hands it to
+    `commit(ops) -> results` as one batch, while callers arriving meanwhile
+    queue up for the next batch. A result that is an exception is raised in
+    the submitting caller only.
+    """
+
+    def __init__(self, commit: Callable[[List[Callable]], List[Any]], window_s: float = 0.0):
+        self._commit = commit
+        self.window_s = window_s  # leader waits this long for more writes to join its batch
+        self._cond = threading.Condition()
+        self._busy = False
+        self._queue: List[Tuple[Callable, Future]] = []
+
+    def submit(self, op: Callable) -> Any:
+        fut: Future = Future()
+        with self._cond:
+            self._queue.append((op, fut))
+            while self._busy and not fut.done():
+                self._cond.wait()
+            if fut.done():
+                return fut.result()
+            self._busy = True
+        try:
+            if self.window_s:
+                time.sleep(self.window_s)
+            with self._cond:
+                batch, self._queue = self._queue, []
+            try:
+                results = self._commit([op for op, _ in batch])
+            except BaseException as exc:
+                results = [exc] * len(batch)
+            for (_, f), res in zip(batch, results):
+                if isinstance(res, BaseException):
+                    f.set_exception(res)
+                else:
+                    f.set_result(res)
+        finally:
+            with self._cond:
+                self._busy = False
+                self._cond.notify_all()
+        return fut.result()
+
+
+# ------------------ Interface ------------------
+class UserStore(abc.ABC):
+    """Interface implemented by every user storage backend."""
+
+    @abc.abstractmethod
+    def get_user(self, username: str) -> Optional[Dict]:
+        """Return the user record as a dict, or None."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def create_user(self, record: Dict) -> bool:
+        """Insert a new user. Returns False if the username is taken."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def update_user(self, username: str, **fields) -> bool:
+        """Update selected columns of one user. Returns False if missing."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def add_points(self, username: str, pts: int) -> Optional[int]:
+        """Add `pts` to a user's total and return the new total (None if missing)."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def upsert_many(self, records: Iterable[Dict]) -> int:
+        """Insert or replace many records at once. Returns the number written."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def insert_new(self, records: Iterable[Dict], fill_empty: Sequence[str] = ()) -> List[str]:
+        """Insert the records whose username is not taken, in one transaction;
+        existing users are kept, except that their empty `fill_empty` columns
+        are filled in. Returns the usernames inserted (first occurrence wins)."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def to_frame(self) -> pd.DataFrame:
+        """Return all users as a DataFrame with USER_COLUMNS."""
+        raise NotImplementedError
+
+    def iter_users(self, batch_size: int = 10_000) -> Iterator[List[Dict]]:
+        """Yield every user record, in username order, as lists of up to batch_size dicts."""
+        frame = self.to_frame().sort_values("username")
+        for lo in range(0, len(frame), batch_size):
+            yield frame.iloc[lo:lo + batch_size].to_dict("records")
+
+    @abc.abstractmethod
+    def count(self) -> int:
+        """Number of users in the store."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def version(self) -> str:
+        """Cheap stamp that changes whenever any user row changes (from any process)."""
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+# ------------------ SQLite backend ------------------
+class SQLiteUserStore(UserStore):
+    """Embedded SQLite store in WAL mode with a primary-key index on username."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS users (
+        username     TEXT PRIMARY KEY,
+        password     TEXT NOT NULL DEFAULT '',
+        email        TEXT NOT NULL DEFAULT '',
+        vehicle_type TEXT NOT NULL DEFAULT '',
+        points       INTEGER NOT NULL DEFAULT 0,
+        actions      TEXT NOT NULL DEFAULT '',
+        created_at   TEXT NOT NULL DEFAULT ''
+    );
+    CREATE TABLE IF NOT EXISTS meta (
+        key   TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    INSERT OR IGNORE INTO meta (key, value) VALUES ('version', '0');
+    CREATE TRIGGER IF NOT EXISTS users_version_insert AFTER INSERT ON users
+    BEGIN UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'version'; END;
+    CREATE TRIGGER IF NOT EXISTS users_version_update AFTER UPDATE ON users
+    BEGIN UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'version'; END;
+    CREATE TRIGGER IF NOT EXISTS users_version_delete AFTER DELETE ON users
+    BEGIN UPDATE meta SET value = CAST(value AS INTEGER) + 1 WHERE key = 'version'; END;
+    """
+
+    def __init__(self, path: Path = DEFAULT_SQLITE_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Streamlit serves sessions from a thread pool; sqlite3 connections must
+        # not be shared between threads, so keep one per thread.
+        self._local = threading.local()
+        self._writes = _GroupCommit(self._commit_batch)
+        with self._conn() as conn:
+            conn.executescript(self.SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # BEGIN IMMEDIATE: take the write lock up front, so writers from other
+            # processes queue on the busy timeout instead of failing on upgrade.
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level="IMMEDIATE")
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get_user(self, username: str) -> Optional[Dict]:
+        row = self._conn().execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
+        return dict(row) if row else None
+
+    def _commit_batch(self, ops: List[Callable]) -> List[Any]:
+        """Run queued writes in one transaction; on failure, retry each on its own
+        so one bad operation cannot fail the writes batched with it."""
+        conn = self._conn()
+
+        def run_all() -> List[Any]:
+            with conn:
+                return [op(conn) for op in ops]
+
+        def run_one(op: Callable) -> Any:
+            with conn:
+                return op(conn)
+
+        try:
+            return _with_retry(run_all)
+        except sqlite3.Error:
+            results = []
+            for op in ops:
+                try:
+                    results.append(_with_retry(lambda: run_one(op)))
+                except sqlite3.Error as exc:
+                    results.append(exc)
+            return results
+
+    def create_user(self, record: Dict) -> bool:
+        values = [record.get(col, 0 if col == "points" else "") for col in USER_COLUMNS]
+
+        def op(conn: sqlite3.Connection) -> bool:
+            try:
+                conn.execute(
+                    f"INSERT INTO users ({', '.join(USER_COLUMNS)}) VALUES ({', '.join('?' * len(USER_COLUMNS))})",
+                    values,
+                )
+            except sqlite3.IntegrityError:
+                return False
+            return True
+        return self._writes.submit(op)
+
+    def update_user(self, username: str, **fields) -> bool:
+        fields = {k: v for k, v in fields.items() if k in USER_COLUMNS and k != "username"}
+        if not fields:
+            return self.get_user(username) is not None
+        sql = f"UPDATE users SET {', '.join(f'{col} = ?' for col in fields)} WHERE username = ?"
+        params = [*fields.values(), username]
+        return self._writes.submit(lambda conn: conn.execute(sql, params).rowcount > 0)
+
+    def add_points(self, username: str, pts: int) -> Optional[int]:
+        def op(conn: sqlite3.Connection) -> Optional[int]:
+            row = conn.execute(
+                "UPDATE users SET points = points + ? WHERE username = ? RETURNING points",
+                (int(pts), username),
+            ).fetchone()
+            return int(row[0]) if row else None
+        return self._writes.submit(op)
+
+    def upsert_many(self, records: Iterable[Dict]) -> int:
+        rows = [
+            [rec.get(col, 0 if col == "points" else "") for col in USER_COLUMNS]
+            for rec in records
+        ]
+        def write() -> None:
+            with self._conn() as conn:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO users ({', '.join(USER_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(USER_COLUMNS))})",
+                    rows,
+                )
+        _with_retry(write)
+        return len(rows)
+
+    def insert_new(self, records: Iterable[Dict], fill_empty: Sequence[str] = ()) -> List[str]:
+        rows = [
+            [rec.get(col, 0 if col == "points" else "") for col in USER_COLUMNS]
+            for rec in records
+        ]
+        names = [row[0] for row in rows]
+        fills = [col for col in fill_empty if col in USER_COLUMNS and col != "username"]
+
+        def write() -> set:
+            conn = self._conn()
+            with conn:
+                conn.execute("BEGIN IMMEDIATE")  # the existence check and the inserts see the same table
+                existing = {r[0] for r in conn.execute(
+                    "SELECT username FROM users WHERE username IN (SELECT value FROM json_each(?))",
+                    (json.dumps(names),))}
+                conn.executemany(
+                    f"INSERT INTO users ({', '.join(USER_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(USER_COLUMNS))}) ON CONFLICT (username) DO NOTHING",
+                    rows,
+                )
+                for col in fills:
+                    i = USER_COLUMNS.index(col)
+                    conn.executemany(
+                        f"UPDATE users SET {col} = ? WHERE username = ? AND {col} = ''",
+                        [(row[i], row[0]) for row in rows if row[0] in existing and row[i] != ""],
+                    )
+            return existing
+        existing = _with_retry(write)
+        return list(dict.fromkeys(n for n in names if n not in existing))
+
+    def to_frame(self) -> pd.DataFrame:
+        return pd.read_sql_query(f"SELECT {', '.join(USER_COLUMNS)} FROM users", self._conn())
+
+    def iter_users(self, batch_size: int = 10_000) -> Iterator[List[Dict]]:
+        # Keyset pagination on the primary key: constant memory, and no read
+        # transaction held open between batches (which would pin the WAL).
+        sql = f"SELECT {', '.join(USER_COLUMNS)} FROM users WHERE username > ? ORDER BY username LIMIT ?"
+        last = ""
+        while True:
+            rows = self._conn().execute(sql, (last, batch_size)).fetchall()
+            if not rows:
+                return
+            yield [dict(row) for row in rows]
+            last = rows[-1]["username"]
+
+    def count(self) -> int:
+        return int(self._conn().execute("SELECT COUNT(*) FROM users").fetchone()[0])
+
+    def version(self) -> str:
+        # Bumped by triggers in the writing transaction, so every process sees it.
+        return self.get_meta("version", "0")
+
+    def get_meta(self, key: str, default: Optional[str] = None) -> Optional[str]:
+        row = self._conn().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else default
+
+    def set_meta(self, key: str, value: str) -> None:
+        with self._conn() as conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, value))
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+
+# ------------------ CSV backend (legacy) ------------------
+class CSVUserStore(UserStore):
+    """CSV backend, kept for deployments that still edit users.csv by hand.
+
+    The file is parsed once and kept in memory (re-read only if its stamp
+    changes underneath us). Mutations mark rows dirty; each group-committed
+    batch that dirtied anything is written with one atomic rename, so readers
+    never see a half-written file and idle reruns write nothing. Batches run
+    under an exclusive lock on `<file>.lock`, which also holds a write counter:
+    a process whose counter is behind re-reads the file before applying its
+    batch, so writers in other processes never lose each other's updates.
+    """
+
+    def __init__(self, path: Path = DEFAULT_CSV_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.RLock()
+        self._frame: Optional[pd.DataFrame] = None
+        self._pos: Dict[str, int] = {}
+        self._stamp: Optional[Tuple[int, int]] = None
+        self._dirty: set = set()
+        self._file_lock = FileLock(self.path.with_name(self.path.name + ".lock"))
+        self._generation: Optional[int] = None  # write counter as of our last read / write
+        # Every batch rewrites the whole file, so let concurrent awards pile up briefly.
+        self._writes = _GroupCommit(self._commit_batch, window_s=CSV_COMMIT_WINDOW_S)
+
+    def _stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def _load(self, force: bool = False) -> pd.DataFrame:
+        """The in-memory table, re-read if the file changed since we last read or wrote it."""
+        with self._lock:
+            stamp = self._stat()
+            if force or self._frame is None or (stamp != self._stamp and not self._dirty):
+                if stamp is not None:
+                    frame = clean_frame(pd.read_csv(self.path, dtype=str, keep_default_na=False))
+                else:
+                    frame = clean_frame(pd.DataFrame(columns=USER_COLUMNS))
+                self._frame, self._stamp = frame, stamp
+                self._pos = dict(zip(frame["username"], range(len(frame))))
+            return self._frame
+
+    def _flush(self) -> None:
+        """Atomically replace the file and bump the shared write counter (file lock held)."""
+        tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        try:
+            self._frame[USER_COLUMNS].to_csv(tmp, index=False)
+            os.replace(tmp, self.path)
+        except BaseException:
+            # Memory now holds writes that never reached disk: drop it and re-read.
+            self._frame = None
+            self._dirty.clear()
+            raise
+        self._generation = self._file_lock.read_counter() + 1
+        self._file_lock.write_counter(self._generation)
+        self._stamp = self._stat()
+        self._dirty.clear()
+
+    def _synced(self) -> pd.DataFrame:
+        """The table, re-read if another process wrote since we last did (file lock held)."""
+        generation = self._file_lock.read_counter()
+        frame = self._load(force=generation != self._generation)
+        self._generation = generation
+        return frame
+
+    def _commit_batch(self, ops: List[Callable]) -> List[Any]:
+        with self._lock, self._file_lock:
+            frame = self._synced()
+            results = []
+            for op in ops:
+                try:
+                    results.append(op(frame))
+                except Exception as exc:
+                    results.append(exc)
+            if self._dirty:
+                self._flush()
+            return results
+
+    def get_user(self, username: str) -> Optional[Dict]:
+        with self._lock:
+            frame = self._load()
+            pos = self._pos.get(username)
+            return frame.iloc[pos].to_dict() if pos is not None else None
+
+    def create_user(self, record: Dict) -> bool:
+        row = clean_frame(pd.DataFrame([record])).iloc[0]
+
+        def op(frame: pd.DataFrame) -> bool:
+            if row["username"] in self._pos:
+                return False
+            frame.loc[len(frame)] = row[USER_COLUMNS].tolist()
+            self._pos[row["username"]] = len(frame) - 1
+            self._dirty.add(row["username"])
+            return True
+        return self._writes.submit(op)
+
+    def update_user(self, username: str, **fields) -> bool:
+        def op(frame: pd.DataFrame) -> bool:
+            pos = self._pos.get(username)
+            if pos is None:
+                return False
+            for col, val in fields.items():
+                if col in USER_COLUMNS and col != "username":
+                    frame.iat[pos, USER_COLUMNS.index(col)] = val
+                    self._dirty.add(username)
+            return True
+        return self._writes.submit(op)
+
+    def add_points(self, username: str, pts: int) -> Optional[int]:
+        col = USER_COLUMNS.index("points")
+
+        def op(frame: pd.DataFrame) -> Optional[int]:
+            pos = self._pos.get(username)
+            if pos is None:
+                return None
+            total = int(frame.iat[pos, col]) + int(pts)
+            frame.iat[pos, col] = total
+            self._dirty.add(username)
+            return total
+        return self._writes.submit(op)
+
+    def upsert_many(self, records: Iterable[Dict]) -> int:
+        new = pd.DataFrame(list(records))
+        with self._lock, self._file_lock:
+            merged = clean_frame(pd.concat([new, self._synced()], ignore_index=True))
+            self._frame = merged
+            self._pos = dict(zip(merged["username"], range(len(merged))))
+            self._dirty.update(merged["username"])
+            self._flush()
+        return len(new)
+
+    def insert_new(self, records: Iterable[Dict], fill_empty: Sequence[str] = ()) -> List[str]:
+        new = clean_frame(pd.DataFrame(list(records)))
+        with self._lock, self._file_lock:
+            frame = self._synced()
+            taken = new["username"].isin(self._pos.keys())
+            for col in fill_empty:
+                if col not in USER_COLUMNS or col == "username":
+                    continue
+                i = USER_COLUMNS.index(col)
+                for name, val in zip(new.loc[taken, "username"], new.loc[taken, col]):
+                    pos = self._pos[name]
+                    if val != "" and frame.iat[pos, i] == "":
+                        frame.iat[pos, i] = val
+                        self._dirty.add(name)
+            added = new[~taken]
+            if len(added):
+                frame = pd.concat([frame, added], ignore_index=True)
+                self._frame = frame
+                self._pos = dict(zip(frame["username"], range(len(frame))))
+                self._dirty.update(added["username"])
+            if self._dirty:
+                self._flush()
+        return added["username"].tolist()
+
+    def to_frame(self) -> pd.DataFrame:
+        with self._lock:
+            return self._load().copy()
+
+    def count(self) -> int:
+        return len(self._load())
+
+    def version(self) -> str:
+        # The shared write counter first, so UserTable can tell our own write
+        # from someone else's; the file stamp catches edits made by hand.
+        with self._file_lock:
+            counter, stamp = self._file_lock.read_counter(), self._stat()
+        return f"{counter}:missing" if stamp is None else f"{counter}:{stamp[0]}:{stamp[1]}"
+
+
+# ------------------ Shared table ------------------
+def _one_step(before: str, after: str) -> bool:
+    """Whether the stamp's write counter (its first field: the SQLite version,
+    the CSV lock-file counter) moved by exactly our own single write. A stamp
+    without one cannot tell, so the table reloads."""
+    try:
+        return int(after.split(":", 1)[0]) - int(before.split(":", 1)[0]) == 1
+    except ValueError:
+        return False
+
+
+class UserTable:
+    """Process-wide users DataFrame shared by every session.
+
+    The frame is loaded once and reloaded only when the store's version stamp
+    changes, so a rerun costs one stamp check instead of a full read. Readers
+    use `frame` directly (no copy) and must treat it as read-only; writes go
+    through the table, which applies them to the store and patches single
+    cells in place. Reloads and new rows publish a new (frame, positions)
+    pair with one assignment, so a reader never pairs positions from one
+    frame with another.
+    """
+
+    def __init__(self, store: UserStore):
+        self.store = store
+        self.generation = 0  # bumped on every full reload
+        self._lock = threading.RLock()
+        self._snapshot: Optional[Tuple[pd.DataFrame, Dict[str, int]]] = None  # (frame, username -> row)
+        self._version: Optional[str] = None
+
+    def refresh(self) -> pd.DataFrame:
+        """Return the shared frame, reloading it if the store changed since the last load."""
+        snapshot = self._snapshot
+        if snapshot is None or self.store.version() != self._version:
+            with self._lock:
+                version = self.store.version()
+                if self._snapshot is None or version != self._version:
+                    # Stamp first: a write racing the load only causes one extra reload.
+                    frame = clean_frame(self.store.to_frame())
+                    self._snapshot = (frame, dict(zip(frame["username"], range(len(frame)))))
+                    self._version = version
+                    self.generation += 1
+                snapshot = self._snapshot
+        return snapshot[0]
+
+    def _current(self) -> Tuple[pd.DataFrame, Dict[str, int]]:
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.refresh()
+            snapshot = self._snapshot
+        return snapshot
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        return self._current()[0]
+
+    def get(self, username: str) -> Optional[Dict]:
+        frame, positions = self._current()
+        pos = positions.get(username)
+        return frame.iloc[pos].to_dict() if pos is not None else None
+
+    def _write(self, fn):
+        """Run a store write; returns (result, patch) where patch says the frame may be
+        patched in place (no other writer touched the store since our last load)."""
+        with self._lock:
+            before = self.store.version()
+            result = fn()
+            after = self.store.version()
+            wrote = result is not None and result is not False
+            patch = before == self._version and (after == before or (wrote and _one_step(before, after)))
+            if patch:
+                self._version = after
+            return result, patch
+
+    def create_user(self, record: Dict) -> bool:
+        with self._lock:
+            created, patch = self._write(lambda: self.store.create_user(record))
+            if created and patch and self._snapshot is not None:
+                # Readers may hold the published frame: build a grown copy and swap it in.
+                frame, positions = self._snapshot
+                row = clean_frame(pd.DataFrame([record]))
+                grown = pd.concat([frame, row], ignore_index=True)
+                self._snapshot = (grown, {**positions, row["username"].iat[0]: len(grown) - 1})
+        return created
+
+    def update_user(self, username: str, **fields) -> bool:
+        with self._lock:
+            ok, patch = self._write(lambda: self.store.update_user(username, **fields))
+            if ok and patch and self._snapshot is not None:
+                frame, positions = self._snapshot
+                pos = positions.get(username)
+                if pos is not None:
+                    for col, val in fields.items():
+                        if col in USER_COLUMNS and col != "username":
+                            frame.iat[pos, USER_COLUMNS.index(col)] = val
+        return ok
+
+    def add_points(self, username: str, pts: int) -> Optional[int]:
+        with self._lock:
+            total, patch = self._write(lambda: self.store.add_points(username, pts))
+            if total is not None and patch and self._snapshot is not None:
+                frame, positions = self._snapshot
+                pos = positions.get(username)
+                if pos is not None:
+                    frame.iat[pos, USER_COLUMNS.index("points")] = total
+        return total
+
+
+# ------------------ Import & factory ------------------
+def import_csv(store: UserStore, csv_path: Path = DEFAULT_CSV_PATH, log: Optional[EventLog] = None) -> int:
+    """One-shot import of a legacy users.csv into `store`, with its actions as
+    event-log records (see utils.migrate). Returns users imported."""
+    from utils.migrate import Migration  # utils.migrate builds on this module
+
+    csv_path = Path(csv_path)
+    if not csv_path.exists():
+        return 0
+    run = Migration(store, log if log is not None else get_event_log())
+    run.load_csv(csv_path)
+    return run.stats.users
+
+
+BACKENDS = {
+    "sqlite": SQLiteUserStore,
+    "csv": CSVUserStore,
+}
+
+_store: Optional[UserStore] = None
+_store_lock = threading.Lock()
+
+
+def open_store(backend: str = DEFAULT_BACKEND, path: Optional[Path] = None,
+               csv_path: Optional[Path] = None) -> UserStore:
+    """Create a store for `backend`. A fresh SQLite store imports `csv_path` once;
+    that defaults to data/users.csv for the default store only, so a store
+    opened at a custom `path` starts empty unless a CSV is named."""
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown user store backend: {backend!r} (expected one of {sorted(BACKENDS)})")
+    store = BACKENDS[backend](path) if path else BACKENDS[backend]()
+    if csv_path is None and path is None:
+        csv_path = DEFAULT_CSV_PATH
+    if isinstance(store, SQLiteUserStore) and csv_path is not None and store.get_meta("csv_imported") is None:
+        imported = import_csv(store, csv_path)
+        store.set_meta("csv_imported", str(imported))
+    return store
+
+
+def set_store(store: Optional[UserStore]) -> None:
+    """Replace the process-wide default store (None re-opens the default on next use)."""
+    global _store
+    with _store_lock:
+        _store = store
+
+
+def get_store() -> UserStore:
+    """Return the process-wide default store."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = open_store()
+    return _store
+
+
+_table: Optional[UserTable] = None
+
+
+def get_user_table() -> UserTable:
+    """Return the process-wide shared user table over the default store."""
+    global _table
+    store = get_store()
+    if _table is None or _table.store is not store:
+        with _store_lock:
+            if _table is None or _table.store is not store:
+                _table = UserTable(store)
+    return _table
@@ -0,0 +1,226 @@
+# utils/timeseries.py
+# Per-user points time-series. Awards from the event log are folded into
+# daily, weekly (Monday-aligned) and monthly rollups in a small SQLite file,
+# incrementally from a cursor into the log, so the history survives reloads
+# and restarts. A history chart asks for a time range and gets it at the
+# coarsest level that still fits its point budget: a few hundred rows from
+# one primary-key range scan, however long the user has been active.
+import sqlite3
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from utils.events import EventLog, get_event_log, user_id
+
+DEFAULT_SERIES_PATH = Path("data") / "points_ts.db"
+MAX_POINTS = 400  # rows a history chart is given at most
+
+DAY_S = 86_400
+
+
+def _buckets(ts_ms: np.ndarray) -> Iterator[Tuple[str, np.ndarray]]:
+    """(level, bucket start in epoch seconds) for each level, per timestamp."""
+    days = ts_ms // (DAY_S * 1000)
+    yield "day", days * DAY_S
+    yield "week", ((days + 3) // 7 * 7 - 3) * DAY_S  # 1970-01-01 was a Thursday
+    months = days.astype("datetime64[D]").astype("datetime64[M]")
+    yield "month", months.astype("datetime64[s]").astype(np.int64)
+
+
+def _bucket_start(ts: pd.Timestamp, level: str) -> int:
+    """Epoch seconds of the `level` bucket holding `ts`."""
+    return int(dict(_buckets(np.array([ts.value // 1_000_000])))[level][0])
+
+
+def _bucket_starts(lo: int, hi: int, level: str) -> np.ndarray:
+    """Every bucket start from `lo` to `hi`, in epoch seconds. Built in numpy:
+    pd.date_range generates weekly and monthly ranges element by element."""
+    if level == "month":
+        months = np.arange(np.datetime64(lo, "s").astype("datetime64[M]"),
+                           np.datetime64(hi, "s").astype("datetime64[M]") + 1)
+        starts = months.astype("datetime64[s]").astype(np.int64)
+    else:
+        starts = np.arange(lo, hi + 1, DAY_S if level == "day" else 7 * DAY_S)
+    return starts
+
+
+def _utc(ts) -> pd.Timestamp:
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize("UTC") if ts.tzinfo is None else ts.tz_convert("UTC")
+
+
+class PointsSeries:
+    """Daily / weekly / monthly points rollups per user, fed from the event log."""
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS rollup (
+        user   INTEGER NOT NULL,
+        level  TEXT    NOT NULL,
+        bucket INTEGER NOT NULL,
+        points INTEGER NOT NULL,
+        count  INTEGER NOT NULL,
+        PRIMARY KEY (user, level, bucket)
+    ) WITHOUT ROWID;
+    CREATE TABLE IF NOT EXISTS cursor (
+        id      INTEGER PRIMARY KEY CHECK (id = 0),
+        segment INTEGER NOT NULL,
+        record  INTEGER NOT NULL
+    );
+    INSERT OR IGNORE INTO cursor (id, segment, record) VALUES (0, 1, 0);
+    """
+
+    UPSERT = """
+    INSERT INTO rollup (user, level, bucket, points, count) VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (user, level, bucket) DO UPDATE
+    SET points = points + excluded.points, count = count + excluded.count
+    """
+
+    def __init__(self, path: Path = DEFAULT_SERIES_PATH, log: Optional[EventLog] = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._log = log
+        self._local = threading.local()  # one sqlite3 connection per thread
+        with self._conn() as conn:
+            conn.executescript(self.SCHEMA)
+
+    @property
+    def log(self) -> EventLog:
+        return self._log if self._log is not None else get_event_log()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level="IMMEDIATE")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _cursor(self, conn: sqlite3.Connection) -> Tuple[int, int]:
+        return conn.execute("SELECT segment, record FROM cursor WHERE id = 0").fetchone()
+
+    # ------------------ Ingest ------------------
+    def sync(self) -> int:
+        """Fold events appended since the last sync into the rollups. Returns how many.
+
+        The cursor is read and advanced in the same write transaction as the
+        upserts, so with several app processes each event is counted once.
+        """
+        conn = self._conn()
+        segment, offset = self._cursor(conn)
+        if not any(len(recs) for _, _, recs in self.log.read_since(segment, offset)):
+            return 0  # the common case: nothing new, no write lock taken
+        added = 0
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            segment, offset = self._cursor(conn)  # another process may have synced meanwhile
+            for segment, offset, recs in self.log.read_since(segment, offset):
+                if len(recs):
+                    conn.executemany(self.UPSERT, self._aggregate(recs))
+                    added += len(recs)
+            conn.execute("UPDATE cursor SET segment = ?, record = ? WHERE id = 0", (segment, offset))
+        return added
+
+    @staticmethod
+    def _aggregate(recs: np.ndarray) -> Iterator[Tuple[int, str, int, int, int]]:
+        users = recs["user"].view(np.int64)  # SQLite integers are signed
+        points = recs["points"].astype(np.int64)
+        for level, bucket in _buckets(recs["ts"]):
+            keys = np.empty(len(recs), dtype=[("user", np.int64), ("bucket", np.int64)])
+            keys["user"], keys["bucket"] = users, bucket
+            uniq, inv = np.unique(keys, return_inverse=True)
+            sums = np.bincount(inv, weights=points, minlength=len(uniq)).astype(np.int64)
+            counts = np.bincount(inv, minlength=len(uniq))
+            for (u, b), p, n in zip(uniq.tolist(), sums.tolist(), counts.tolist()):
+                yield u, level, b, p, n
+
+    # ------------------ Queries ------------------
+    @staticmethod
+    def level_for(start: pd.Timestamp, end: pd.Timestamp, max_points: int = MAX_POINTS) -> str:
+        """The finest level that draws [start, end] in at most `max_points` buckets."""
+        days = (end - start).total_seconds() / DAY_S
+        if days <= max_points:
+            return "day"
+        if days / 7 <= max_points:
+            return "week"
+        return "month"
+
+    def first_bucket(self, username: str) -> Optional[pd.Timestamp]:
+        """Start of the user's first active month, or None if they have no events."""
+        self.sync()
+        uid = np.uint64(user_id(username)).view(np.int64).item()
+        row = self._conn().execute(
+            "SELECT MIN(bucket) FROM rollup WHERE user = ? AND level = 'month'", (uid,)).fetchone()
+        return None if row[0] is None else pd.Timestamp(row[0], unit="s", tz="UTC")
+
+    def series(self, username: str, start=None, end=None, max_points: int = MAX_POINTS,
+               current: Optional[int] = None) -> pd.DataFrame:
+        """The user's points over [start, end] at the level that fits `max_points`.
+
+        Indexed by bucket start (UTC) with columns earned, actions and total
+        (running balance, including everything earned before `start`). Empty
+        buckets are kept as zero rows so the line is flat across them. With
+        `current`, the balance is shifted to end at that value (points granted
+        outside the event log, e.g. before it existed).
+        """
+        self.sync()
+        end = _utc(end if end is not None else datetime.now(timezone.utc))
+        if start is None:
+            start = self.first_bucket(username)
+        start = _utc(start) if start is not None else end.normalize()
+        level = self.level_for(start, end, max_points)
+        lo, hi = _bucket_start(start, level), _bucket_start(end, level)
+        uid = np.uint64(user_id(username)).view(np.int64).item()
+        conn = self._conn()
+        rows = conn.execute(
+            "SELECT bucket, points, count FROM rollup WHERE user = ? AND level = ? AND bucket BETWEEN ? AND ?",
+            (uid, level, lo, hi)).fetchall()
+
+        # Balance before the range: whole months, then the days up to `lo`.
+        month_lo = _bucket_start(pd.Timestamp(lo, unit="s", tz="UTC"), "month")
+        before = conn.execute(
+            "SELECT COALESCE(SUM(points), 0) FROM rollup WHERE user = ? AND level = 'month' AND bucket < ?",
+            (uid, month_lo)).fetchone()[0]
+        before += conn.execute(
+            "SELECT COALESCE(SUM(points), 0) FROM rollup WHERE user = ? AND level = 'day' AND bucket >= ? AND bucket < ?",
+            (uid, month_lo, lo)).fetchone()[0]
+
+        starts = _bucket_starts(lo, hi, level)
+        earned = np.zeros(len(starts), dtype=np.int64)
+        actions = np.zeros(len(starts), dtype=np.int64)
+        if rows:
+            bucket, pts, count = (np.array(col, dtype=np.int64) for col in zip(*rows))
+            pos = np.searchsorted(starts, bucket)
+            earned[pos], actions[pos] = pts, count
+        total = before + np.cumsum(earned)
+        if current is not None and len(total):
+            total += int(current) - int(total[-1])
+        index = pd.DatetimeIndex(pd.to_datetime(starts, unit="s", utc=True), name="time")
+        df = pd.DataFrame({"earned": earned, "actions": actions, "total": total}, index=index)
+        df.attrs["level"] = level
+        return df
+
+
+_series: Optional[PointsSeries] = None
+_series_lock = threading.Lock()
+
+
+def set_points_series(series: Optional[PointsSeries]) -> None:
+    """Replace the process-wide points series (None re-opens the default on next use)."""
+    global _series
+    with _series_lock:
+        _series = series
+
+
+def get_points_series() -> PointsSeries:
+    """Return the process-wide points series."""
+    global _series
+    if _series is None:
+        with _series_lock:
+            if _series is None:
+                _series = PointsSeries()
+    return _series
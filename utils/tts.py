@@ -0,0 +1,188 @@
+# utils/tts.py
+# Voice-tip audio. Clips are content-addressed by a hash of (backend, voice,
+# text) and kept in a memory LRU in front of data/tts/ on disk, so playback
+# is a dictionary lookup and no two sessions ever share a scratch file. Misses
+# are synthesized by one background worker thread: gTTS first (online), then
+# pyttsx3 (offline) if gTTS is missing or the network call fails. The known
+# tips are queued for synthesis when the service is first created.
+import hashlib
+import importlib.util
+import io
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional
+
+from utils.bytecache import ByteCache
+
+DEFAULT_AUDIO_DIR = Path("data") / "tts"
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+DEFAULT_VOICE = "en"
+
+CHARGE_TIP = "Charge during the recommended window to maximize renewable energy and cut carbon emissions."
+TIPS = (CHARGE_TIP,)
+
+
+@dataclass(frozen=True)
+class Clip:
+    data: bytes
+    mime: str
+
+
+def _mime(data: bytes) -> str:
+    if data[:4] == b"RIFF":
+        return "audio/wav"
+    if data[:4] == b"FORM":
+        return "audio/aiff"
+    return "audio/mpeg"
+
+
+# ------------------ Backends ------------------
+# name -> synthesize(text, voice) -> audio bytes. Tried in this order.
+def _gtts(text: str, voice: str) -> bytes:
+    from gtts import gTTS
+
+    buf = io.BytesIO()
+    gTTS(text, lang=voice).write_to_fp(buf)
+    return buf.getvalue()
+
+
+def _pyttsx3(text: str, voice: str) -> bytes:
+    import pyttsx3
+
+    # pyttsx3 can only render to a file; use a private one per clip.
+    fd, tmp = tempfile.mkstemp(suffix=".wav")
+    os.close(fd)
+    try:
+        engine = pyttsx3.init()
+        engine.save_to_file(text, tmp)
+        engine.runAndWait()
+        return Path(tmp).read_bytes()
+    finally:
+        os.unlink(tmp)
+
+
+SYNTHESIZERS: Dict[str, Callable[[str, str], bytes]] = {"gtts": _gtts, "pyttsx3": _pyttsx3}
+
+
+def available_backends() -> List[str]:
+    """Installed backends in preference order (checked without importing them)."""
+    return [name for name in SYNTHESIZERS if importlib.util.find_spec(name) is not None]
+
+
+def clip_key(text: str, voice: str, backend: str) -> str:
+    return hashlib.sha256(f"{backend}\0{voice}\0{text}".encode("utf-8")).hexdigest()
+
+
+class TipAudio:
+    """Memory + disk cache of synthesized clips with a single background synthesizer."""
+
+    def __init__(self, root: Path = DEFAULT_AUDIO_DIR, backends: Optional[List[str]] = None,
+                 voice: str = DEFAULT_VOICE, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.backends = available_backends() if backends is None else list(backends)
+        self.voice = voice
+        self._memory = ByteCache(max_bytes)
+        # One thread: synthesis is rare, and pyttsx3 engines are not thread-safe.
+        self._worker = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts")
+        self._pending: Dict[str, Future] = {}
+        self._lock = threading.RLock()  # a done-callback may run inline under it
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{key}.audio"
+
+    def cached(self, text: str) -> Optional[Clip]:
+        """The clip from memory or disk (any backend, preferred first), or None."""
+        for backend in self.backends:
+            key = clip_key(text, self.voice, backend)
+            data = self._memory.get(key)
+            if data is None:
+                path = self._path(key)
+                if not path.exists():
+                    continue
+                data = self._memory.put(key, path.read_bytes())
+            return Clip(data, _mime(data))
+        return None
+
+    def _synthesize(self, text: str) -> Optional[Clip]:
+        clip = self.cached(text)  # finished by an earlier task since it was queued
+        if clip is not None:
+            return clip
+        for backend in self.backends:
+            try:
+                data = SYNTHESIZERS[backend](text, self.voice)
+            except Exception:
+                continue  # offline, or the backend is broken: try the next one
+            if not data:
+                continue
+            key = clip_key(text, self.voice, backend)
+            path = self._path(key)
+            tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            tmp.write_bytes(data)
+            os.replace(tmp, path)
+            self._memory.put(key, data)
+            return Clip(data, _mime(data))
+        return None
+
+    def request(self, text: str) -> Future:
+        """Future for the clip: already resolved on a cache hit, else queued once per text."""
+        clip = self.cached(text)
+        if clip is not None:
+            fut: Future = Future()
+            fut.set_result(clip)
+            return fut
+        with self._lock:
+            fut = self._pending.get(text)
+            if fut is None:
+                fut = self._worker.submit(self._synthesize, text)
+                self._pending[text] = fut
+                fut.add_done_callback(lambda _f, t=text: self._forget(t))
+            return fut
+
+    def _forget(self, text: str) -> None:
+        with self._lock:
+            self._pending.pop(text, None)
+
+    def get(self, text: str, timeout: Optional[float] = None) -> Optional[Clip]:
+        """The clip, waiting up to `timeout` seconds for synthesis (None: don't wait)."""
+        fut = self.request(text)
+        if timeout is None and not fut.done():
+            return None
+        try:
+            return fut.result(timeout)
+        except Exception:
+            return None
+
+    def warm(self, texts: Iterable[str] = TIPS) -> None:
+        """Queue synthesis of every text not cached yet."""
+        for text in texts:
+            self.request(text)
+
+    def close(self) -> None:
+        self._worker.shutdown(wait=False, cancel_futures=True)
+
+
+_audio: Optional[TipAudio] = None
+_audio_lock = threading.Lock()
+
+
+def set_tip_audio(audio: Optional[TipAudio]) -> None:
+    """Replace the process-wide tip audio service (None re-opens the default on next use)."""
+    global _audio
+    with _audio_lock:
+        _audio = audio
+
+
+def get_tip_audio() -> TipAudio:
+    """Return the process-wide tip audio service, warming the known tips on first use."""
+    global _audio
+    if _audio is None:
+        with _audio_lock:
+            if _audio is None:
+                _audio = TipAudio()
+                _audio.warm()
+    return _audio
@@ -1,10 +1,41 @@
 # utils/weather.py
+import math
+import threading
+import numpy as np
 import requests
-from datetime import datetime, timezone
+import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from utils.scoring import score
 
 OWM_ONECALL = "https://api.openweathermap.org/data/2.5/onecall"
+OPEN_METEO_FORECAST = "https://api.open-meteo.com/v1/forecast"
 
-def fetch_hourly_weather(lat, lon, api_key):
+MAX_CONCURRENCY = 8
+
+# Open-Meteo solar variable, preferred first. Some deployments reject
+# shortwave_radiation with a 400; the variant an endpoint accepted is
+# remembered per base URL so later fetches don't repeat the failing request.
+OPEN_METEO_SOLAR = ("shortwave_radiation", "solar_radiation")
+_solar_variant = {}  # base_url -> accepted solar variable
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session() -> requests.Session:
+    """Shared keep-alive session; its pool holds up to MAX_CONCURRENCY connections per host."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                s = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=MAX_CONCURRENCY)
+                s.mount("http://", adapter)
+                s.mount("https://", adapter)
+                _session = s
+    return _session
+
+def fetch_hourly_weather(lat, lon, api_key, base_url=OWM_ONECALL):
     """Return hourly forecast list (next 48 hours) from OWM OneCall (JSON)."""
     params = {
         "lat": lat,
@@ -13,18 +44,106 @@ def fetch_hourly_weather(lat, lon, api_key):
         "units": "metric",
         "appid": api_key
     }
-    r = requests.get(OWM_ONECALL, params=params, timeout=10)
+    r = get_session().get(base_url, params=params, timeout=10)
     r.raise_for_status()
     data = r.json()
     return data["hourly"], data["timezone_offset"]
 
+def fetch_open_meteo(lat: float, lon: float, hours: int = 72, base_url: str = OPEN_METEO_FORECAST) -> pd.DataFrame:
+    """Fetch hourly solar proxy & wind (UTC) from Open-Meteo. Returns 0..hours DataFrame.
+    Uses 'shortwave_radiation' when available; falls back to 'solar_radiation'
+    (and asks for that one first next time if the endpoint rejected the other)."""
+    params = {
+        "latitude": float(lat),
+        "longitude": float(lon),
+        "forecast_days": min(16, max(1, math.ceil(hours / 24))),
+        "timezone": "UTC",
+    }
+    session = get_session()
+    first = _solar_variant.get(base_url, OPEN_METEO_SOLAR[0])
+    for solar in (first, *(v for v in OPEN_METEO_SOLAR if v != first)):
+        params["hourly"] = f"{solar},wind_speed_10m,cloudcover"
+        r = session.get(base_url, params=params, timeout=15)
+        if r.status_code != 400:
+            break
+    r.raise_for_status()
+    _solar_variant[base_url] = solar
+    return open_meteo_frame(r.json(), hours)
+
+def open_meteo_frame(data, hours=None):
+    """Parse an Open-Meteo forecast response into the UTC (solar, wind, cloud) frame."""
+    hourly = data.get("hourly", {})
+    times = pd.to_datetime(hourly.get("time", []), utc=True)
+    solar_series = hourly.get("shortwave_radiation") or hourly.get("solar_radiation") or [0] * len(times)
+    df = pd.DataFrame({
+        "time": times,
+        "solar": solar_series,
+        "wind": hourly.get("wind_speed_10m", [0] * len(times)),
+        "cloud": hourly.get("cloudcover", [0] * len(times)),
+    }).set_index("time")
+    return df.iloc[:hours].copy() if hours is not None else df
+
+def fetch_many(fetch, coords, max_workers=MAX_CONCURRENCY, return_exceptions=False, **kwargs):
+    """Run `fetch(lat, lon, **kwargs)` for many coordinates concurrently over the shared session.
+
+    Results come back in input order. With return_exceptions=True a failed
+    location holds its exception instead of aborting the whole batch.
+    """
+    coords = list(coords)
+    if not coords:
+        return []
+
+    def one(latlon):
+        try:
+            return fetch(latlon[0], latlon[1], **kwargs)
+        except Exception as e:
+            if return_exceptions:
+                return e
+            raise
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(coords)))) as pool:
+        return list(pool.map(one, coords))
+
+def fetch_open_meteo_many(coords, hours=72, max_workers=MAX_CONCURRENCY, return_exceptions=False,
+                          base_url=OPEN_METEO_FORECAST):
+    """One Open-Meteo DataFrame per (lat, lon), fetched concurrently."""
+    return fetch_many(fetch_open_meteo, coords, max_workers=max_workers, return_exceptions=return_exceptions,
+                      hours=hours, base_url=base_url)
+
 def compute_green_score(hourly_row, timezone_offset=0):
     """
     Simple green score: 1 - cloud_fraction, only if daytime (6–18h local time).
+    Single-row form of the engine's "cloud_daytime" scorer.
     """
-    clouds = hourly_row.get("clouds", 0) / 100.0
-    dt = datetime.fromtimestamp(hourly_row["dt"] + timezone_offset, tz=timezone.utc)
-    hour = dt.hour
-    is_day = 6 <= hour <= 18
-    base = max(0.0, 1.0 - clouds)
-    return base if is_day else 0.0
+    cols = {"ts": [hourly_row["dt"]], "cloud": [hourly_row.get("clouds", 0)]}
+    return float(score(cols, "cloud_daytime", timezone_offset=timezone_offset)[0])
+
+def compute_green_scores(dt, clouds, timezone_offset=0, dtype=np.float64, out=None):
+    """Vectorized compute_green_score over arrays of unix timestamps and cloud %."""
+    return score({"ts": dt, "cloud": clouds}, "cloud_daytime", dtype=dtype, out=out,
+                 timezone_offset=timezone_offset)
+
+def owm_hourly_frame(hourly, timezone_offset=0):
+    """Columnar view of an OWM `hourly` list in the fetch_open_meteo layout.
+
+    Returns a UTC-indexed frame with solar (UV index as the solar proxy),
+    wind, cloud and the cloud-only green_score, all computed on arrays.
+    """
+    n = len(hourly)
+    dt = np.fromiter((h["dt"] for h in hourly), dtype=np.int64, count=n)
+    clouds = np.fromiter((h.get("clouds", 0) for h in hourly), dtype=float, count=n)
+    wind = np.fromiter((h.get("wind_speed", 0) for h in hourly), dtype=float, count=n)
+    uvi = np.fromiter((h.get("uvi", 0) for h in hourly), dtype=float, count=n)
+    df = pd.DataFrame({
+        "time": pd.to_datetime(dt, unit="s", utc=True),
+        "solar": uvi,
+        "wind": wind,
+        "cloud": clouds,
+        "green_score": compute_green_scores(dt, clouds, timezone_offset),
+    }).set_index("time")
+    return df
+
+def fetch_owm_frame(lat, lon, api_key, hours=48, base_url=OWM_ONECALL):
+    """OWM OneCall forecast as a frame (see owm_hourly_frame), first `hours` rows."""
+    hourly, offset = fetch_hourly_weather(lat, lon, api_key, base_url=base_url)
+    return owm_hourly_frame(hourly[:hours], offset)
@@ -0,0 +1,28 @@
+# views/__init__.py
+# One module per sidebar page, each exposing render(ctx). app.py imports only
+# the selected page, so a page's code (and heavy libraries such as matplotlib
+# or reportlab) is loaded the first time that page is opened, never on the
+# reruns of other pages. (Not named `pages/`: Streamlit would auto-register it.)
+import importlib
+from dataclasses import dataclass
+
+PAGES = {
+    "🏠 Dashboard": "dashboard",
+    "⚡ Charging": "charging",
+    "🧮 Simulator": "simulator",
+    "🎁 Rewards": "rewards",
+    "📄 Reports": "reports",
+    "⚙️ Settings": "settings",
+}
+
+
+@dataclass(frozen=True)
+class PageContext:
+    """Per-rerun values computed by app.py that pages need (theme colours)."""
+    text_color: str
+    muted_color: str
+    accent: str
+
+
+def render(selected: str, ctx: PageContext) -> None:
+    importlib.import_module(f"views.{PAGES[selected]}").render(ctx)
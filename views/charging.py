@@ -0,0 +1,140 @@
+# views/charging.py
+# Renewable-aware charging optimizer. The plan chart comes from utils.charts
+# (cached PNG bytes); matplotlib is only imported when a chart is first drawn.
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional, Tuple
+
+import pandas as pd
+import streamlit as st
+
+from utils.charts import NATIVE_CHART_POINTS, green_score_chart, native_frame
+from utils.exports import available_formats, frame_chunks
+from utils.charging import best_window, slots_per_hour, top_k_windows
+from utils.forecast_cache import get_forecast_cache
+from utils.scoring import score_frame
+from utils.weather import fetch_open_meteo as open_meteo_forecast
+from views import PageContext
+from views.common import export_button, fragment
+
+
+@dataclass
+class EVProfile:
+    charger_power: float
+    battery_capacity: float
+    current_soc: int
+    target_soc: int
+
+
+def fmt_dt(dt: datetime) -> str:
+    return dt.strftime("%Y-%m-%d %H:%M")
+
+
+def fetch_open_meteo(lat_f: str, lon_f: str, hours: int = 72) -> pd.DataFrame:
+    """Hourly solar proxy & wind (UTC) from Open-Meteo for the grid cell around (lat, lon).
+    Served from the shared on-disk forecast cache; only a miss or expired entry hits the network."""
+    return get_forecast_cache().get_or_fetch("open-meteo", float(lat_f), float(lon_f), hours, open_meteo_forecast)
+
+
+def compute_green_score(df: pd.DataFrame) -> pd.DataFrame:
+    """Weighted green score using normalized solar (70%) and wind (30%), scaled by cloud factor."""
+    return score_frame(df, "solar_wind_mix")
+
+
+def find_best_charging_window(df_before: pd.DataFrame, hours_needed: int) -> Tuple[Optional[datetime], Optional[float]]:
+    """Prefix-sum window search for the contiguous hours_needed block with max average green_score."""
+    if df_before.empty or hours_needed <= 0:
+        return None, None
+    width = hours_needed * slots_per_hour(df_before.index)
+    i, avg = best_window(df_before["green_score"].values, width)
+    if i < 0:
+        return None, None
+    return df_before.index[i], avg
+
+
+def find_charging_windows(df_before: pd.DataFrame, hours_needed: int, k: int = 3) -> pd.DataFrame:
+    """Top-k non-overlapping charging windows as a DataFrame (rank, start, end, avg_green)."""
+    cols = ["rank", "start", "end", "avg_green"]
+    if df_before.empty or hours_needed <= 0:
+        return pd.DataFrame(columns=cols)
+    width = hours_needed * slots_per_hour(df_before.index)
+    rows = [
+        (r + 1, df_before.index[i], df_before.index[i] + timedelta(hours=hours_needed), round(avg, 3))
+        for r, (i, avg) in enumerate(top_k_windows(df_before["green_score"].values, width, k))
+    ]
+    return pd.DataFrame(rows, columns=cols)
+
+
+@fragment
+def _plan_panel(text_color: str) -> None:
+    """Plan / export buttons and their results; a click reruns only this panel."""
+    lat, lon = st.session_state.latlon
+    ep = st.session_state.ev_profile
+    departure_time = st.session_state.departure
+
+    # Buttons
+    colb = st.columns(3)
+    get_plan = colb[0].button("📈 Get Charging Plan")
+    fmt = colb[2].selectbox("Export format", available_formats(), label_visibility="collapsed")
+    with colb[1]:
+        export_button(f"⬇️ Export 24h {fmt.upper()}",
+                      lambda: frame_chunks(compute_green_score(fetch_open_meteo(lat, lon, hours=24))),
+                      "renewables_24h", fmt)
+
+    if get_plan:
+        try:
+            df = fetch_open_meteo(lat, lon, hours=72)
+            df = compute_green_score(df)
+            st.success("Renewable forecast fetched.")
+
+            needed_kwh = ep["battery_capacity"] * max(0.0, (ep["target_soc"] - ep["current_soc"]) / 100.0)
+            hours_needed = max(1, math.ceil(needed_kwh / max(0.1, ep["charger_power"])))
+
+            df_before = df[df.index <= departure_time]
+            if df_before.empty:
+                st.warning("No forecast hours available before departure time.")
+            else:
+                best_start, best_avg = find_best_charging_window(df_before, hours_needed)
+                if best_start is not None:
+                    best_end = best_start + timedelta(hours=hours_needed)
+                    st.success(
+                        f"Recommended (UTC): **{fmt_dt(best_start)} → {fmt_dt(best_end)}** (avg green score {best_avg:.2f})"
+                    )
+
+                    start_idx = df_before.index.get_loc(best_start)
+                    width = hours_needed * slots_per_hour(df_before.index)  # rows, not hours
+                    if len(df_before) > NATIVE_CHART_POINTS:
+                        st.line_chart(native_frame(df_before, start_idx, width))
+                    else:
+                        st.image(green_score_chart(df_before, start_idx, width, text_color))
+
+                    alternatives = find_charging_windows(df_before, hours_needed, k=3)
+                    if len(alternatives) > 1:
+                        st.markdown("##### Ranked charging options")
+                        st.dataframe(alternatives, use_container_width=True, hide_index=True)
+
+                    # Preview table
+                    plot_df = df_before.copy()
+                    plot_df["recommended"] = 0
+                    plot_df.iloc[start_idx:start_idx + width, plot_df.columns.get_loc("recommended")] = 1
+                    preview = plot_df.reset_index().rename(columns={"index": "time"})
+                    cols_show = [c for c in ["time", "solar", "wind", "cloud", "green_score", "recommended"] if c in preview.columns]
+                    st.dataframe(preview[cols_show].head(24), use_container_width=True, hide_index=True)
+                    export_button(f"⬇️ Export plan {fmt.upper()}", lambda: frame_chunks(preview[cols_show]),
+                                  "charging_plan", fmt)
+                else:
+                    st.warning("Couldn't find a contiguous block matching the required charging duration.")
+        except Exception as e:
+            st.error("Failed to fetch/process forecast: " + str(e))
+
+
+def render(ctx: PageContext) -> None:
+    st.markdown("### ⚡ Renewable-aware EV Charging Optimizer")
+    st.caption("We compute a green score (solar + wind) and recommend the best charging window before your departure.")
+    _plan_panel(ctx.text_color)
+
+    st.markdown(
+        f"<span class='small-muted'>💡 Tip: Rooftop solar? Prefer daytime charging (11:00–15:00 local). Wind peaks vary by region.</span>",
+        unsafe_allow_html=True,
+    )
@@ -0,0 +1,155 @@
+# views/common.py
+# State and widgets shared by app.py and the page modules: the process-wide
+# leaderboard, user helpers that write through the shared user table, the
+# fragment decorator and the card components.
+import io
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+import pandas as pd
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+
+from utils.events import get_event_log
+from utils.exports import FORMATS, export_tempfile
+from utils.leaderboard import Leaderboard
+from utils.store import get_user_table
+
+
+LOGO_PATH = Path("assets/logo.png")
+LEADERBOARD_REFRESH_S = 30
+
+
+def fragment(fn=None, **kwargs):
+    """st.fragment (or st.experimental_fragment on older Streamlit): widgets
+    inside rerun only the decorated function, not the whole script. Without
+    fragment support it is a no-op and interactions rerun the page as before."""
+    deco = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+    if deco is None:
+        wrap = lambda f: f
+    else:
+        wrap = deco(**kwargs) if kwargs else deco
+    return wrap(fn) if fn is not None else wrap
+
+
+@st.cache_resource(show_spinner=False)
+def logo_png(width: int) -> Optional[bytes]:
+    """The logo downscaled once to `width` px (None if missing). Given the
+    full-size file, st.image decodes, resizes and re-encodes it on every rerun."""
+    if not LOGO_PATH.exists():
+        return None
+    from PIL import Image
+
+    with Image.open(LOGO_PATH) as im:
+        im = im.resize((width, round(im.height * width / im.width)), Image.BILINEAR)
+        buf = io.BytesIO()
+        im.save(buf, format="PNG")
+    return buf.getvalue()
+
+
+@st.cache_resource(show_spinner=False)
+def _leaderboard() -> Leaderboard:
+    return Leaderboard()
+
+
+def get_leaderboard() -> Leaderboard:
+    """Process-wide leaderboard index, updated on every points change and
+    synced against the user table when it reloads (only changed rows move)."""
+    table = get_user_table()
+    board = _leaderboard()
+    version = (table, table.generation)  # a new table (set_store) counts from 0 again
+    if board.version != version:
+        board.sync(table.frame, version)
+    return board
+
+
+def ensure_user(username: str, email: str = "", vehicle: str = "Non-EV") -> None:
+    if not username:
+        return
+    if get_user_table().get(username) is None:
+        new_row = {
+            "username": username,
+            "email": email,
+            "vehicle_type": vehicle,
+            "points": 0,
+            "actions": "",
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        if get_user_table().create_user(new_row):
+            get_leaderboard().update(username, 0, vehicle)
+
+
+def user_points(username: str) -> int:
+    user = get_user_table().get(username) if username else None
+    return int(user["points"]) if user else 0
+
+
+def add_action_points(username: str, label: str, pts: int) -> None:
+    if not username:
+        return
+    ensure_user(username)
+    new_points = get_user_table().add_points(username, int(pts))
+    if new_points is None:
+        return
+    get_event_log().append(username, label, int(pts))
+    get_leaderboard().update(username, new_points)
+
+
+@fragment(run_every=LEADERBOARD_REFRESH_S)
+def leaderboard_panel(n: int) -> None:
+    """Top-`n` table, refreshed on its own timer so other users' points show up
+    without rerunning the page."""
+    leaderboard = get_leaderboard()
+    if len(leaderboard):
+        st.dataframe(leaderboard.top(n), use_container_width=True, hide_index=True)
+    else:
+        st.info("No users yet — be the first!")
+
+
+def export_button(label: str, chunks: Callable[[], Iterator[pd.DataFrame]], name: str, fmt: str = "csv",
+                  key: Optional[str] = None) -> None:
+    """Download button whose file is written by utils.exports only when clicked
+    (`chunks` is called then, not on every rerun). Streamlit versions without
+    deferred downloads get a two-step "prepare, then download" fallback.
+
+    Memory is bounded by one chunk only while the file is written (to a
+    temporary file). Streamlit's media file manager then reads the finished
+    file into memory to serve it, whether it gets bytes, a file or a path, so
+    a download still holds the whole export once; for very large tables use
+    the `python -m utils.exports` CLI, which streams to disk end to end."""
+    mime, ext = FORMATS[fmt]
+    make = lambda: export_tempfile(chunks(), fmt)
+    try:
+        st.download_button(label, make, file_name=name + ext, mime=mime, key=key, on_click="ignore")
+    except (StreamlitAPIException, TypeError):
+        if st.button(f"Prepare {label}", key=None if key is None else f"{key}-prepare"):
+            st.download_button(label, make().read(), file_name=name + ext, mime=mime, key=key)
+
+
+def saas_card(title: str, inner_html: str, text_color: str, icon: str = "📊") -> None:
+    st.markdown(
+        f"""
+        <div class='card'>
+          <div style='display:flex; align-items:center; gap:10px; margin-bottom:8px;'>
+            <div style='font-size:22px'>{icon}</div>
+            <div style='font-weight:700; font-size:18px'>{title}</div>
+          </div>
+          <div style='font-size:15px; color:{text_color};'>{inner_html}</div>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
+
+
+def kpi(title: str, value: str, help_text: str = "", muted_color: str = "#4b5563"):
+    st.markdown(
+        f"""
+        <div class='card' style='padding:16px'>
+           <div style='font-size:14px; color:{muted_color}; margin-bottom:6px'>{title}</div>
+           <div style='font-size:28px; font-weight:800;'>{value}</div>
+           <div class='small-muted'>{help_text}</div>
+        </div>
+        """,
+        unsafe_allow_html=True,
+    )
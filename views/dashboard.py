@@ -0,0 +1,45 @@
+# views/dashboard.py
+from datetime import datetime, timedelta, timezone
+
+import streamlit as st
+
+from utils.timeseries import get_points_series
+from views import PageContext
+from views.common import kpi, leaderboard_panel
+
+# label -> how far back the history chart reaches (None: since the first action)
+HISTORY_RANGES = {"30 days": timedelta(days=30), "12 months": timedelta(days=365), "All time": None}
+
+
+def render(ctx: PageContext) -> None:
+    st.markdown("### 📊 Dashboard")
+
+    c1, c2, c3 = st.columns(3)
+    with c1:
+        kpi("Eco Points", str(st.session_state.points), "Earn more by completing eco actions", ctx.muted_color)
+    with c2:
+        # pretend KPI from last charging plan (if any)
+        kpi("Green Charging %", "—", "Run a charging plan to update", ctx.muted_color)
+    with c3:
+        # sim CO2 saved estimate placeholder
+        kpi("Estimated CO₂ Saved", "—", "Use Simulator to see potential savings", ctx.muted_color)
+
+    # Points history chart
+    st.markdown("#### 📈 Points History")
+    username = st.session_state.authed_user
+    if username:
+        span = st.radio("Range", list(HISTORY_RANGES), horizontal=True, label_visibility="collapsed")
+        now = datetime.now(timezone.utc)
+        start = now - HISTORY_RANGES[span] if HISTORY_RANGES[span] else None
+        # Rollups at the level that fits the range: a few hundred rows at most.
+        hist_df = get_points_series().series(username, start=start, end=now, current=st.session_state.points)
+        if hist_df["total"].any():
+            st.line_chart(hist_df["total"])
+        else:
+            st.info("Perform actions to build up your history chart.")
+    else:
+        st.info("Enter your name in the sidebar to see your points history.")
+
+    # Leaderboard snapshot
+    st.markdown("#### 🏆 Leaderboard (Top 8)")
+    leaderboard_panel(8)
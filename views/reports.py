@@ -0,0 +1,65 @@
+# views/reports.py
+# Monthly PDF report and voice tip. reportlab is optional and only imported
+# when this page is opened. Month-end reports are pregenerated by
+# utils.reports (the current month is rendered on demand); the tip audio is
+# served from the utils.tts cache.
+import streamlit as st
+
+from utils.events import get_event_log
+from utils.reports import current_month, month_bounds, previous_month, render_pdf, report_from_history, report_path
+from utils.store import get_user_table
+from utils.tts import CHARGE_TIP, get_tip_audio
+from views import PageContext
+from views.common import ensure_user
+
+try:
+    from reportlab.pdfgen import canvas  # type: ignore
+except Exception:
+    canvas = None
+
+TIP_WAIT_S = 15  # only on a cold cache; tips are synthesized at startup
+
+
+def render(ctx: PageContext) -> None:
+    user_table = get_user_table()
+    st.markdown("### 📄 Monthly PDF Report")
+    if not st.session_state.authed_user:
+        st.warning("Enter your name in the sidebar to generate your report.")
+    else:
+        username = st.session_state.authed_user
+        # Written by the month-end batch (python -m utils.reports); served as-is.
+        last_month = previous_month()
+        pregenerated = report_path(username, last_month)
+        if pregenerated.exists():
+            st.download_button(f"📥 Download {last_month} Report (PDF)", pregenerated.read_bytes(),
+                               file_name=f"{username}_ecosense_report_{last_month}.pdf", mime="application/pdf")
+        if canvas is None:
+            st.error("Install reportlab to enable PDF generation: pip install reportlab")
+        else:
+            if st.button("Generate & Download PDF"):
+                try:
+                    row = user_table.get(username)
+                    if row is None:
+                        st.warning("User not found in database; saving now…")
+                        ensure_user(username, "", "Non-EV")
+                        row = user_table.get(username)
+
+                    month = current_month()
+                    start, end = month_bounds(month)
+                    report = report_from_history(row, month, get_event_log().history(username, start=start, end=end))
+                    st.download_button("📥 Download Report (PDF)", render_pdf(report), file_name=f"{username}_ecosense_report.pdf", mime="application/pdf")
+                except Exception as e:
+                    st.error("Failed to generate PDF: " + str(e))
+
+    st.markdown("#### 🔊 Quick Voice Tip")
+    audio = get_tip_audio()
+    if not audio.backends:
+        st.info("Install gTTS (online) or pyttsx3 (offline) to enable text-to-speech: pip install gTTS")
+    else:
+        if st.button("Play Tip"):
+            with st.spinner("Preparing the voice tip…"):
+                clip = audio.get(CHARGE_TIP, timeout=TIP_WAIT_S)
+            if clip is None:
+                st.error("TTS failed: no voice backend could synthesize the tip.")
+            else:
+                st.audio(clip.data, format=clip.mime)
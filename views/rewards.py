@@ -0,0 +1,49 @@
+# views/rewards.py
+import streamlit as st
+
+from views import PageContext
+from views.common import add_action_points, fragment, get_leaderboard, leaderboard_panel, user_points
+
+ACTIONS = [
+    ("Plan trips to reduce driving", 5),
+    ("Use public transport / carpool", 10),
+    ("Charge during green hours", 8),
+    ("Drive smoothly (avoid harsh braking)", 5),
+    ("Service vehicle for better efficiency", 6),
+]
+
+
+@fragment
+def _action_grid() -> None:
+    """Reward buttons plus the user's own standing; a click reruns only this."""
+    cols = st.columns(3)
+    for idx, (label, pts) in enumerate(ACTIONS):
+        with cols[idx % 3]:
+            if st.button(label):
+                if not st.session_state.authed_user:
+                    st.warning("Enter your name in the sidebar to record actions.")
+                else:
+                    add_action_points(st.session_state.authed_user, label, pts)
+                    st.success(f"+{pts} points — {label}")
+                    st.session_state.points = user_points(st.session_state.authed_user)
+                    if st.session_state.points >= 100:
+                        st.balloons()
+
+    # Show profile & leaderboard here as well
+    st.markdown("#### 🏆 Profile & Leaderboard")
+    leaderboard = get_leaderboard()
+    if st.session_state.authed_user:
+        my_rank = leaderboard.rank(st.session_state.authed_user)
+        m1, m2 = st.columns(2)
+        m1.metric("Your Eco Points", st.session_state.points)
+        m2.metric("Your Rank", f"#{my_rank} of {len(leaderboard)}" if my_rank else "—")
+        if my_rank:
+            st.markdown("##### Around you")
+            st.dataframe(leaderboard.around(st.session_state.authed_user, 2), use_container_width=True, hide_index=True)
+
+
+def render(ctx: PageContext) -> None:
+    st.markdown("### 🌟 Eco Actions & Rewards")
+    _action_grid()
+    st.markdown("##### Top 10")
+    leaderboard_panel(10)
@@ -0,0 +1,38 @@
+# views/settings.py
+import streamlit as st
+
+from utils.exports import available_formats, history_chunks, user_chunks
+from utils.store import get_user_table
+from views import PageContext
+from views.common import ensure_user, export_button
+
+
+def render(ctx: PageContext) -> None:
+    st.markdown("### ⚙️ Settings & Preferences")
+
+    # Theme & accent (already in sidebar), expose additional toggles here
+    st.markdown("#### Appearance")
+    st.write("Use the sidebar to change theme and accent.")
+
+    st.markdown("#### Account")
+    uname = st.text_input("Display Name", value=st.session_state.authed_user or "")
+    email = st.text_input("Email", value="")
+    veh = st.selectbox("Vehicle", ["EV", "Non-EV"], index=1)
+
+    if st.button("Save Profile"):
+        if uname:
+            ensure_user(uname, email, veh)
+            st.session_state.authed_user = uname
+            st.success("Profile saved.")
+        else:
+            st.warning("Enter a name.")
+
+    st.markdown("#### Data Export")
+    # Files are streamed in chunks by utils.exports when a button is clicked.
+    fmt = st.selectbox("Format", available_formats())
+    if not get_user_table().frame.empty:
+        export_button(f"⬇️ Download users.{fmt}", user_chunks, "users", fmt)
+    if st.session_state.authed_user:
+        username = st.session_state.authed_user
+        export_button(f"⬇️ Download my action history ({fmt})", lambda: history_chunks(username=username),
+                      f"{username}_actions", fmt)
@@ -0,0 +1,23 @@
+# views/simulator.py
+import streamlit as st
+
+from utils.simulator import estimate_impact, estimate_uncertainty, uncertainty_frame
+from views import PageContext
+
+
+def render(ctx: PageContext) -> None:
+    st.markdown("### 🔮 Lifestyle Impact Simulator — 'What if I...' (Advanced)")
+    st.caption("Examples: 'bike 6 km 5 days/week', 'skip 1 flight 1200 km', 'install 3 kW solar', 'replace 8 bulbs with LED', 'wfh 2 days/week', 'raise AC by 2C'")
+
+    scenario = st.text_input("Describe your scenario", value="")
+    show_bands = st.checkbox("Show uncertainty (Monte Carlo p10–p90)", value=False)
+    if st.button("Simulate impact"):
+        if scenario.strip():
+            out = estimate_impact(scenario)
+            st.success(out.replace("\n", "  \n"))
+            ranges = estimate_uncertainty(scenario) if show_bands else []
+            if ranges:
+                st.caption("CO₂ saved per year (tonnes) across 20,000 draws of the emission factors.")
+                st.dataframe(uncertainty_frame(ranges), use_container_width=True, hide_index=True)
+        else:
+            st.info("Type something like: 'bike 6 km to work 5 days a week'.")